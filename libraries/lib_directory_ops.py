@@ -75,6 +75,26 @@ def create_dir(root_dir, dir_name):
     return d
 
 
+def create_unique_dir(root_dir, dir_name):
+    """
+    Function that creates a directory in root_dir, adding a numbered suffix to dir_name if it already exists
+    (safe when several processes create their directories at the same time)
+    :param root_dir: the directory root
+    :param dir_name: the name of the directory
+    :return: path and name of the directory created
+    """
+    name = dir_name
+    n = 1
+    while True:
+        d = lib_path_ops.join_paths(root_dir, name)
+        try:
+            os.mkdir(d)
+            return d, name
+        except FileExistsError:
+            n += 1
+            name = '{}_{}'.format(dir_name, n)
+
+
 #----------------------------------------------------------------------------------------
 # MAIN
 #----------------------------------------------------------------------------------------
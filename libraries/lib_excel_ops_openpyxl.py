@@ -16,6 +16,43 @@ __email__ = "l.domingues@psenterprise.com"
 __status__ = "Development"
 
 
+# Maximum number of rows in an excel worksheet
+MAX_ROWS = 1048576
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Buffered_worksheet(object):
+    """ Creates an in-memory worksheet, addressed with cell(row, column, value) like an openpyxl worksheet, whose rows can then be appended to a write-only worksheet """
+    def __init__(self, ws=None):
+        self.rows = []
+        if ws is not None:
+            for row in ws.iter_rows(values_only=True):
+                self.rows.append(list(row))
+
+    def cell(self, row, column, value=None):
+        while len(self.rows) < row:
+            self.rows.append([])
+        r = self.rows[row-1]
+        while len(r) < column:
+            r.append(None)
+        r[column-1] = value
+        return 0
+
+    def get_max_row(self):
+        return len(self.rows)
+
+    def get_rows(self, n_rows=None):
+        """
+        Function that returns the rows, padded with empty rows up to n_rows
+        """
+        rows = [list(r) for r in self.rows]
+        if n_rows is not None:
+            rows += [[] for i in range(n_rows - len(rows))]
+        return rows
+
+
 #----------------------------------------------------------------------------------------
 # FUNCTIONS
 #----------------------------------------------------------------------------------------
@@ -49,6 +86,59 @@ def open_workbook(path_to_workbook_file):
         return None
 
 
+def create_write_only_workbook():
+    """
+    Function that returns an empty write-only excel workbook object, whose worksheets are streamed to disk row by row
+    """
+    return xl.Workbook(write_only=True)
+
+
+def open_workbook_read_only(path_to_workbook_file):
+    """
+    Function that loads a workbook in read-only mode (cells hold their formulas, not their cached values) and returns it as an object
+    """
+    try:
+        wb = xl.load_workbook(path_to_workbook_file, read_only=True, data_only=False)
+        return wb
+    except:
+        print("Could not load workbook <%s>" % path_to_workbook_file)
+        return None
+
+
+def append_rows(ws, rows):
+    """
+    Function that appends rows (iterable of lists) to a worksheet. In write-only worksheets the rows are streamed to disk.
+    return: number of rows appended
+    """
+    n = 0
+    for row in rows:
+        ws.append(row)
+        n += 1
+    return n
+
+
+def write_table_streaming(wb, title, rows, header=None, max_rows=MAX_ROWS):
+    """
+    Function that streams a table into write-only worksheets named title, title (2), title (3), ... starting a new
+    worksheet, with the header repeated, whenever max_rows is reached.
+    return: number of worksheets written
+    """
+    n_sheets = 0
+    ws = None
+    n_rows = max_rows
+    for row in rows:
+        if n_rows >= max_rows:
+            n_sheets += 1
+            ws = wb.create_sheet(title=title if n_sheets == 1 else "{} ({})".format(title, n_sheets))
+            n_rows = 0
+            if header is not None:
+                ws.append(header)
+                n_rows += 1
+        ws.append(row)
+        n_rows += 1
+    return n_sheets
+
+
 def convert_coordinates_num_to_alphanum(numeric_coordinates_list, zero_indexed=False):
     """
     Function that converts coordinates from a numeric row and index to alphanumeric (e.g. [1,1] -> 'A1')
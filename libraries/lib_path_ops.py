@@ -68,6 +68,13 @@ def join_paths(path_1, path_2):
     return a
 
 
+def path_exists(path):
+    """
+    Function that returns True if path refers to an existing path
+    """
+    return lib_path.exists(path)
+
+
 #----------------------------------------------------------------------------------------
 # MAIN
 #----------------------------------------------------------------------------------------
@@ -5,49 +5,130 @@ __email__ = "luis.hmd@gmail.com"
 #----------------------------------------------------------------------------------------
 # Notes
 #----------------------------------------------------------------------------------------
+# All bound functions work on the whole swarm at once:
+#   f(search_space, positions, velocities, rng=None) -> (positions, velocities)
+# where positions and velocities are (n, n_vars) arrays in the encoded space of a compiled Search_space and rng is the
+# numpy Generator of the run (numpy's global random generator is used if None).
+# Discrete variables (enumerate and binary) outside their encoded range are always reset to a random valid value, also
+# when bounds are not enforced (see reset_discrete).
 
 
 #----------------------------------------------------------------------------------------
 # IMPORTS
 #----------------------------------------------------------------------------------------
-import random as rand
+import numpy as np
 
 
 
 
+#----------------------------------------------------------------------------------------
+# AUXILIARY FUNCTIONS
+#----------------------------------------------------------------------------------------
+def _violations(search_space, positions):
+    """
+    Function that returns the masks of continuous and discrete coordinates that are out of bounds.
+    """
+    sp = search_space
+    violated = (positions < sp.lbounds) | (positions > sp.ubounds)
+    return violated & sp.continuous_mask, violated & sp.discrete_mask
+
+
+def _random_values(search_space, shape, rng=None):
+    """
+    Function that returns an array of random encoded values within bounds (integral for int and discrete variables).
+    """
+    sp = search_space
+    r = (np.random if rng is None else rng).random(shape)
+    values = sp.lbounds + sp.spans*r
+    values[:, sp.discrete_mask] = (sp.lbounds + np.floor((sp.spans + 1)*r))[:, sp.discrete_mask]
+    values[:, sp.int_mask] = np.rint(values[:, sp.int_mask])
+    return values
+
+
+def _finalise(search_space, positions_bounded, discrete_violated, rng=None):
+    """
+    Function that resets violated discrete coordinates and rounds int variables.
+    """
+    sp = search_space
+    if discrete_violated.any():
+        positions_bounded[discrete_violated] = _random_values(sp, positions_bounded.shape, rng)[discrete_violated]
+    positions_bounded[:, sp.int_mask] = np.rint(positions_bounded[:, sp.int_mask])
+    return positions_bounded
+
+
+def reset_discrete(search_space, positions, rng=None):
+    """
+    Function that resets in place the discrete coordinates outside their encoded range to a random valid value, so that
+    every position can be decoded when bounds are not enforced (float and int variables are left as they are).
+    """
+    _, discrete_violated = _violations(search_space, positions)
+    if discrete_violated.any():
+        positions[discrete_violated] = _random_values(search_space, positions.shape, rng)[discrete_violated]
+    return positions
+
+
 #----------------------------------------------------------------------------------------
 # BOUND FUNCTIONS
 #----------------------------------------------------------------------------------------
-def reset_to_bounds(search_space, position, seed=None):
-    """
-    Function that resets the position to the bounds if these are violated.
-    """
-    rand.seed(a=seed)
-    position_bounded = {}
-    vars_names = search_space.get_variables_names()
-    for v in vars_names:
-        var_type = search_space.get_variable_type(v)
-        if var_type == 'int' or var_type == 'float':
-            lb = search_space.get_variable_lbound(v)
-            ub = search_space.get_variable_ubound(v)
-            if (position[v] >= lb) and (position[v] <= ub):
-                position_bounded[v] = position[v]
-            elif (position[v] >= ub):
-                position_bounded[v] = ub
-            else:  # position[v] <= lb
-                position_bounded[v] = lb
-        elif var_type == 'enumerate':
-            values = search_space.get_variable_values(v)
-            if position[v] in values:
-                position_bounded[v] = position[v]
-            else:
-                position_bounded[v] = values[rand.randint(len(values))]
-        elif var_type == 'binary':
-            if position[v] in [0, 1]:
-                position_bounded[v] = position[v]
-            else:
-                position_bounded[v] = rand.randint(2)
-        else:
-            print("Could not enforce bounds for variable {}".format(v))
-    return position_bounded
+def reset_to_bounds(search_space, positions, velocities, rng=None):
+    """
+    Function that resets the positions to the closest bound if these are violated.
+    :param search_space: compiled Search_space object
+    :param positions: (n, n_vars) array with one particle per row (enumerate variables hold indexes into their values)
+    :param velocities: (n, n_vars) array with the particles velocities
+    :param rng: numpy Generator used to reset discrete variables
+    :return: tuple with the bounded positions and the velocities
+    """
+    sp = search_space
+    continuous_violated, discrete_violated = _violations(sp, positions)
+    positions_bounded = np.where(continuous_violated, np.clip(positions, sp.lbounds, sp.ubounds), positions)
+    return _finalise(sp, positions_bounded, discrete_violated, rng), velocities
+
 
+def absorb(search_space, positions, velocities, rng=None):
+    """
+    Function that resets the positions to the closest bound if these are violated and sets the velocity to zero in that direction.
+    """
+    sp = search_space
+    continuous_violated, discrete_violated = _violations(sp, positions)
+    positions_bounded = np.where(continuous_violated, np.clip(positions, sp.lbounds, sp.ubounds), positions)
+    velocities_bounded = np.where(continuous_violated, 0.0, velocities)
+    return _finalise(sp, positions_bounded, discrete_violated, rng), velocities_bounded
+
+
+def reflect(search_space, positions, velocities, rng=None):
+    """
+    Function that mirrors the positions back into the search space at the violated bound and reverses the velocity in that direction.
+    Overshoots larger than the range are folded as many times as needed.
+    """
+    sp = search_space
+    continuous_violated, discrete_violated = _violations(sp, positions)
+    period = 2*sp.spans
+    with np.errstate(invalid='ignore', divide='ignore'):
+        folded = np.mod(positions - sp.lbounds, np.where(period > 0, period, 1.0))
+    reflected = sp.lbounds + sp.spans - np.abs(folded - sp.spans)
+    positions_bounded = np.where(continuous_violated, reflected, positions)
+    velocities_bounded = np.where(continuous_violated, -velocities, velocities)
+    return _finalise(sp, positions_bounded, discrete_violated, rng), velocities_bounded
+
+
+def periodic(search_space, positions, velocities, rng=None):
+    """
+    Function that wraps the positions around the search space, so that leaving through one bound re-enters through the opposite one.
+    """
+    sp = search_space
+    continuous_violated, discrete_violated = _violations(sp, positions)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        wrapped = sp.lbounds + np.mod(positions - sp.lbounds, np.where(sp.spans > 0, sp.spans, 1.0))
+    positions_bounded = np.where(continuous_violated, wrapped, positions)
+    return _finalise(sp, positions_bounded, discrete_violated, rng), velocities
+
+
+def random_reinit(search_space, positions, velocities, rng=None):
+    """
+    Function that re-initialises the violated coordinates to random values within bounds.
+    """
+    sp = search_space
+    continuous_violated, discrete_violated = _violations(sp, positions)
+    positions_bounded = np.where(continuous_violated, _random_values(sp, positions.shape, rng), positions)
+    return _finalise(sp, positions_bounded, discrete_violated, rng), velocities
@@ -0,0 +1,123 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Positions are quantized before being used as keys: float variables are rounded to a multiple of their tolerance,
+# while int, enumerate and binary variables are matched exactly. A tolerance of 0 matches floats exactly.
+# Failed evaluations (NaN) are cached as well, so a failing point is not run twice.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import collections
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Evaluation_cache(object):
+    """ Creates a bounded cache of model evaluations, with least recently used eviction """
+    def __init__(self, search_space, max_size=100000, tolerance=0.0):
+        self.max_size = max_size
+        self.table = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Tolerance per variable (only applied to float variables)
+        vars_names = search_space.get_variables_names()
+        if isinstance(tolerance, dict):
+            tolerances = np.array([tolerance.get(v, 0.0) for v in vars_names], dtype=float)
+        else:
+            tolerances = np.full(len(vars_names), tolerance, dtype=float)
+        self.quantized_mask = search_space.float_mask & (tolerances > 0)
+        self.tolerances = np.where(self.quantized_mask, tolerances, 1.0)
+
+    def get_size(self):
+        return len(self.table)
+
+    def get_hits(self):
+        return self.hits
+
+    def get_misses(self):
+        return self.misses
+
+    def get_state(self):
+        """
+        Function that returns the cache contents and counters as (arrays, metadata), to be saved in a checkpoint.
+        """
+        n_vars = self.tolerances.shape[0]
+        keys = np.frombuffer(b''.join(self.table.keys()), dtype=np.float64).reshape(-1, n_vars)
+        values = np.array(list(self.table.values()), dtype=np.float64)
+        return {'cache_keys': keys, 'cache_values': values}, {'cache': [self.hits, self.misses]}
+
+    def set_state(self, arrays, metadata):
+        """
+        Function that restores the cache saved with get_state.
+        """
+        self.table = collections.OrderedDict()
+        keys = np.ascontiguousarray(arrays['cache_keys'], dtype=np.float64)
+        for key, value in zip(keys, arrays['cache_values'].tolist()):
+            self.table[key.tobytes()] = value
+        self.hits, self.misses = metadata['cache']
+        return 0
+
+    def get_keys(self, positions):
+        """
+        Function that returns the cache key (bytes) of each encoded position.
+        """
+        q = np.where(self.quantized_mask, np.rint(positions/self.tolerances), positions) + 0.0 # + 0.0 turns -0.0 into 0.0
+        q = np.ascontiguousarray(q, dtype=np.float64)
+        return q.view(np.dtype((np.void, q.dtype.itemsize*q.shape[1]))).ravel().tolist()
+
+    def lookup(self, key):
+        """
+        Function that returns the cached fitness for a key, or None if the key is not cached.
+        """
+        fitness = self.table.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.table.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def store(self, key, fitness):
+        """
+        Function that stores a fitness, evicting the least recently used entry if the cache is full.
+        """
+        self.table[key] = fitness
+        self.table.move_to_end(key)
+        if len(self.table) > self.max_size:
+            self.table.popitem(last=False)
+        return 0
+
+    def evaluate(self, positions, f_evaluate):
+        """
+        Function that returns the fitness of each encoded position, calling f_evaluate(positions) once for the distinct
+        positions that are not cached. Repeated positions within the batch are evaluated only once.
+        return: (n,) fitness array and the fitness array of the evaluations actually run
+        """
+        keys = self.get_keys(positions)
+        fitness = np.empty(len(keys))
+        missing = collections.OrderedDict()
+        for i, key in enumerate(keys):
+            if key in missing:
+                missing[key].append(i)
+                self.hits += 1
+                continue
+            cached = self.lookup(key)
+            if cached is None:
+                missing[key] = [i]
+            else:
+                fitness[i] = cached
+        if not missing:
+            return fitness, np.empty(0)
+        new_fitness = f_evaluate(positions[[rows[0] for rows in missing.values()]])
+        for (key, rows), f in zip(missing.items(), new_fitness):
+            fitness[rows] = f
+            self.store(key, float(f))
+        return fitness, new_fitness
@@ -0,0 +1,59 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# A checkpoint is a single .npz file holding named arrays plus a json metadata string. Files are written to a
+# temporary file first and then renamed, so that a crash while saving never corrupts the previous checkpoint.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import os
+import json
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def save_checkpoint(path, arrays, metadata):
+    """
+    Function that saves a checkpoint atomically.
+    :param arrays: dictionary of numpy arrays
+    :param metadata: json serialisable dictionary
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, __metadata__=np.array(json.dumps(metadata)), **arrays)
+    os.replace(tmp_path, path)
+    return 0
+
+
+def load_checkpoint(path):
+    """
+    Function that loads a checkpoint.
+    return: dictionary of arrays and metadata dictionary
+    """
+    with np.load(path, allow_pickle=False) as data:
+        metadata = json.loads(str(data['__metadata__']))
+        arrays = {k: data[k] for k in data.files if k != '__metadata__'}
+    return arrays, metadata
+
+
+def get_rng_state(rng):
+    """
+    Function that returns the state of a numpy Generator as (arrays, metadata).
+    """
+    return {}, {'rng': rng.bit_generator.state}
+
+
+def set_rng_state(rng, metadata):
+    """
+    Function that restores the state of a numpy Generator.
+    """
+    rng.bit_generator.state = metadata['rng']
+    return 0
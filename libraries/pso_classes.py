@@ -5,20 +5,26 @@ __email__ = "luis.hmd@gmail.com"
 #----------------------------------------------------------------------------------------
 # Notes
 #----------------------------------------------------------------------------------------
-
+# The modules of optional features (evaluation cache, surrogate, constraints, checkpoints) and of the outputs (results
+# log, output dir) are imported in the functions that use them, so that importing this module only loads the core.
 
 #----------------------------------------------------------------------------------------
 # IMPORTS
 #----------------------------------------------------------------------------------------
-import random as rand
 import copy
-import models
+import warnings
+import collections
+import concurrent.futures
+import numpy as np
+import pso_models
 import pso_bound_functions as pso_bound
-import datetime
-import lib_directory_ops
-import lib_path_ops
-import lib_file_ops
-import lib_excel_ops_openpyxl as lib_excel
+import pso_profiling
+import pso_termination
+import pso_topologies
+import pso_random
+import pso_large_scale
+import pso_schedules
+import pso_registry
 
 
 #----------------------------------------------------------------------------------------
@@ -79,10 +85,73 @@ class Particle(object):
         return 0
 
 
+class Best_record(collections.namedtuple('Best_record', ['p_id', 'fitness', 'position_row', 'search_space'])):
+    """ Creates an immutable record of a best particle: its index, fitness and a read-only snapshot of its encoded position """
+    __slots__ = ()
+
+    @classmethod
+    def from_row(cls, p_id, fitness, row, search_space):
+        """
+        Function that creates a record, taking a read-only copy of the position row.
+        """
+        position_row = np.array(row, dtype=float)
+        position_row.setflags(write=False)
+        return cls(p_id, float(fitness), position_row, search_space)
+
+    def __str__(self):
+        return "Particle {} has fitness {}".format(self.p_id, self.fitness)
+
+    def get_fitness(self):
+        return self.fitness
+
+    def get_position(self):
+        return self.search_space.decode_position(self.position_row)
+
+    def get_position_row(self):
+        return self.position_row
+
+
 class Search_space(object):
     """ Creates a search space """
     def __init__(self, search_space):
         self.search_space = search_space
+        self.compiled = False
+
+    def compile(self):
+        """
+        Function that precomputes, once, the bound vectors, type masks and enumerate value tables used by the swarm.
+        Bounds are expressed in the encoded space: enumerate variables are indexes into their values and binary variables are 0/1.
+        """
+        vars_names = self.get_variables_names()
+        types = [self.get_variable_type(v) for v in vars_names]
+        self.float_mask = np.array([t == 'float' for t in types], dtype=bool)
+        self.int_mask = np.array([t == 'int' for t in types], dtype=bool)
+        self.enumerate_mask = np.array([t == 'enumerate' for t in types], dtype=bool)
+        self.binary_mask = np.array([t == 'binary' for t in types], dtype=bool)
+        self.continuous_mask = self.float_mask | self.int_mask
+        self.discrete_mask = self.enumerate_mask | self.binary_mask
+        self.lbounds = np.full(len(vars_names), np.nan)
+        self.ubounds = np.full(len(vars_names), np.nan)
+        self.enumerate_values = {}
+        for j, v in enumerate(vars_names):
+            if self.continuous_mask[j]:
+                self.lbounds[j] = self.get_variable_lbound(v)
+                self.ubounds[j] = self.get_variable_ubound(v)
+            elif self.enumerate_mask[j]:
+                self.enumerate_values[j] = tuple(self.get_variable_values(v))
+                self.lbounds[j] = 0
+                self.ubounds[j] = len(self.enumerate_values[j]) - 1
+            elif self.binary_mask[j]:
+                self.lbounds[j] = 0
+                self.ubounds[j] = 1
+            else:
+                warnings.warn("Could not determine type for variable {}".format(v))
+        self.spans = np.abs(self.ubounds - self.lbounds)
+        self.compiled = True
+        return 0
+
+    def is_compiled(self):
+        return self.compiled
 
     def get_number_variables(self):
         return len(self.search_space)
@@ -120,23 +189,90 @@ class Search_space(object):
         except KeyError:
             return None
 
+    def decode_position(self, row):
+        """
+        Function that converts an encoded position row into a dictionary keyed by variable name, as expected by the models.
+        """
+        values = row.tolist()
+        for j in np.flatnonzero(self.int_mask | self.binary_mask):
+            values[j] = int(values[j])
+        for j, table in self.enumerate_values.items():
+            values[j] = table[int(values[j])]
+        return dict(zip(self.get_variables_names(), values))
+
+    def decode_positions(self, positions):
+        """
+        Function that converts an array of encoded positions into a dictionary of column arrays keyed by variable name.
+        """
+        columns = {}
+        for j, v in enumerate(self.get_variables_names()):
+            if j in self.enumerate_values:
+                columns[v] = np.asarray(self.enumerate_values[j])[positions[:, j].astype(int)]
+            elif self.int_mask[j] or self.binary_mask[j]:
+                columns[v] = positions[:, j].astype(int)
+            else:
+                columns[v] = positions[:, j]
+        return columns
+
+    def encode_position(self, position):
+        """
+        Function that converts a position dictionary into an encoded position row.
+        """
+        row = np.empty(self.get_number_variables())
+        for j, v in enumerate(self.get_variables_names()):
+            if j in self.enumerate_values:
+                row[j] = self.enumerate_values[j].index(position[v])
+            else:
+                row[j] = position[v]
+        return row
+
 
 class Swarm(object):
-    """ Creates a swarm, which is a collection of particles with extra functionality """
-    def __init__(self, search_space, seed=None):
+    """ Creates a swarm, which keeps the state of all particles as (swarm_size, n_vars) arrays """
+    def __init__(self, search_space, seed=None, dtype=np.float64, chunk_size=None):
         self.size = 0
-        self.particle_list = []
         self.N_evals = 0
         self.N_failed_evals = 0
         self.seed = seed
+        self.rng = pso_random.create_generator(seed)
         self.search_space = search_space
+        if not search_space.is_compiled():
+            search_space.compile()
+        self.vars_names = search_space.get_variables_names()
+        self.n_vars = len(self.vars_names)
+        # Structure of arrays: row i holds particle i (enumerate variables are stored as indexes into their values)
+        self.dtype = np.dtype(dtype)
+        self.positions = np.empty((0, self.n_vars), dtype=self.dtype)
+        self.velocities = np.empty((0, self.n_vars), dtype=self.dtype)
+        self.best_positions = np.empty((0, self.n_vars), dtype=self.dtype)
+        self.fitness = np.empty(0)
+        self.best_fitness = np.empty(0)
+        # Total constraint violation of each position and personal best (only used with the feasibility rules)
+        self.violations = np.empty(0)
+        self.best_violations = np.empty(0)
+        self.best_violation_so_far = np.inf
+        self.N_infeasible = 0
+        # Number of personal best improvements so far (feedback of the adaptive schedules)
+        self.N_improved = 0
+        self.swarm_best_position = None
         self.best_particle_so_far = None
         self.best_particle_current = None
+        # Steady-state mode: evaluations in flight, and rows restored from a checkpoint to be submitted again without moving
+        self.pending = {}
+        self.resubmit_rows = []
+        self.topology = None
+        self.leaders = None
+        self.profiler = pso_profiling.Profiler(enabled=False)
+        # Large-scale mode: the updates and evaluations are done chunk_size rows at a time, with preallocated buffers
+        self.chunk_size = chunk_size
+        self.buffers = None
+        # Bounds representable in the storage type, within the bounds of the search space
+        self.storage_bounds = pso_large_scale.get_storage_bounds(search_space, self.dtype)
 
     def __str__(self):
         s = "Size: {}\nSeed: {}\n".format(self.size, self.seed)
-        for i in self.particle_list:
-            s += i.__str__() + "\n"
+        for i in range(self.size):
+            s += self.get_particle(i).__str__() + "\n"
         return s
 
     def copy(self):
@@ -151,17 +287,43 @@ class Swarm(object):
     def get_search_space(self):
         return self.search_space
 
+    def set_profiler(self, profiler):
+        self.profiler = profiler
+        return 0
+
+    def set_leaders(self, leaders):
+        """
+        Function that sets the position each particle is attracted to by the social term, as a (swarm_size, n_vars) array
+        (e.g. leaders chosen from a Pareto archive), instead of the swarm best position. None restores the default.
+        """
+        self.leaders = leaders
+        return 0
+
+    def set_topology(self, topology):
+        """
+        Function that sets the neighbourhood topology of the swarm (None for the global topology).
+        """
+        self.topology = topology
+        return 0
+
     def get_particle(self, p_id):
         """
-        Function that returns a single particle with a given id
+        Function that returns a single particle with a given id, built from the swarm arrays
         """
-        return self.particle_list[p_id]
+        velocity = dict(zip(self.vars_names, self.velocities[p_id].tolist()))
+        p = Particle(p_id+1, self.search_space.decode_position(self.positions[p_id]), velocity)
+        if not np.isnan(self.fitness[p_id]):
+            p.update_fitness(float(self.fitness[p_id]))
+        p.update_particle_best_position(self.search_space.decode_position(self.best_positions[p_id]))
+        if self.swarm_best_position is not None:
+            p.update_swarm_best_position(self.search_space.decode_position(self.swarm_best_position))
+        return p
 
     def get_particles(self):
         """
         Function that returns all the particles in the swarm
         """
-        return self.particle_list
+        return [self.get_particle(i) for i in range(self.size)]
 
     def get_best_particle_so_far(self):
         """
@@ -175,187 +337,491 @@ class Swarm(object):
         """
         return self.best_particle_current
 
-    def initialise(self, swarm_size, f_bound, seed=None):
+    def get_state(self):
+        """
+        Function that returns the full state of the swarm as (arrays, metadata), to be saved in a checkpoint.
+        """
+        arrays = {'positions': self.positions, 'velocities': self.velocities, 'best_positions': self.best_positions,
+                  'fitness': self.fitness, 'best_fitness': self.best_fitness, 'violations': self.violations,
+                  'best_violations': self.best_violations}
+        metadata = {'size': self.size, 'N_evals': self.N_evals, 'N_failed_evals': self.N_failed_evals,
+                    'N_infeasible': self.N_infeasible, 'best_violation_so_far': self.best_violation_so_far,
+                    'N_improved': self.N_improved}
+        if self.swarm_best_position is not None:
+            arrays['swarm_best_position'] = self.swarm_best_position
+        for name in ('best_particle_so_far', 'best_particle_current'):
+            record = getattr(self, name)
+            if record is not None:
+                arrays[name] = record.get_position_row()
+                metadata[name] = [record.p_id, record.fitness]
+        metadata['best_particle_current_is_so_far'] = self.best_particle_current is self.best_particle_so_far
+        # Particles in flight in steady-state mode were already moved: their positions are submitted again on resume
+        if self.pending:
+            arrays['pending_rows'] = np.array([pending[0] for pending in self.pending.values()], dtype=int)
+        return arrays, metadata
+
+    def set_state(self, arrays, metadata):
+        """
+        Function that restores the state of the swarm saved with get_state.
+        """
+        self.positions = arrays['positions'].copy()
+        self.velocities = arrays['velocities'].copy()
+        self.best_positions = arrays['best_positions'].copy()
+        self.fitness = arrays['fitness'].copy()
+        self.best_fitness = arrays['best_fitness'].copy()
+        self.violations = arrays['violations'].copy()
+        self.best_violations = arrays['best_violations'].copy()
+        self.size = metadata['size']
+        self.N_evals = metadata['N_evals']
+        self.N_failed_evals = metadata['N_failed_evals']
+        self.N_infeasible = metadata['N_infeasible']
+        self.best_violation_so_far = metadata['best_violation_so_far']
+        self.N_improved = metadata.get('N_improved', 0)
+        self.resubmit_rows = arrays['pending_rows'].tolist() if 'pending_rows' in arrays else []
+        for name in ('best_particle_so_far', 'best_particle_current'):
+            if name in metadata:
+                p_id, fitness = metadata[name]
+                setattr(self, name, Best_record.from_row(p_id, fitness, arrays[name], self.search_space))
+        if metadata['best_particle_current_is_so_far']:
+            self.best_particle_current = self.best_particle_so_far
+        # The swarm best position is the position row of one of the best records, or a copy of it
+        self.swarm_best_position = None
+        if 'swarm_best_position' in arrays:
+            self.swarm_best_position = arrays['swarm_best_position'].copy()
+            self.swarm_best_position.setflags(write=False)
+            for record in (self.best_particle_so_far, self.best_particle_current):
+                if record is not None and np.array_equal(record.get_position_row(), self.swarm_best_position):
+                    self.swarm_best_position = record.get_position_row()
+        return 0
+
+    def get_diversity(self):
+        """
+        Function that returns the diversity of the swarm: the mean distance of the particles to their centroid, with every
+        variable scaled by its range and the result divided by sqrt(n_vars), so that it lies between 0 and 1.
+        """
+        spans = np.where(self.search_space.spans > 0, self.search_space.spans, 1.0)
+        if self.chunk_size:
+            # Two passes over the chunks: centroid first, then distances to it
+            centroid = sum(np.sum(self.positions[rows]/spans, axis=0) for rows in self.__chunks())/self.size
+            total = sum(np.sum(np.sqrt(np.sum((self.positions[rows]/spans - centroid)**2, axis=1))) for rows in self.__chunks())
+            return float(total/self.size/np.sqrt(self.n_vars))
+        scaled = self.positions/spans
+        distances = np.sqrt(np.sum((scaled - scaled.mean(axis=0))**2, axis=1))
+        return float(distances.mean()/np.sqrt(self.n_vars))
+
+    def __chunks(self):
+        """
+        Internal function that returns the slices of rows of the chunks of the swarm (a single slice if not chunked).
+        """
+        chunk_size = self.chunk_size or max(1, self.size)
+        return [slice(start, min(start + chunk_size, self.size)) for start in range(0, self.size, chunk_size)]
+
+    def initialise(self, swarm_size, f_bound):
         """
         Function that initialises a swarm of a given size
         """
-        rand.seed(a=seed)
-        vars_names = self.search_space.get_variables_names()
-        for i in range(swarm_size):
-            # Initialise position
-            position = {}
-            for v in vars_names:
-                var_type = self.search_space.get_variable_type(v)
-                if var_type == 'int' or var_type == 'float':
-                    lb = self.search_space.get_variable_lbound(v)
-                    ub = self.search_space.get_variable_ubound(v)
-                    position[v] = lb + (ub - lb)*rand.random()
-                elif var_type == 'enumerate':
-                    values = self.search_space.get_variable_values(v)
-                    position[v] = values[rand.randint(0, len(values)-1)]
-                elif var_type == 'binary':
-                    position[v] = rand.randint(2)
-                else:
-                    print("Could not determine type for variable {}".format(v))
-                    position[v] = None
-
-            # Initialise velocity
-            velocity = {}
-            for v in vars_names:
-                var_type = self.search_space.get_variable_type(v)
-                if var_type == 'int' or var_type == 'float':
-                    lb = self.search_space.get_variable_lbound(v)
-                    ub = self.search_space.get_variable_ubound(v)
-                    velocity[v] = -abs(ub-lb) + 2*abs(ub-lb)*rand.random()
-                elif var_type == 'enumerate':
-                    values = self.search_space.get_variable_values(v)
-                    velocity[v] = -(len(values)-1) + 2*(len(values)-1)*rand.random()
-                elif var_type == 'binary':
-                    velocity[v] = -1 + 2*rand.randint(2)
-                else:
-                    print("Could not determine type for variable {}".format(v))
-                    velocity[v] = None
-            self.insert_particle(f_bound, position, velocity, seed=seed)
+        if not self.chunk_size:
+            positions, velocities = self.__random_particles(swarm_size)
+            self.__append(f_bound, positions, velocities)
+            return 0
+        # Large-scale mode: the arrays are allocated once and filled one chunk at a time
+        self.positions = np.empty((swarm_size, self.n_vars), dtype=self.dtype)
+        self.velocities = np.empty((swarm_size, self.n_vars), dtype=self.dtype)
+        self.best_positions = np.empty((swarm_size, self.n_vars), dtype=self.dtype)
+        self.fitness = np.full(swarm_size, np.nan)
+        self.best_fitness = np.full(swarm_size, np.nan)
+        self.violations = np.zeros(swarm_size)
+        self.best_violations = np.full(swarm_size, np.inf)
+        self.size = swarm_size
+        for rows in self.__chunks():
+            positions, velocities = self.__random_particles(rows.stop - rows.start)
+            if f_bound:
+                positions, velocities = f_bound(self.search_space, positions, velocities, rng=self.rng)
+            self.positions[rows] = positions
+            self.velocities[rows] = velocities
+            if f_bound:
+                self.__clip_to_storage_bounds(self.positions[rows])
+            self.best_positions[rows] = self.positions[rows]
         return 0
 
-    def update_position(self, f_bound, seed=None):
+    def __clip_to_storage_bounds(self, positions):
+        """
+        Internal function that clips in place the continuous coordinates of positions already cast to the storage type, as
+        the cast can round a coordinate within bounds out of them.
+        """
+        if self.dtype == np.float64:
+            return 0
+        lbounds, ubounds = self.storage_bounds
+        mask = self.search_space.continuous_mask
+        positions[:, mask] = np.clip(positions[:, mask], lbounds[mask], ubounds[mask])
+        return 0
+
+    def __random_particles(self, n):
+        """
+        Internal function that returns the positions and velocities of n random particles.
+        """
+        sp = self.search_space
+        r_position, r_velocity = self.rng.random((2, n, self.n_vars))
+        positions = sp.lbounds + sp.spans*r_position
+        velocities = -sp.spans + 2*sp.spans*r_velocity
+        # Discrete variables take one of their (ub - lb + 1) encoded values, binary velocities are either -1 or 1
+        positions[:, sp.discrete_mask] = np.floor((sp.spans + 1)*r_position)[:, sp.discrete_mask]
+        positions[:, sp.int_mask] = np.rint(positions[:, sp.int_mask])
+        velocities[:, sp.binary_mask] = np.where(r_velocity[:, sp.binary_mask] < 0.5, -1.0, 1.0)
+        return positions, velocities
+
+    def update_position(self, f_bound):
         """
         Function that updates the position based on a previous position and the current velocity.
         """
-        vars_names = self.search_space.get_variables_names()
-        for i in range(self.size):
-            new_position = {}
-            position = self.particle_list[i].get_position()
-            velocity = self.particle_list[i].get_velocity()
-            # Get new position
-            for v in vars_names:
-                var_type = self.search_space.get_variable_type(v)
-                if var_type == 'int' or var_type == 'float':
-                    new_position[v] = position[v] + velocity[v]
-                elif var_type == 'enumerate':
-                    new_position[v] = int(position[v] + velocity[v])
-                elif var_type == 'binary':
-                    new_position[v] = int(position[v] + velocity[v])
-            # Force bounds
+        if not self.chunk_size:
+            self.positions, self.velocities = self.__new_positions(self.positions, self.velocities, f_bound)
+            return 0
+        sp = self.search_space
+        for rows in self.__chunks():
+            positions = self.positions[rows]
+            with self.profiler.phase('update_position'):
+                positions += self.velocities[rows]
+                positions[:, sp.discrete_mask] = np.trunc(positions[:, sp.discrete_mask])
+                positions[:, sp.int_mask] = np.rint(positions[:, sp.int_mask])
             if f_bound:
-                pos = eval(f_bound)(self.search_space, new_position, seed=seed)
+                with self.profiler.phase('enforce_bounds'):
+                    self.positions[rows], self.velocities[rows] = f_bound(sp, positions, self.velocities[rows], rng=self.rng)
+                    self.__clip_to_storage_bounds(self.positions[rows])
             else:
-                pos = new_position
-            # Update position
-            self.particle_list[i].update_position(pos)
+                pso_bound.reset_discrete(sp, positions, self.rng)
         return 0
 
-    def update_velocity(self, c_inertia, c_local, c_global, seed=None):
+    def update_velocity(self, c_inertia, c_local, c_global):
         """
         Function that updates the velocity according to the PSO rules
         """
-        rand.seed(a=seed)
-        vars_names = self.search_space.get_variables_names()
-        for i in range(self.size):
-            new_velocity = {}
-            velocity = self.particle_list[i].get_velocity()
-            p = self.particle_list[i].get_position()
-            p_best_particle = self.particle_list[i].get_particle_best_position()
-            p_best_swarm = self.particle_list[i].get_swarm_best_position()
-            for v in vars_names:
-                new_velocity[v] = c_inertia*velocity[v] + c_local*rand.random()*(p_best_particle[v] - p[v]) + c_global*rand.random()*(p_best_swarm[v] - p[v])
-            self.particle_list[i].update_velocity(new_velocity)
+        if not self.chunk_size:
+            self.velocities = self.__new_velocities(slice(None), c_inertia, c_local, c_global)
+            return 0
+        if self.buffers is None:
+            shape = (min(self.chunk_size, self.size), self.n_vars)
+            self.buffers = {name: np.empty(shape, dtype=self.dtype) for name in ('r_local', 'r_global', 'term')}
+        for rows in self.__chunks():
+            self.__update_velocity_chunk(rows, c_inertia, c_local, c_global)
         return 0
 
+    def __update_velocity_chunk(self, rows, c_inertia, c_local, c_global):
+        """
+        Internal function that updates in place the velocities of a chunk of rows, using the preallocated buffers.
+        """
+        n = rows.stop - rows.start
+        r_local = self.buffers['r_local'][:n]
+        r_global = self.buffers['r_global'][:n]
+        term = self.buffers['term'][:n]
+        self.rng.random(dtype=self.dtype, out=r_local)
+        self.rng.random(dtype=self.dtype, out=r_global)
+        if self.leaders is not None:
+            social_best_positions = self.leaders[rows]
+        elif self.topology is None:
+            social_best_positions = self.swarm_best_position
+        else:
+            social_best_positions = self.best_positions[self.topology.get_local_bests(self.best_fitness, rows)]
+        positions = self.positions[rows]
+        velocities = self.velocities[rows]
+        velocities *= c_inertia
+        np.subtract(self.best_positions[rows], positions, out=term)
+        term *= r_local
+        term *= c_local
+        velocities += term
+        np.subtract(social_best_positions, positions, out=term)
+        term *= r_global
+        term *= c_global
+        velocities += term
+        return 0
+
+    def __new_velocities(self, rows, c_inertia, c_local, c_global):
+        """
+        Internal function that returns the velocities of the given rows according to the PSO rules (the social term points
+        to the leader of each particle if leaders are set, to the best personal best among the neighbours of each particle
+        with a local topology, or to the swarm best position).
+        """
+        positions = self.positions[rows]
+        r_local, r_global = self.rng.random((2,) + positions.shape)
+        if self.leaders is not None:
+            social_best_positions = self.leaders[rows]
+        elif self.topology is None:
+            social_best_positions = self.swarm_best_position
+        else:
+            social_best_positions = self.best_positions[self.topology.get_local_bests(self.best_fitness, rows)]
+        return c_inertia*self.velocities[rows] \
+            + c_local*r_local*(self.best_positions[rows] - positions) \
+            + c_global*r_global*(social_best_positions - positions)
+
+    def __new_positions(self, positions, velocities, f_bound):
+        """
+        Internal function that returns the positions reached with the given velocities, and the velocities after enforcing bounds.
+        """
+        sp = self.search_space
+        with self.profiler.phase('update_position'):
+            new_positions = positions + velocities
+            new_positions[:, sp.discrete_mask] = np.trunc(new_positions[:, sp.discrete_mask])
+            new_positions[:, sp.int_mask] = np.rint(new_positions[:, sp.int_mask])
+        # Force bounds (discrete variables are always kept within their range, so that positions can be decoded)
+        if f_bound:
+            with self.profiler.phase('enforce_bounds'):
+                new_positions, velocities = f_bound(sp, new_positions, velocities, rng=self.rng)
+        else:
+            pso_bound.reset_discrete(sp, new_positions, self.rng)
+        return new_positions, velocities
+
     def sorted_by_particle_fitness(self, reverse=False):
         """
         Function that sorts a swarm by fitness, depending on the optimisation type (min in ascending order).
         return: a sorted list of particles
         """
-        particle_list_sorted = []
-        tuple_list = []
-        for i in range(self.size):
-            t = (i, self.particle_list[i].get_fitness())
-            tuple_list.append(t)
-        tuple_list.sort(key=lambda tup: tup[1], reverse=reverse)
-        for t in tuple_list:
-            particle_list_sorted.append(self.particle_list[t[0]])
-        return particle_list_sorted
+        order = np.argsort(-self.fitness if reverse else self.fitness, kind='stable')
+        return [self.get_particle(i) for i in order]
 
-    def insert_particle(self, f_bound, position, velocity, seed=None):
+    def insert_particle(self, f_bound, position, velocity):
         """
         Function that inserts a particle in the swarm, given a position and velocity.
         """
+        row_position = self.search_space.encode_position(position).reshape(1, -1)
+        row_velocity = np.array([velocity[v] for v in self.vars_names], dtype=float).reshape(1, -1)
+        self.__append(f_bound, row_position, row_velocity)
+        return 0
+
+    def __append(self, f_bound, positions, velocities):
+        """
+        Internal function that appends rows of positions and velocities to the swarm arrays.
+        """
         if f_bound:
-            pos = eval(f_bound)(self.search_space, position, seed=seed)
+            positions, velocities = f_bound(self.search_space, positions, velocities, rng=self.rng)
         else:
-            pos = position
-        p = Particle(self.size+1, pos, velocity)
-        self.particle_list.append(p)
-        self.size += 1
+            positions = pso_bound.reset_discrete(self.search_space, positions.copy(), self.rng)
+        n = positions.shape[0]
+        positions = positions.astype(self.dtype, copy=False)
+        velocities = velocities.astype(self.dtype, copy=False)
+        if f_bound:
+            self.__clip_to_storage_bounds(positions)
+        self.positions = np.vstack((self.positions, positions))
+        self.velocities = np.vstack((self.velocities, velocities))
+        self.best_positions = np.vstack((self.best_positions, positions))
+        self.fitness = np.concatenate((self.fitness, np.full(n, np.nan)))
+        self.best_fitness = np.concatenate((self.best_fitness, np.full(n, np.nan)))
+        self.violations = np.concatenate((self.violations, np.zeros(n)))
+        self.best_violations = np.concatenate((self.best_violations, np.full(n, np.inf)))
+        self.size += n
         return 0
 
-    def evaluate(self, f_model, opt_type, synchronous=True):
+    def evaluate(self, f_model, opt_type, synchronous=True, pool=None, cache=None, surrogate=None, constraints=None):
         """
-        Function that evaluates a swarm.
+        Function that evaluates a swarm, in parallel if an Evaluation_pool is given and skipping the positions held in an Evaluation_cache.
+        With Constraints, the infeasible positions are not evaluated by the model and get the fitness of the constraint handling.
+        With a Surrogate, only the positions it selects are evaluated by the model; the others keep a NaN fitness and their bests.
+        return: number of evaluations and number of failed evaluations in this call
         """
-        self.N_failed_evals = 0
-        # Get fitness for all particles
-        for i in range(len(self.particle_list)):
-            old_fitness = self.particle_list[i].get_fitness()
-            fitness = eval(f_model)(self.particle_list[i].get_position())
-            self.N_evals += 1
-            if fitness:
-                # Update particle fitness
-                self.particle_list[i].update_fitness(fitness)
-                # Update particle and swarm best positions
-                if opt_type == 'min':
-                    if old_fitness and (fitness < old_fitness):
-                        # Update particle best position
-                        position = self.particle_list[i].get_position()
-                        self.particle_list[i].update_particle_best_position(position)
-                        # Update swarm best position
-                        if fitness < self.best_particle_current.get_fitness() and synchronous:
-                            self.particle_list[i].update_swarm_best_position(position)
-                            self.best_particle_current = self.particle_list[i].copy()
-                        # Update all time best particle
-                        if fitness < self.best_particle_so_far.get_fitness():
-                            self.best_particle_so_far = self.particle_list[i].copy()
-                if opt_type == 'max':
-                    if old_fitness and (fitness > old_fitness):
-                        # Update particle best position
-                        position = self.particle_list[i].get_position()
-                        self.particle_list[i].update_particle_best_position(position)
-                        # Update swarm best position
-                        if fitness > self.best_particle_current.get_fitness() and synchronous:
-                            self.particle_list[i].update_swarm_best_position(position)
-                            self.best_particle_current = self.particle_list[i].copy()
-                        # Update all time best particle
-                        if fitness > self.best_particle_so_far.get_fitness():
-                            self.best_particle_so_far = self.particle_list[i].copy()
+        if self.chunk_size:
+            # Large-scale mode: constraints and model are evaluated one chunk at a time (cache and surrogate are not used)
+            N_new_evals = self.__evaluate_chunks(f_model, opt_type, pool, constraints)
+        else:
+            rows = np.arange(self.size)
+            if constraints is not None:
+                violations = constraints.get_violations(self.positions)
+                infeasible = violations > 0
+                if constraints.is_ranked():
+                    self.violations = violations
+                self.N_infeasible += int(infeasible.sum())
+                self.__update_bests(rows[infeasible], constraints.get_infeasible_fitness(violations[infeasible], opt_type), opt_type)
+                rows = rows[~infeasible]
+            if surrogate is not None:
+                self.fitness[rows] = np.nan
+                rows = rows[surrogate.select(self.positions[rows])]
+            positions = self.positions[rows]
+
+            # Get fitness for the particles
+            model = f_model
+            times = [] if self.profiler.is_enabled() else None
+            if cache is not None:
+                fitness, new_fitness = cache.evaluate(positions, lambda positions: pso_models.evaluate(model, self.search_space, positions, pool=pool, times=times))
             else:
-                self.N_failed_evals += 1
-
-        # if assynchronous then best swarm position is only updated after determining fitness for all particles
-        if not synchronous:
-            try:
-                if opt_type == 'min':
-                    reverse = False
-                else:
-                    reverse = True
-                best_swarm_particle = self.sorted_by_particle_fitness(reverse=reverse)[0]
-                best_swarm_position = best_swarm_particle.get_position()
-                # Update best particles
-                self.best_particle_current = best_swarm_particle.copy()
-                if self.best_particle_so_far:
-                    if opt_type == 'min' and fitness < self.best_particle_so_far.get_fitness():
-                        self.best_particle_so_far = best_swarm_particle.copy()
-                    if opt_type == 'max' and fitness > self.best_particle_so_far.get_fitness():
-                        self.best_particle_so_far = best_swarm_particle.copy()
-                else:
-                    self.best_particle_so_far = best_swarm_particle.copy()
-                # Update all particles
-                for i in range(len(self.particle_list)):
-                    self.particle_list[i].update_swarm_best_position(best_swarm_position)
-            except:
-                "Could not update best swarm position in assynchronous mode."
-
-        return [self.N_evals, self.N_failed_evals]
+                fitness = new_fitness = pso_models.evaluate(model, self.search_space, positions, pool=pool, times=times)
+            self.profiler.add_evaluation_times(times)
+            self.N_failed_evals = int(np.isnan(new_fitness).sum())
+            self.N_evals += new_fitness.shape[0]
+            if surrogate is not None:
+                surrogate.add(positions, fitness)
+            self.__update_bests(rows, fitness, opt_type)
+            N_new_evals = new_fitness.shape[0]
+        fitness = self.fitness
+
+        # if synchronous the swarm best position is the best position found so far, otherwise it is the best
+        # position of the current iteration, which is only known after determining fitness for all particles
+        if synchronous:
+            self.best_particle_current = self.best_particle_so_far
+        else:
+            sign = 1.0 if opt_type == 'min' else -1.0
+            score = np.where(np.isnan(fitness), np.inf, sign*fitness)
+            i_current = int(np.lexsort((score, self.violations))[0])
+            if np.isfinite(score[i_current]) or self.violations[i_current] > 0:
+                self.best_particle_current = Best_record.from_row(i_current+1, fitness[i_current], self.positions[i_current], self.search_space)
+                self.swarm_best_position = self.best_particle_current.get_position_row()
+            else:
+                warnings.warn("Could not update best swarm position in asynchronous mode: every evaluation failed")
+
+        return [N_new_evals, self.N_failed_evals]
+
+    def __evaluate_chunks(self, model, opt_type, pool=None, constraints=None):
+        """
+        Internal function that evaluates the swarm one chunk of rows at a time, so that the decoded inputs and the model
+        outputs never hold more than chunk_size rows.
+        return: number of evaluations
+        """
+        N_evals = 0
+        self.N_failed_evals = 0
+        times = [] if self.profiler.is_enabled() else None
+        for chunk in self.__chunks():
+            rows = np.arange(chunk.start, chunk.stop)
+            positions = self.positions[chunk]
+            if constraints is not None:
+                violations = constraints.get_violations(positions)
+                infeasible = violations > 0
+                if constraints.is_ranked():
+                    self.violations[chunk] = violations
+                self.N_infeasible += int(infeasible.sum())
+                self.__update_bests(rows[infeasible], constraints.get_infeasible_fitness(violations[infeasible], opt_type), opt_type)
+                rows = rows[~infeasible]
+                positions = positions[~infeasible]
+            fitness = pso_models.evaluate(model, self.search_space, positions, pool=pool, times=times)
+            self.N_failed_evals += int(np.isnan(fitness).sum())
+            N_evals += fitness.shape[0]
+            self.__update_bests(rows, fitness, opt_type)
+        self.profiler.add_evaluation_times(times)
+        self.N_evals += N_evals
+        return N_evals
+
+    def evaluate_steady_state(self, f_model, f_bound, opt_type, c_inertia, c_local, c_global, pool, n_evals, cache=None, constraints=None):
+        """
+        Function that completes exactly n_evals evaluations in steady-state mode: as soon as the evaluation of a particle returns,
+        its bests are updated, it is moved and it is resubmitted, without waiting for the rest of the swarm.
+        Positions held in the cache, and infeasible positions, complete immediately without being submitted.
+        Evaluations still running when the function returns are kept in flight for the next call (see stop_steady_state),
+        and the evaluations in flight when a checkpoint was saved are submitted again at the same positions.
+        return: number of evaluations and number of failed evaluations in this call
+        """
+        model = f_model
+        for i in self.resubmit_rows:
+            self.__submit_particle(i, model, f_bound, opt_type, c_inertia, c_local, c_global, pool, cache, constraints, move=False)
+        self.resubmit_rows = []
+        in_flight = set(pending[0] for pending in self.pending.values())
+        for i in range(self.size):
+            if i not in in_flight:
+                self.__submit_particle(i, model, f_bound, opt_type, c_inertia, c_local, c_global, pool, cache, constraints)
+
+        N_completed = 0
+        N_evals = 0
+        self.N_failed_evals = 0
+        while N_completed < n_evals:
+            done, _ = concurrent.futures.wait(self.pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            # Only n_evals results are taken: the other completed evaluations stay pending for the next call
+            for future in list(done)[:n_evals - N_completed]:
+                i, key, cached = self.pending.pop(future)
+                fitness, times = future.result()
+                N_completed += 1
+                if not cached:
+                    self.profiler.add_evaluation_times(times)
+                    N_evals += 1
+                    self.N_failed_evals += int(np.isnan(fitness[0]))
+                    if cache is not None:
+                        cache.store(key, float(fitness[0]))
+                self.__update_bests(np.array([i]), fitness, opt_type)
+                self.__submit_particle(i, model, f_bound, opt_type, c_inertia, c_local, c_global, pool, cache, constraints)
+        self.N_evals += N_evals
+        self.best_particle_current = self.best_particle_so_far
+        return [N_evals, self.N_failed_evals]
+
+    def replace_particles(self, rows, positions, fitness, opt_type):
+        """
+        Function that replaces the particles in the given rows by particles of known fitness coming from elsewhere
+        (e.g. migrants from another island). Their velocities are kept and their bests are reset to the new positions.
+        """
+        rows = np.asarray(rows)
+        self.positions[rows] = positions
+        self.best_fitness[rows] = np.nan
+        self.violations[rows] = 0.0
+        self.best_violations[rows] = np.inf
+        self.__update_bests(rows, np.asarray(fitness, dtype=float), opt_type)
+        return 0
+
+    def stop_steady_state(self):
+        """
+        Function that cancels the evaluations left in flight by evaluate_steady_state.
+        """
+        for future in self.pending:
+            future.cancel()
+        self.pending = {}
+        self.resubmit_rows = []
+        return 0
+
+    def __submit_particle(self, i, model, f_bound, opt_type, c_inertia, c_local, c_global, pool, cache=None, constraints=None, move=True):
+        """
+        Internal function that moves a single particle (unless move is False) and submits its evaluation to the pool (or
+        completes it from the cache, or with the fitness of the constraint handling if it is infeasible).
+        """
+        rows = slice(i, i+1)
+        if move:
+            velocity = self.__new_velocities(rows, c_inertia, c_local, c_global)
+            self.positions[rows], self.velocities[rows] = self.__new_positions(self.positions[rows], velocity, f_bound)
+        key = None
+        cached = None
+        if constraints is not None:
+            violations = constraints.get_violations(self.positions[rows])
+            if constraints.is_ranked():
+                self.violations[rows] = violations
+            if violations[0] > 0:
+                self.N_infeasible += 1
+                future = concurrent.futures.Future()
+                future.set_result((constraints.get_infeasible_fitness(violations, opt_type), np.empty(0)))
+                self.pending[future] = (i, key, True)
+                return 0
+        if cache is not None:
+            key = cache.get_keys(self.positions[rows])[0]
+            cached = cache.lookup(key)
+        if cached is None:
+            future = pso_models.submit(model, self.search_space, self.positions[rows], pool)
+        else:
+            future = concurrent.futures.Future()
+            future.set_result((np.array([cached]), np.empty(0)))
+        self.pending[future] = (i, key, cached is not None)
+        return 0
+
+    def __update_bests(self, rows, fitness, opt_type):
+        """
+        Internal function that stores the fitness of the given rows and updates the particle and all time bests (failed evaluations are never an improvement).
+        Positions are compared by total constraint violation first and by fitness second (feasibility rules); without
+        ranked constraints all the violations are 0 and only the fitness is compared.
+        """
+        self.fitness[rows] = fitness
+        sign = 1.0 if opt_type == 'min' else -1.0
+        score = np.where(np.isnan(fitness), np.inf, sign*fitness)
+        best_score = np.where(np.isnan(self.best_fitness[rows]), np.inf, sign*self.best_fitness[rows])
+        violation = self.violations[rows]
+        best_violation = self.best_violations[rows]
+        improved = ((violation < best_violation) | ((violation == best_violation) & (score < best_score))) \
+            & ~(np.isnan(fitness) & (violation == 0))
+        improved_rows = rows[improved]
+        self.N_improved += improved_rows.size
+        if improved_rows.size == 0:
+            return 0
+        self.best_positions[improved_rows] = self.positions[improved_rows]
+        self.best_fitness[improved_rows] = fitness[improved]
+        self.best_violations[improved_rows] = violation[improved]
+
+        # Update all time best particle and swarm best position
+        i = int(np.lexsort((score[improved], violation[improved]))[0])
+        i_best = int(improved_rows[i])
+        if self.best_particle_so_far is None or violation[improved][i] < self.best_violation_so_far or \
+                (violation[improved][i] == self.best_violation_so_far and score[improved][i] < sign*self.best_particle_so_far.get_fitness()):
+            self.best_particle_so_far = Best_record.from_row(i_best+1, self.best_fitness[i_best], self.best_positions[i_best], self.search_space)
+            self.best_violation_so_far = float(violation[improved][i])
+            self.swarm_best_position = self.best_particle_so_far.get_position_row()
+        return 0
 
 
 class pso(object):
@@ -364,6 +830,7 @@ class pso(object):
         self.N_iter = 0
         self.params = params
         self.search_space = Search_space(search_space)
+        self.search_space.compile()
         self.seed = params['seed']
         self.swarm_size = params['swarm_size']
         self.max_iter = params['max_iterations']
@@ -372,8 +839,19 @@ class pso(object):
         self.N_evals = 0
         self.N_failed_evals = 0
         self.statistics = {}
-        self.write = {}
+        self.write = {'generation row index': 13}
+        self.cache = None
+        self.surrogate = None
+        self.results_log = None
+        self.termination = None
+        self.schedule = None
+        self.profiler = pso_profiling.Profiler(enabled=params.get('profiling', False))
         self.synchronous = params['synchronous']
+        self.steady_state = params.get('steady_state', False)
+        # Large-scale mode (float32 storage and chunked updates and evaluations, see pso_large_scale)
+        self.dtype, self.chunk_size = pso_large_scale.get_settings(params)
+        if self.chunk_size:
+            self.steady_state = False
         self.opt_type = params['opt_type']
         if self.opt_type == 'min':
             self.reverse = False
@@ -382,17 +860,24 @@ class pso(object):
 
     def __create_output_dir(self):
         """
-        Internal function that creates the output dir and copies the template file
+        Internal function that creates the output dir, named after the current date_time
+        """
+        import datetime
+        import lib_directory_ops
+        # Runs started within the same second get a numbered suffix
+        output_dir, dir_name = lib_directory_ops.create_unique_dir(self.params['Excel output dir'], datetime.datetime.now().strftime("%d%m%Y_%H%M%S"))
+        self.write['output dir'] = output_dir
+        self.write['output name'] = 'output_' + dir_name
+
+    def __create_output_file(self):
         """
-        # Create results directory and create output file from template
-        dir_name = datetime.datetime.now().strftime("%d%m%Y_%H%M%S")
-        output_dir = lib_directory_ops.create_dir(self.params['Excel output dir'], dir_name)
-        assert output_dir != None
-        new_file = 'output_' + dir_name + '.xlsx'
-        output_file = lib_path_ops.join_paths(output_dir, new_file)
+        Internal function that copies the template file to the output dir
+        """
+        import lib_file_ops
+        import lib_path_ops
+        output_file = lib_path_ops.join_paths(self.write['output dir'], self.write['output name'] + '.xlsx')
         r = lib_file_ops.copy_file(self.params['Excel template file'], output_file)
         self.params['Excel output file'] = output_file
-        self.write['generation row index'] = 13
         assert r != None
 
     def __write_parameters(self):
@@ -416,45 +901,72 @@ class pso(object):
         Internal function that writes the optimal point
         """
         ws = self.wb["Optimisation"]
-        if self.params['write_to_console']:
-            print("\nOptimal point:")
         # Write optimal point
         col_i = 2
         for v in self.search_space.get_variables_names():
             ws.cell(row=5, column=col_i, value=v)
             ws.cell(row=6, column=col_i, value=self.best_particle.get_position()[v])
-            if self.params['write_to_console']:
-                s = '{}: {}'.format(v, self.best_particle.get_position()[v])
-                print(s)
             col_i += 1
         return 0
 
-    def __write_iteration(self):
+    def __print_optimal_point(self):
+        """
+        Internal function that writes the optimal point to the console
+        """
+        print("\nStopped after {} iterations: {}".format(self.N_iter, self.statistics['Termination reason']))
+        print("\nOptimal point:")
+        for v, value in self.best_particle.get_position().items():
+            print('{}: {}'.format(v, value))
+        return 0
+
+    def __write_iteration(self, swarm, N_evals, N_failed_evals):
+        """
+        Internal function that appends the generation results to the results log
+        """
+        self.results_log.write_iteration(self.N_iter, self.best_particle, N_evals, N_failed_evals, swarm=swarm)
+
+        # Write to console
+        if self.params['write_to_console']:
+            s = "\t{}\t{}".format(self.N_iter, self.best_particle.get_fitness())
+            print(s)
+        return 0
+
+    def __write_iterations(self):
         """
-        Internal function that writes the generation results
+        Internal function that writes the generation results, read back from the results log
         """
         ws = self.wb["Optimisation"]
+        # The generation rows start below the last row of the template, whose last row is the header of the table
+        self.write['generation row index'] = ws.max_row + 1
         # Write variables names
         col_i = 3
         for v in self.search_space.get_variables_names():
-            ws.cell(row=12, column=col_i, value=v)
+            ws.cell(row=self.write['generation row index']-1, column=col_i, value=v)
             col_i += 1
         # Write generation info
-        row_i = self.write['generation row index']
-        ws.cell(row=row_i, column=1, value=self.N_iter)
-        ws.cell(row=row_i, column=2, value=self.best_particle.get_fitness())
-        col_i = 3
-        for v in self.search_space.get_variables_names():
-            ws.cell(row=row_i, column=col_i, value=self.best_particle.get_position()[v])
-            col_i += 1
-        self.write['generation row index'] += 1
-
-        # Write to console
-        if self.params['write_to_console']:
-            s = "\t{}\t{}".format(self.N_iter, self.best_particle.get_fitness())
-            print(s)
+        for row in self.__iteration_rows():
+            for col_i, value in enumerate(row):
+                ws.cell(row=self.write['generation row index'], column=col_i+1, value=value)
+            self.write['generation row index'] += 1
         return 0
 
+    def __iteration_rows(self):
+        """
+        Internal function that reads the generation results back from the results log, as rows of the Optimisation sheet
+        """
+        vars_names = self.search_space.get_variables_names()
+        for N_iter, fitness, position, N_evals, N_failed_evals in self.results_log.read_iterations():
+            yield [N_iter, fitness] + [position[v] for v in vars_names]
+
+    def __trajectory_rows(self):
+        """
+        Internal function that reads the state of every particle back from the swarm log, as rows of the Trajectories sheets
+        """
+        for row in self.results_log.read_swarm_states():
+            if row[2] != row[2]: # failed evaluation (NaN)
+                row[2] = None
+            yield row
+
     def __write_statistics(self):
         """
         Internal function that writes the statistics
@@ -463,55 +975,286 @@ class pso(object):
         # Write statistics
         ws.cell(row=3, column=2, value=self.statistics['N_failed_evals'])
         ws.cell(row=4, column=2, value=self.statistics['N_evals'])
+        ws.cell(row=6, column=1, value='Termination reason')
+        ws.cell(row=6, column=2, value=self.statistics['Termination reason'])
+        if self.cache is not None:
+            ws.cell(row=7, column=1, value='Cache hits')
+            ws.cell(row=7, column=2, value=self.cache.get_hits())
+            ws.cell(row=8, column=1, value='Cache misses')
+            ws.cell(row=8, column=2, value=self.cache.get_misses())
+        if self.surrogate is not None:
+            ws.cell(row=9, column=1, value='Screened out by surrogate')
+            ws.cell(row=9, column=2, value=self.surrogate.get_N_screened())
+        if self.params.get('constraints'):
+            ws.cell(row=10, column=1, value='Infeasible positions (not evaluated)')
+            ws.cell(row=10, column=2, value=self.statistics['N_infeasible'])
+        if self.profiler.is_enabled():
+            row_i = 12
+            ws.cell(row=row_i, column=1, value='Profiling')
+            for label, value in self.profiler.get_summary():
+                row_i += 1
+                ws.cell(row=row_i, column=1, value=label)
+                ws.cell(row=row_i, column=2, value=value)
         return 0
 
-    def execute(self):
+    def __export_excel(self):
         """
-        Main function of the class, as it runs the pso algorithm.
+        Internal function that builds the excel report (parameters, evolution, optimal point and statistics) from the results log
         """
+        # openpyxl is only imported when the excel report is written
+        import lib_excel_ops_openpyxl as lib_excel
+        self.__create_output_file()
+        self.wb = lib_excel.open_workbook(self.params['Excel output file'])
+        self.__write_parameters()
+        self.__write_iterations()
+        self.__write_optimal_point()
+        self.__write_statistics()
+        lib_excel.save_workbook(self.wb, self.params['Excel output file'])
+        self.wb.close()
+        return 0
 
-        # Get functions
-        f_model = 'models.' + self.params['model_function']
-        if self.params['enforce_bounds']:
-            f_bound = 'pso_bound.' + self.params['enforce_bounds_function']
-        else:
-            f_bound = None
+    def __export_excel_streaming(self):
+        """
+        Internal function that builds the excel report from the results log using write-only worksheets, so that memory stays
+        bounded whatever the number of iterations. The template values are copied but not its formatting. If the swarm state
+        was logged, the trajectories of all particles are written as well.
+        """
+        import lib_excel_ops_openpyxl as lib_excel
+        import lib_path_ops
+        output_file = lib_path_ops.join_paths(self.write['output dir'], self.write['output name'] + '.xlsx')
+        self.params['Excel output file'] = output_file
 
-        # Get constants
-        c_inertia = self.params['inertia_weight']
-        c_local = self.params['acceleration_constant_local']
-        c_global = self.params['acceleration_constant_global']
-
-        # Initialise and evaluate population
-        swarm = Swarm(self.search_space, self.params)
-        swarm.initialise(self.swarm_size, f_bound, seed=self.seed)
-        N_evals, N_failed_evals = swarm.evaluate(f_model, self.opt_type, synchronous=False) # False to make sure all particles are correctly initialized
+        # Write the small sheets in memory, on top of the template values
+        template = lib_excel.open_workbook_read_only(self.params['Excel template file'])
+        self.wb = {}
+        for title in lib_excel.get_worksheet_names(template):
+            self.wb[title] = lib_excel.Buffered_worksheet(template[title])
+        template.close()
+        # The generation rows start below the last row of the template, as in __write_iterations
+        self.write['generation row index'] = self.wb["Optimisation"].get_max_row() + 1
+        self.__write_parameters()
+        self.__write_optimal_point()
+        self.__write_statistics()
+        col_i = 3
+        for v in self.search_space.get_variables_names():
+            self.wb["Optimisation"].cell(row=self.write['generation row index']-1, column=col_i, value=v)
+            col_i += 1
+
+        # Stream all sheets to the output file
+        wb = lib_excel.create_write_only_workbook()
+        for title, buffered_ws in self.wb.items():
+            ws = lib_excel.create_worksheet(wb, title)
+            if title == "Optimisation":
+                lib_excel.append_rows(ws, buffered_ws.get_rows(n_rows=self.write['generation row index']-1))
+                lib_excel.append_rows(ws, self.__iteration_rows())
+            else:
+                lib_excel.append_rows(ws, buffered_ws.get_rows())
+        if self.results_log.get_swarm_path():
+            header = ['Iteration', 'Particle', 'Fitness'] + list(self.search_space.get_variables_names())
+            lib_excel.write_table_streaming(wb, 'Trajectories', self.__trajectory_rows(), header=header)
+        lib_excel.save_workbook(wb, output_file)
+        return 0
+
+    def __save_checkpoint(self, swarm):
+        """
+        Internal function that saves the full state of the run, so that it can be resumed from this iteration
+        """
+        import pso_checkpoint
+        arrays, metadata = swarm.get_state()
+        rng_arrays, rng_metadata = pso_checkpoint.get_rng_state(swarm.rng)
+        arrays.update(rng_arrays)
+        metadata.update(rng_metadata)
+        if self.cache is not None:
+            cache_arrays, cache_metadata = self.cache.get_state()
+            arrays.update(cache_arrays)
+            metadata.update(cache_metadata)
+        if self.surrogate is not None:
+            surrogate_arrays, surrogate_metadata = self.surrogate.get_state()
+            arrays.update(surrogate_arrays)
+            metadata.update(surrogate_metadata)
+        if swarm.topology is not None:
+            topology_arrays, topology_metadata = swarm.topology.get_state()
+            arrays.update(topology_arrays)
+            metadata.update(topology_metadata)
+        metadata.update(self.termination.get_state())
+        metadata.update(self.schedule.get_state())
+        metadata.update({'N_iter': self.N_iter, 'statistics': self.statistics, 'write': self.write,
+                         'results log sizes': self.results_log.tell(), 'schedule log size': self.schedule.tell()})
+        pso_checkpoint.save_checkpoint(self.params['Checkpoint file'], arrays, metadata)
+        return 0
+
+    def __load_checkpoint(self, checkpoint_file, swarm):
+        """
+        Internal function that restores the state of a run saved with __save_checkpoint
+        """
+        import pso_checkpoint
+        arrays, metadata = pso_checkpoint.load_checkpoint(checkpoint_file)
+        swarm.set_state(arrays, metadata)
+        swarm.set_topology(pso_topologies.create_topology(self.params, swarm.get_size(), swarm.rng))
+        if swarm.topology is not None:
+            swarm.topology.set_state(arrays, metadata)
+        pso_checkpoint.set_rng_state(swarm.rng, metadata)
+        if self.cache is not None and 'cache' in metadata:
+            self.cache.set_state(arrays, metadata)
+        if self.surrogate is not None and 'surrogate' in metadata:
+            self.surrogate.set_state(arrays, metadata)
+        self.N_iter = metadata['N_iter']
+        self.statistics = metadata['statistics']
+        self.write = metadata['write']
         self.best_particle = swarm.get_best_particle_current()
+        self.params['Checkpoint file'] = checkpoint_file
+        return metadata
 
-        # Statistics
-        self.statistics['N_evals'] = N_evals
-        self.statistics['N_failed_evals'] = N_failed_evals
+    def __create_results_log(self):
+        """
+        Internal function that creates the results log in the output dir
+        """
+        import pso_results
+        import lib_path_ops
+        self.results_log = pso_results.create_results_log(self.search_space, lib_path_ops.join_paths(self.write['output dir'], self.write['output name']),
+                                                          self.params.get('results_format', 'csv'), self.params.get('results_flush_every', 10),
+                                                          self.params.get('results_write_swarm', False))
+        self.params['Results log file'] = self.results_log.get_path()
+        if self.profiler.is_enabled():
+            self.params['Metrics file'] = lib_path_ops.join_paths(self.write['output dir'], self.write['output name'] + '_metrics.csv')
+        self.params['Schedule file'] = lib_path_ops.join_paths(self.write['output dir'], self.write['output name'] + '_schedule.csv')
+        return 0
 
-        # Create output directory and files
-        self.__create_output_dir()
-        self.wb = lib_excel.open_workbook(self.params['Excel output file'])
+    def resume(self, checkpoint_file):
+        """
+        Function that resumes a run from a checkpoint file and continues it up to max_iterations.
+        The results are appended to the output dir of the checkpointed run.
+        """
+        return self.execute(checkpoint_file=checkpoint_file)
 
-        # Write initial results
-        if self.params['write_to_console']:
-            print("\nIter.\tFitness")
-        self.__write_parameters()
-        self.__write_iteration()
+    def execute(self, checkpoint_file=None, pool=None):
+        """
+        Main function of the class, as it runs the pso algorithm (from a checkpoint file, if given).
+        An evaluation pool started by the caller (e.g. shared by several runs) can be given; it is not closed at the end.
+        """
+
+        # Get functions, resolved once for the whole run
+        f_model, f_bound = pso_registry.get_functions(self.params)
+
+        # Start the evaluation pool, reused for every iteration
+        own_pool = None
+        if pool is None and (self.params.get('parallel_evaluation', False) or self.steady_state):
+            own_pool = pso_registry.create_pool(f_model, self.params)
+            own_pool.start()
+            pool = own_pool
+        try:
+            return self.__run(f_model, f_bound, pool, checkpoint_file)
+        finally:
+            if own_pool is not None:
+                own_pool.close()
+
+    def __run(self, f_model, f_bound, pool, checkpoint_file=None):
+        """
+        Internal function that runs the pso iterations and writes the results.
+        """
+        # Get constants
+        self.schedule = pso_schedules.Schedule(self.params)
+        checkpoint_every = self.params.get('checkpoint_every', 0)
+        self.termination = pso_termination.Termination_criteria(self.params, self.opt_type)
+
+        # Evaluation cache (not used in large-scale mode)
+        cache = None
+        if self.params.get('cache_evaluations', False) and not self.chunk_size:
+            import pso_cache
+            cache = pso_cache.Evaluation_cache(self.search_space, self.params.get('cache_size', 100000), self.params.get('cache_tolerance', 0.0))
+        self.cache = cache
+
+        # Surrogate pre-screening (not used in steady-state nor large-scale mode)
+        surrogate = None
+        if self.params.get('surrogate', False) and not self.steady_state and not self.chunk_size:
+            import pso_surrogate
+            surrogate = pso_surrogate.Surrogate(self.search_space, self.opt_type, self.params.get('surrogate_fraction', 0.3),
+                                                self.params.get('surrogate_exploration', 0.1), self.params.get('surrogate_min_points'),
+                                                self.params.get('surrogate_max_points', 500))
+        self.surrogate = surrogate
+
+        # Constraints checked before calling the model
+        constraints = None
+        if self.params.get('constraints'):
+            import pso_constraints
+            constraints = pso_constraints.create_constraints(self.search_space, self.params.get('constraints'), self.params)
+
+        # Memory footprint of a large-scale swarm, reported before the run starts
+        if self.chunk_size:
+            estimate = pso_large_scale.estimate_memory(self.swarm_size, self.search_space.get_number_variables(), self.dtype, self.chunk_size)
+            self.params['Memory estimate (MB)'] = round(estimate['total']/pso_large_scale.MB, 1)
+            if self.params['write_to_console']:
+                print(pso_large_scale.format_memory(estimate))
+
+        swarm = Swarm(self.search_space, self.seed, self.dtype, self.chunk_size)
+        swarm.set_profiler(self.profiler)
+        if checkpoint_file:
+            # Restore swarm and continue the results log from the checkpoint
+            metadata = self.__load_checkpoint(checkpoint_file, swarm)
+            self.__create_results_log()
+            self.results_log.truncate(metadata['results log sizes'])
+            self.results_log.open(mode='a')
+            self.profiler.open(self.params.get('Metrics file'), mode='a')
+            self.schedule.truncate(self.params['Schedule file'], metadata.get('schedule log size', 0))
+            self.schedule.open(self.params['Schedule file'], mode='a')
+            if 'schedule' in metadata:
+                self.schedule.set_state(metadata)
+            if self.params['write_to_console']:
+                print("\nResuming from iteration {}".format(self.N_iter))
+                print("\nIter.\tFitness")
+            self.termination.set_state(metadata)
+            self.termination.recheck(self.N_iter, self.statistics['N_evals'], swarm)
+        else:
+            # Initialise and evaluate population
+            swarm.initialise(self.swarm_size, f_bound)
+            swarm.set_topology(pso_topologies.create_topology(self.params, self.swarm_size, swarm.rng))
+            with self.profiler.phase('evaluate'):
+                N_evals, N_failed_evals = swarm.evaluate(f_model, self.opt_type, synchronous=False, pool=pool, cache=cache, surrogate=surrogate, constraints=constraints) # False to make sure all particles are correctly initialized
+            self.best_particle = swarm.get_best_particle_current()
+
+            # Statistics
+            self.statistics['N_evals'] = N_evals
+            self.statistics['N_failed_evals'] = N_failed_evals
+
+            # Create output directory and results log
+            self.__create_output_dir()
+            import lib_path_ops
+            self.params['Checkpoint file'] = lib_path_ops.join_paths(self.write['output dir'], self.write['output name'] + '_checkpoint.npz')
+            self.__create_results_log()
+            self.results_log.open()
+            self.profiler.open(self.params.get('Metrics file'))
+            self.schedule.open(self.params['Schedule file'])
+            self.schedule.start(swarm)
+
+            # Write initial results
+            if self.params['write_to_console']:
+                print("\nIter.\tFitness")
+            with self.profiler.phase('write_results'):
+                self.__write_iteration(swarm, N_evals, N_failed_evals)
+            self.profiler.end_iteration(self.N_iter, N_evals)
+            self.termination.check(self.N_iter, self.best_particle.get_fitness(), self.statistics['N_evals'], swarm)
 
         # Determine next iteration
-        while self.N_iter < self.max_iter:
-            # Update velocity
-            swarm.update_velocity(c_inertia, c_local, c_global, seed=self.seed)
+        reason = self.termination.get_reason()
+        while not reason:
+            if swarm.topology is not None:
+                swarm.topology.next_iteration(self.N_iter + 1)
+            c_inertia, c_local, c_global = self.schedule.get_coefficients(self.N_iter + 1, swarm)
+            if self.steady_state:
+                # Move and evaluate each particle as soon as its previous evaluation returns (an iteration is swarm_size evaluations)
+                with self.profiler.phase('evaluate'):
+                    N_evals, N_failed_evals = swarm.evaluate_steady_state(f_model, f_bound, self.opt_type, c_inertia, c_local, c_global, pool, self.swarm_size, cache=cache, constraints=constraints)
+            else:
+                # Update velocity
+                with self.profiler.phase('update_velocity'):
+                    swarm.update_velocity(c_inertia, c_local, c_global)
 
-            # Update position
-            swarm.update_position(f_bound, seed=self.seed)
+                # Update position (timed inside the swarm, separately from bounds enforcement)
+                swarm.update_position(f_bound)
 
-            # Evaluate swarm
-            N_evals, N_failed_evals = swarm.evaluate(f_model, self.opt_type, synchronous=self.synchronous)
+                # Evaluate swarm
+                with self.profiler.phase('evaluate'):
+                    N_evals, N_failed_evals = swarm.evaluate(f_model, self.opt_type, synchronous=self.synchronous, pool=pool, cache=cache, surrogate=surrogate, constraints=constraints)
             self.best_particle = swarm.get_best_particle_current()
 
             # Increment iteration
@@ -522,15 +1265,38 @@ class pso(object):
             self.statistics['N_failed_evals'] += N_failed_evals
 
             # Write results
-            self.__write_iteration()
-
-        # Write optimal results and statistics
-        self.__write_optimal_point()
-        self.__write_statistics()
+            with self.profiler.phase('write_results'):
+                self.__write_iteration(swarm, N_evals, N_failed_evals)
+            self.profiler.end_iteration(self.N_iter, N_evals)
+            self.schedule.write_iteration(self.N_iter)
+            if self.N_iter % self.params.get('results_flush_every', 10) == 0:
+                self.profiler.flush()
+                self.schedule.flush()
+
+            # Check termination criteria
+            reason = self.termination.check(self.N_iter, self.best_particle.get_fitness(), self.statistics['N_evals'], swarm)
+
+            # Save checkpoint
+            if checkpoint_every and self.N_iter % checkpoint_every == 0:
+                self.__save_checkpoint(swarm)
+
+        swarm.stop_steady_state()
+        self.statistics['Termination reason'] = reason
+        self.statistics['N_infeasible'] = swarm.N_infeasible
+        self.statistics['Wall time'] = self.termination.get_wall_time()
+
+        self.results_log.close()
+        self.profiler.close()
+        self.schedule.close()
+        if self.params['write_to_console']:
+            self.__print_optimal_point()
 
-        # Close necessary files
-        lib_excel.save_workbook(self.wb, self.params['Excel output file'])
-        self.wb.close()
+        # Export the results to excel
+        if self.params.get('write_excel', True):
+            if self.params.get('excel_streaming', False):
+                self.__export_excel_streaming()
+            else:
+                self.__export_excel()
 
         return self.best_particle
 
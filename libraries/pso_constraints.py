@@ -0,0 +1,113 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Constraints are declared in the 'Constraints' section of inputs.yaml, one per line, either as:
+#   - an inequality between two expressions of the decision variables, e.g. c1: 'x1 + 2*x2 <= 100'
+#     (operators <=, >=, < and >, the strict ones being treated as the others; numpy functions are available as np,
+#     e.g. 'np.sqrt(x1) > x2')
+#   - the name of a function in models.py, or a module:function reference (see pso_registry), which receives a dictionary with one array per variable (as batch models
+#     with inputs='dict') and returns either the constraint values g, feasible where g <= 0, or a boolean array that
+#     is True where feasible
+# All the constraints are checked on the whole swarm in one pass, before the model is called, and the model is only
+# called for the feasible particles. The infeasible ones are handled according to constraint_handling:
+#   - penalty: their fitness is constraint_penalty*(1 + total violation) (its negative when maximising)
+#   - feasibility: their fitness is NaN and they are ranked by the feasibility rules: a feasible particle is better than
+#     an infeasible one and, between infeasible particles, the one with the smallest total violation is better
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import re
+import numpy as np
+import models
+import pso_registry
+
+
+#----------------------------------------------------------------------------------------
+# CONSTANTS
+#----------------------------------------------------------------------------------------
+HANDLING = ('penalty', 'feasibility')
+INEQUALITY = re.compile(r'(<=|>=|<|>)')
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Constraints(object):
+    """ Creates the set of constraints of a search space """
+    def __init__(self, search_space, constraints, handling='penalty', penalty=1.0e10):
+        if handling not in HANDLING:
+            raise ValueError("Unknown constraint handling <{}>. Possible values: {}".format(handling, ', '.join(HANDLING)))
+        self.search_space = search_space
+        self.handling = handling
+        self.penalty = float(penalty)
+        self.constraints = [(name, _compile(name, definition)) for name, definition in constraints.items()]
+
+    def get_names(self):
+        return [name for name, _ in self.constraints]
+
+    def is_ranked(self):
+        """
+        Function that returns True if the infeasible particles are ranked by their violation (feasibility rules).
+        """
+        return self.handling == 'feasibility'
+
+    def get_violations(self, positions):
+        """
+        Function that returns the total violation of every encoded position (0 where all constraints are satisfied).
+        """
+        inputs = self.search_space.decode_positions(positions)
+        violations = np.zeros(positions.shape[0])
+        for name, f in self.constraints:
+            g = np.asarray(f(inputs))
+            if g.dtype == bool:
+                g = np.where(g, 0.0, 1.0)
+            violations += np.maximum(np.broadcast_to(g.astype(float), violations.shape), 0.0)
+        return violations
+
+    def get_infeasible_fitness(self, violations, opt_type):
+        """
+        Function that returns the fitness given to infeasible positions, instead of calling the model.
+        """
+        if self.is_ranked():
+            return np.full(violations.shape, np.nan)
+        sign = 1.0 if opt_type == 'min' else -1.0
+        return sign*self.penalty*(1.0 + violations)
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def _compile(name, definition):
+    """
+    Function that turns the definition of a constraint into a function of the inputs dictionary returning g (g <= 0 feasible).
+    """
+    parts = INEQUALITY.split(definition)
+    if len(parts) == 1:
+        try:
+            return pso_registry.resolve(definition.strip(), models, pso_registry.CONSTRAINTS_GROUP)
+        except ValueError as e:
+            raise ValueError("Constraint <{}>: <{}> is neither an inequality nor a function ({})".format(name, definition, e))
+    if len(parts) != 3:
+        raise ValueError("Constraint <{}>: <{}> must have exactly one of the operators <=, >=, < or >".format(name, definition))
+    lhs, operator, rhs = parts
+    if operator in ('<=', '<'):
+        expression = compile('({}) - ({})'.format(lhs, rhs), name, 'eval')
+    else:
+        expression = compile('({}) - ({})'.format(rhs, lhs), name, 'eval')
+    return lambda inputs: eval(expression, {'np': np, '__builtins__': {}}, inputs)
+
+
+def create_constraints(search_space, constraints, params):
+    """
+    Function that creates the constraints declared in the inputs file.
+    return: a Constraints, or None if there are no constraints
+    """
+    if not constraints:
+        return None
+    return Constraints(search_space, constraints, params.get('constraint_handling', 'penalty'), params.get('constraint_penalty', 1.0e10))
@@ -0,0 +1,299 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Island mode: the swarm is split into islands sub-swarms, each one kept in its own process for the whole run.
+# Every island_migration_every iterations the islands send their island_migrants best particles (personal bests and
+# their fitness, a few small arrays) to the coordinator, which forwards them according to the migration topology:
+#   - ring: island i receives the migrants of island i-1
+#   - fully_connected: every island receives the best migrants among those of all the other islands
+# and the receiving island replaces some of its particles according to the replacement policy:
+#   - worst: the worst particles are replaced
+#   - worst_if_better: the worst particles are replaced, but only by better migrants
+#   - random: random particles, other than the best one of the island, are replaced
+# The islands evaluate their particles serially (the islands are the parallelism), so parallel_evaluation, steady_state
+# and cache_evaluations are not used. The coordinator writes the results log of the best island at every iteration
+# and a summary of the islands; the termination criteria apply, except termination_min_diversity. The inertia and
+# acceleration schedules are followed by every island, with the feedback of its own swarm, but not logged.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import csv
+import datetime
+import traceback
+import multiprocessing
+import numpy as np
+import lib_directory_ops
+import lib_path_ops
+import pso_results
+import pso_termination
+import pso_random
+import pso_topologies
+import pso_constraints
+import pso_schedules
+import pso_registry
+import pso_classes as pso
+
+
+#----------------------------------------------------------------------------------------
+# CONSTANTS
+#----------------------------------------------------------------------------------------
+TOPOLOGIES = ('ring', 'fully_connected')
+REPLACEMENT_POLICIES = ('worst', 'worst_if_better', 'random')
+SUMMARY_COLUMNS = ['island', 'seed', 'size', 'best_fitness', 'N_evals', 'N_failed_evals']
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def get_island_sizes(swarm_size, n_islands):
+    """
+    Function that splits the swarm size among the islands (the first islands take the remainder).
+    """
+    return [swarm_size//n_islands + (1 if i < swarm_size % n_islands else 0) for i in range(n_islands)]
+
+
+def get_emigrants(swarm, n_migrants, opt_type):
+    """
+    Function that returns the n_migrants best personal best positions of a swarm and their fitness.
+    """
+    sign = 1.0 if opt_type == 'min' else -1.0
+    score = np.where(np.isnan(swarm.best_fitness), np.inf, sign*swarm.best_fitness)
+    rows = np.argsort(score, kind='stable')[:n_migrants]
+    rows = rows[np.isfinite(score[rows])]
+    return swarm.best_positions[rows].copy(), swarm.best_fitness[rows].copy()
+
+
+def route_migrants(emigrants, topology, n_migrants, opt_type):
+    """
+    Function that determines the migrants received by each island, given the emigrants of every island.
+    :param emigrants: list of (positions, fitness) for each island
+    :return: list of (positions, fitness) for each island
+    """
+    n_islands = len(emigrants)
+    if topology == 'ring':
+        return [emigrants[(i - 1) % n_islands] for i in range(n_islands)]
+    sign = 1.0 if opt_type == 'min' else -1.0
+    immigrants = []
+    for i in range(n_islands):
+        others = [emigrants[j] for j in range(n_islands) if j != i]
+        positions = np.vstack([e[0] for e in others])
+        fitness = np.concatenate([e[1] for e in others])
+        rows = np.argsort(sign*fitness, kind='stable')[:n_migrants]
+        immigrants.append((positions[rows], fitness[rows]))
+    return immigrants
+
+
+def select_replaced(swarm, fitness, policy, opt_type):
+    """
+    Function that selects the rows of a swarm to be replaced by migrants with the given fitness.
+    :return: rows to be replaced and mask of the migrants that replace them
+    """
+    sign = 1.0 if opt_type == 'min' else -1.0
+    score = np.where(np.isnan(swarm.fitness), np.inf, sign*swarm.fitness)
+    n = min(len(fitness), swarm.size - 1)
+    accepted = np.zeros(len(fitness), dtype=bool)
+    accepted[:n] = True
+    if policy == 'random':
+        candidates = np.delete(np.arange(swarm.size), np.argmin(score))
+        rows = swarm.rng.choice(candidates, n, replace=False)
+    else:
+        rows = np.argsort(-score, kind='stable')[:n]
+        if policy == 'worst_if_better':
+            accepted[:n] = sign*fitness[:n] < score[rows]
+            rows = rows[accepted[:n]]
+    return rows, accepted
+
+
+def _iteration_record(swarm, N_evals, N_failed_evals):
+    best = swarm.get_best_particle_current()
+    return best.p_id, best.get_fitness(), np.array(best.get_position_row()), N_evals, N_failed_evals
+
+
+def _island_worker(conn, search_space, params, seed, size):
+    """
+    Function that runs in the process of an island: it initialises its swarm and then, for every command of the
+    coordinator, receives the immigrants, runs a number of iterations and sends back their records and its emigrants.
+    """
+    try:
+        sp = pso.Search_space(search_space)
+        sp.compile()
+        opt_type = params['opt_type']
+        f_model, f_bound = pso_registry.get_functions(params)
+        schedule = pso_schedules.Schedule(params)
+        n_migrants = params.get('island_migrants', 1)
+        policy = params.get('island_replacement', 'worst')
+
+        constraints = pso_constraints.create_constraints(sp, params.get('constraints'), params)
+        swarm = pso.Swarm(sp, seed)
+        swarm.initialise(size, f_bound)
+        swarm.set_topology(pso_topologies.create_topology(params, size, swarm.rng))
+        N_evals, N_failed_evals = swarm.evaluate(f_model, opt_type, synchronous=False, constraints=constraints)
+        schedule.start(swarm)
+        conn.send(('ok', [_iteration_record(swarm, N_evals, N_failed_evals)], None))
+        N_iter = 0
+
+        while True:
+            command, n_iter, immigrants = conn.recv()
+            if command == 'stop':
+                break
+            if immigrants is not None and len(immigrants[1]) > 0:
+                rows, accepted = select_replaced(swarm, immigrants[1], policy, opt_type)
+                swarm.replace_particles(rows, immigrants[0][accepted], immigrants[1][accepted], opt_type)
+            records = []
+            for _ in range(n_iter):
+                N_iter += 1
+                if swarm.topology is not None:
+                    swarm.topology.next_iteration(N_iter)
+                swarm.update_velocity(*schedule.get_coefficients(N_iter, swarm))
+                swarm.update_position(f_bound)
+                N_evals, N_failed_evals = swarm.evaluate(f_model, opt_type, synchronous=params['synchronous'], constraints=constraints)
+                records.append(_iteration_record(swarm, N_evals, N_failed_evals))
+            conn.send(('ok', records, get_emigrants(swarm, n_migrants, opt_type)))
+    except Exception:
+        conn.send(('error', traceback.format_exc(), None))
+    finally:
+        conn.close()
+
+
+def _receive(connections):
+    """
+    Function that receives the replies of all the islands, raising an error if any of them failed.
+    """
+    replies = [conn.recv() for conn in connections]
+    for i, (status, content, _) in enumerate(replies):
+        if status == 'error':
+            raise RuntimeError("Island {} failed:\n{}".format(i, content))
+    return [r[1] for r in replies], [r[2] for r in replies]
+
+
+def write_summary(summary_file, rows):
+    """
+    Function that writes the summary of the islands to a csv file
+    """
+    with open(summary_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return 0
+
+
+def run_islands(search_space, params):
+    """
+    Function that executes the island mode and returns the overall best particle.
+    :return: overall best particle and dictionary with the statistics of the run
+    """
+    n_islands = params['islands']
+    topology = params.get('island_migration_topology', 'ring')
+    policy = params.get('island_replacement', 'worst')
+    if topology not in TOPOLOGIES:
+        raise ValueError("Unknown migration topology <{}>. Possible values: {}".format(topology, ', '.join(TOPOLOGIES)))
+    if policy not in REPLACEMENT_POLICIES:
+        raise ValueError("Unknown replacement policy <{}>. Possible values: {}".format(policy, ', '.join(REPLACEMENT_POLICIES)))
+    migration_every = max(1, params.get('island_migration_every', 10))
+    n_migrants = params.get('island_migrants', 1)
+    opt_type = params['opt_type']
+    sign = 1.0 if opt_type == 'min' else -1.0
+    sp = pso.Search_space(search_space)
+    sp.compile()
+    seeds = pso_random.derive_seeds(params.get('seed'), n_islands)
+    sizes = get_island_sizes(params['swarm_size'], n_islands)
+
+    # Output subdirectory and results log of the best island
+    output_dir, dir_name = lib_directory_ops.create_unique_dir(params['Excel output dir'], datetime.datetime.now().strftime("%d%m%Y_%H%M%S") + '_islands')
+    results_log = pso_results.create_results_log(sp, lib_path_ops.join_paths(output_dir, 'output_' + dir_name), params.get('results_format', 'csv'),
+                                                 params.get('results_flush_every', 10))
+    results_log.open()
+    termination_params = dict(params)
+    termination_params['termination_min_diversity'] = 0
+    termination = pso_termination.Termination_criteria(termination_params, opt_type)
+
+    # Start the islands
+    connections = []
+    processes = []
+    for seed, size in zip(seeds, sizes):
+        conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_island_worker, args=(child_conn, search_space, params, seed, size), daemon=True)
+        process.start()
+        child_conn.close()
+        connections.append(conn)
+        processes.append(process)
+
+    statistics = {'N_evals': 0, 'N_failed_evals': 0}
+    islands_N_evals = np.zeros(n_islands, dtype=int)
+    islands_N_failed_evals = np.zeros(n_islands, dtype=int)
+    islands_best = [None]*n_islands
+    best_particle = None
+    N_iter = -1
+    reason = None
+    if params['write_to_console']:
+        print("\nIter.\tFitness")
+    try:
+        records, emigrants = _receive(connections)
+        while True:
+            # Merge the records of the islands, one iteration at a time
+            for iteration_records in zip(*records):
+                N_iter += 1
+                N_evals = 0
+                N_failed_evals = 0
+                for i, (p_id, fitness, position_row, island_N_evals, island_N_failed_evals) in enumerate(iteration_records):
+                    record = pso.Best_record.from_row(p_id, fitness, position_row, sp)
+                    if islands_best[i] is None or sign*fitness < sign*islands_best[i].get_fitness():
+                        islands_best[i] = record
+                    if best_particle is None or sign*fitness < sign*best_particle.get_fitness():
+                        best_particle = record
+                    N_evals += island_N_evals
+                    N_failed_evals += island_N_failed_evals
+                    islands_N_evals[i] += island_N_evals
+                    islands_N_failed_evals[i] += island_N_failed_evals
+                statistics['N_evals'] += N_evals
+                statistics['N_failed_evals'] += N_failed_evals
+                results_log.write_iteration(N_iter, best_particle, N_evals, N_failed_evals)
+                if params['write_to_console']:
+                    print("\t{}\t{}".format(N_iter, best_particle.get_fitness()))
+                reason = termination.check(N_iter, best_particle.get_fitness(), statistics['N_evals'], None)
+                if reason:
+                    break
+            if reason:
+                break
+
+            # Migrate and run the next epoch
+            n_iter = min(migration_every, params['max_iterations'] - N_iter)
+            immigrants = route_migrants(emigrants, topology, n_migrants, opt_type) if emigrants[0] is not None else [None]*n_islands
+            for conn, island_immigrants in zip(connections, immigrants):
+                conn.send(('run', n_iter, island_immigrants))
+            records, emigrants = _receive(connections)
+    finally:
+        for conn in connections:
+            try:
+                conn.send(('stop', 0, None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in processes:
+            process.join()
+        results_log.close()
+
+    statistics['Termination reason'] = reason
+    statistics['Wall time'] = termination.get_wall_time()
+    statistics['N_iter'] = N_iter
+    rows = [{'island': i, 'seed': pso_random.get_seed_label(seeds[i]), 'size': sizes[i], 'best_fitness': islands_best[i].get_fitness(),
+             'N_evals': int(islands_N_evals[i]), 'N_failed_evals': int(islands_N_failed_evals[i])} for i in range(n_islands)]
+    summary_file = lib_path_ops.join_paths(output_dir, 'islands_summary.csv')
+    write_summary(summary_file, rows)
+
+    if params['write_to_console']:
+        print("\nStopped after {} iterations: {}".format(N_iter, reason))
+        print("\nIsland\tSize\tFitness")
+        for r in rows:
+            print("{island}\t{size}\t{best_fitness}".format(**r))
+        print("\nOptimal point:")
+        for v, value in best_particle.get_position().items():
+            print('{}: {}'.format(v, value))
+        print("\nResults written to {}".format(output_dir))
+
+    return best_particle, statistics
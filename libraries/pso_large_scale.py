@@ -0,0 +1,90 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Large-scale mode, for swarms of millions of particles with cheap vectorised (batch) models:
+#   - positions, velocities and personal best positions are stored as large_scale_dtype (float32 halves their memory;
+#     fitness and constraint violations stay float64, so that the comparisons of the bests are not affected, and float32
+#     holds int and enumerate values exactly up to 2^24)
+#   - velocities and positions are updated, and bounds enforced, in place one chunk of large_scale_chunk_size rows at a
+#     time, the random numbers being drawn into buffers allocated once
+#   - bounds are enforced in float64, and the positions clipped again after their cast to the storage type, to the bounds
+#     rounded towards the interior of the search space (a bound not representable in float32, e.g. 0.3, could otherwise
+#     be rounded out of the search space)
+#   - the swarm is evaluated one chunk at a time, so the decoded inputs and outputs of the model never hold more than
+#     large_scale_chunk_size rows
+# The evaluation cache, the surrogate and the steady-state mode are turned off in this mode. Logging the swarm
+# trajectories (results_write_swarm) still works, but it writes every particle at every iteration, so it should stay off.
+# The estimate of the memory footprint is printed before the run starts.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# CONSTANTS
+#----------------------------------------------------------------------------------------
+DTYPES = ('float32', 'float64')
+MB = 1024.0**2
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def get_settings(params):
+    """
+    Function that returns the storage type and chunk size of the swarm set in the parameters.
+    return: numpy dtype and number of rows per chunk (None if the large-scale mode is off)
+    """
+    if not params.get('large_scale', False):
+        return np.dtype(np.float64), None
+    dtype = params.get('large_scale_dtype', 'float32')
+    if dtype not in DTYPES:
+        raise ValueError("Unknown large-scale dtype <{}>. Possible values: {}".format(dtype, ', '.join(DTYPES)))
+    return np.dtype(dtype), max(1, int(params.get('large_scale_chunk_size', 65536)))
+
+
+def get_storage_bounds(search_space, dtype):
+    """
+    Function that returns the bounds of a compiled search space cast to the storage type, rounded towards the interior of
+    the search space when they are not representable in it.
+    return: arrays of lower and upper bounds of type dtype
+    """
+    sp = search_space
+    lbounds = sp.lbounds.astype(dtype)
+    ubounds = sp.ubounds.astype(dtype)
+    lbounds = np.where(lbounds < sp.lbounds, np.nextafter(lbounds, np.array(np.inf, dtype=dtype)), lbounds)
+    ubounds = np.where(ubounds > sp.ubounds, np.nextafter(ubounds, np.array(-np.inf, dtype=dtype)), ubounds)
+    return lbounds, ubounds
+
+
+def estimate_memory(swarm_size, n_vars, dtype=np.float64, chunk_size=None):
+    """
+    Function that estimates the memory used by the state of a swarm and by the working arrays of an iteration.
+    return: dictionary with the estimates in bytes of the state, the working arrays and their total
+    """
+    itemsize = np.dtype(dtype).itemsize
+    # positions, velocities and personal best positions, plus fitness, best fitness and violations (float64)
+    state = 3*swarm_size*n_vars*itemsize + 4*swarm_size*8
+    if chunk_size:
+        # random number and term buffers, plus the float64 temporaries of the bounds and of the decoded model inputs
+        rows = min(chunk_size, swarm_size)
+        working = 3*rows*n_vars*itemsize + 4*rows*n_vars*8
+    else:
+        # two float64 random arrays and the temporaries of the velocity update, bounds and model inputs, for the whole swarm
+        working = 7*swarm_size*n_vars*8
+    return {'state': state, 'working': working, 'total': state + working}
+
+
+def format_memory(estimate):
+    """
+    Function that returns a line of text with the memory estimates in MB.
+    """
+    return "Estimated memory: {:.1f} MB (swarm state {:.1f} MB, working arrays {:.1f} MB)".format(
+        estimate['total']/MB, estimate['state']/MB, estimate['working']/MB)
@@ -0,0 +1,172 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Model functions follow one of two contracts:
+#   - per-point (legacy): f(inputs) -> fitness, where inputs is a dict {variable name: value}
+#   - batch: f(inputs) -> n fitness values, where inputs is either a dict {variable name: (n,) array} or a
+#     (n, n_vars) array with the columns ordered as in the search space. Batch models are marked with @batch_model.
+# Failed evaluations are signalled by None (per-point) or NaN (batch).
+# In multi-objective mode models return a vector of objectives per point (a sequence per-point, an (n, n_objectives)
+# array batch), and the fitness arrays are (n, n_objectives) instead of (n,).
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import time
+import functools
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def batch_model(inputs='dict'):
+    """
+    Decorator that marks a model function as batch capable.
+    :param inputs: 'dict' to receive a dictionary of column arrays or 'array' to receive a (n, n_vars) array
+    """
+    assert inputs in ('dict', 'array')
+    def decorator(f):
+        f.batch = True
+        f.batch_inputs = inputs
+        return f
+    return decorator
+
+
+def model_metadata(thread_safe=False, cost=None):
+    """
+    Decorator that attaches metadata to a model function (see pso_registry).
+    :param thread_safe: True if the model can be called from several threads at once
+    :param cost: expected wall time of one evaluation (s)
+    """
+    def decorator(f):
+        f.thread_safe = thread_safe
+        f.cost = cost
+        return f
+    return decorator
+
+
+def is_batch_model(f):
+    """
+    Function that returns True if the model function follows the batch contract.
+    """
+    return getattr(f, 'batch', False)
+
+
+def evaluate_batch(f, search_space, positions, pool=None, times=None):
+    """
+    Function that evaluates a batch model on encoded positions and returns an (n,) float array (NaN for failed evaluations).
+    If a pool is given the positions are split in chunks of pool.get_chunk_size() rows, evaluated in parallel and merged back in order.
+    If times is a list, the wall time per evaluation is appended to it (time of the batch divided by its size).
+    """
+    if pool is not None and positions.shape[0] > pool.get_chunk_size():
+        chunks = [positions[i:i+pool.get_chunk_size()] for i in range(0, positions.shape[0], pool.get_chunk_size())]
+        results = pool.map(functools.partial(_evaluate_batch_task, f), [_batch_inputs(f, search_space, chunk) for chunk in chunks])
+    else:
+        results = [_evaluate_batch_task(f, _batch_inputs(f, search_space, positions))]
+    fitness = _merge(results, times)
+    assert fitness.shape[0] == positions.shape[0], "Batch model returned {} values for {} points".format(fitness.shape[0], positions.shape[0])
+    return fitness
+
+
+def evaluate_points(f, search_space, positions, pool=None, times=None):
+    """
+    Function that evaluates a per-point model on each encoded position and returns an (n,) float array (NaN for failed evaluations).
+    If a pool is given the points are evaluated in parallel and merged back in order.
+    If times is a list, the wall time of each evaluation is appended to it.
+    """
+    inputs_list = [search_space.decode_position(positions[i]) for i in range(positions.shape[0])]
+    if pool is not None:
+        results = pool.map(functools.partial(_evaluate_points_task, f), [[inputs] for inputs in inputs_list])
+    else:
+        results = [_evaluate_points_task(f, inputs_list)]
+    return _merge(results, times)
+
+
+def evaluate(f, search_space, positions, pool=None, times=None):
+    """
+    Function that evaluates a model on encoded positions using the contract it follows.
+    """
+    if is_batch_model(f):
+        return evaluate_batch(f, search_space, positions, pool=pool, times=times)
+    return evaluate_points(f, search_space, positions, pool=pool, times=times)
+
+
+def submit(f, search_space, positions, pool):
+    """
+    Function that schedules the evaluation of encoded positions in the pool, as a single task.
+    return: future whose result is a tuple with an (n,) float array of fitness (NaN for failed evaluations) and an (n,) array of wall times
+    """
+    if is_batch_model(f):
+        return pool.submit(_evaluate_batch_task, f, _batch_inputs(f, search_space, positions))
+    inputs_list = [search_space.decode_position(positions[i]) for i in range(positions.shape[0])]
+    return pool.submit(_evaluate_points_task, f, inputs_list)
+
+
+def _evaluate_batch_task(f, inputs):
+    """
+    Function run by a worker to evaluate a batch model.
+    return: fitness array and wall time per evaluation
+    """
+    start = time.perf_counter()
+    fitness = np.asarray(f(inputs), dtype=float)
+    if fitness.ndim != 2 or fitness.shape[1] == 1:
+        fitness = fitness.reshape(-1)
+    elapsed = time.perf_counter() - start
+    return fitness, np.full(fitness.shape[0], elapsed/max(1, fitness.shape[0]))
+
+
+def _evaluate_points_task(f, inputs_list):
+    """
+    Function run by a worker to evaluate a per-point model on a list of inputs.
+    return: fitness array and wall time of each evaluation
+    """
+    results = []
+    times = np.empty(len(inputs_list))
+    for i, inputs in enumerate(inputs_list):
+        start = time.perf_counter()
+        results.append(f(inputs))
+        times[i] = time.perf_counter() - start
+    return _to_fitness(results), times
+
+
+def _merge(results, times=None):
+    """
+    Function that concatenates the (fitness, times) results of several tasks, appending the times to the times list if given.
+    """
+    fitness = [r[0] for r in results]
+    if any(f.ndim == 2 for f in fitness):
+        # Tasks whose points all failed cannot know the number of objectives
+        n_objectives = max(f.shape[1] for f in fitness if f.ndim == 2)
+        fitness = [f if f.ndim == 2 else np.full((f.shape[0], n_objectives), np.nan) for f in fitness]
+    fitness = np.concatenate(fitness)
+    if times is not None:
+        times.append(np.concatenate([r[1] for r in results]))
+    return fitness
+
+
+def _to_fitness(results):
+    """
+    Function that converts a list of per-point model results into an (n,) float array (NaN for failed evaluations), or
+    an (n, n_objectives) array if the results are vectors of objectives.
+    """
+    values = [r for r in results if r is not None]
+    if values and np.ndim(values[0]) > 0:
+        n_objectives = len(values[0])
+        return np.array([[np.nan]*n_objectives if r is None else r for r in results], dtype=float).reshape(len(results), n_objectives)
+    return np.array([np.nan if r is None else r for r in results], dtype=float)
+
+
+def _batch_inputs(f, search_space, positions):
+    """
+    Function that builds the inputs of a batch model for the given encoded positions.
+    """
+    columns = search_space.decode_positions(positions)
+    if f.batch_inputs == 'array':
+        return np.column_stack([columns[v] for v in search_space.get_variables_names()])
+    return columns
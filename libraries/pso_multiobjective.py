@@ -0,0 +1,393 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Multi-objective mode (MOPSO): the model returns a vector of objectives per point (a sequence for per-point models, an
+# (n, n_objectives) array for batch models) and the run approximates the whole Pareto front in one go.
+# The non-dominated points found so far are kept in an external archive of at most mo_archive_size points, indexed by
+# an adaptive grid of mo_grid_divisions divisions per objective spanning the objectives of the archive:
+#   - insertion: the candidates of an iteration are first reduced to their own non-dominated set and then compared with
+#     the archive. Points are compared in blocks of at most CHUNK_SIZE pairs, so memory stays bounded whatever the sizes,
+#     and only with the points whose grid cells can dominate them: a point dominating another has no grid coordinate
+#     greater than the other's, so most cells are never compared
+#   - the grid cells of the archive points are only recomputed when the extent of the archive objectives changes;
+#     otherwise only the inserted points get their cell
+#   - when the archive is full, points are removed from the most crowded cell of the grid
+#   - every particle follows a leader drawn from the archive, with a probability that decreases with the number of
+#     points in its cell, so that the swarm is pulled towards the sparse regions of the front
+# A personal best is replaced when the new position dominates it and, if neither dominates the other, with probability 0.5.
+# Objectives are minimised or maximised according to mo_opt_types (opt_type for all of them if null). Infeasible
+# positions are not evaluated and never enter the archive. The evaluation cache, surrogate, checkpoints, steady-state
+# mode and the fitness based termination criteria (fitness target and stagnation) are not used. The inertia and
+# acceleration schedules are followed but not logged.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import csv
+import datetime
+import numpy as np
+import lib_directory_ops
+import lib_path_ops
+import pso_models
+import pso_termination
+import pso_constraints
+import pso_schedules
+import pso_registry
+import pso_classes as pso
+
+
+#----------------------------------------------------------------------------------------
+# CONSTANTS
+#----------------------------------------------------------------------------------------
+# Maximum number of point pairs compared at once
+CHUNK_SIZE = 2**16
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Pareto_archive(object):
+    """ Creates an archive of non-dominated points (all objectives minimised) indexed by an adaptive grid """
+    def __init__(self, n_vars, n_objectives, capacity=100, n_divisions=10, rng=None):
+        self.capacity = capacity
+        self.n_divisions = n_divisions
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.positions = np.empty((0, n_vars))
+        self.objectives = np.empty((0, n_objectives))
+        self.cells = np.empty(0, dtype=int)
+        self.lower = None
+        self.upper = None
+
+    def get_size(self):
+        return self.objectives.shape[0]
+
+    def get_positions(self):
+        return self.positions
+
+    def get_objectives(self):
+        return self.objectives
+
+    def insert(self, positions, objectives):
+        """
+        Function that inserts the candidates that are not dominated by the archive, removes the archive points they dominate
+        and trims the archive to its capacity.
+        return: number of points inserted
+        """
+        valid = ~np.isnan(objectives).any(axis=1)
+        positions = positions[valid]
+        objectives = objectives[valid]
+        if objectives.shape[0] == 0:
+            return 0
+        if self.get_size() == 0:
+            keep = ~_dominated(objectives, objectives)
+            positions, objectives = _unique_rows(positions[keep], objectives[keep])
+        else:
+            coordinates = self.__get_coordinates(objectives)
+            keep = ~_dominated(objectives, objectives, coordinates, coordinates)
+            positions, objectives = _unique_rows(positions[keep], objectives[keep])
+            coordinates = self.__get_coordinates(objectives)
+            archive_coordinates = self.__get_coordinates(self.objectives)
+            # Candidates equal to an archive point are discarded as well
+            new = ~_dominated(self.objectives, objectives, archive_coordinates, coordinates, strict=False)
+            positions = positions[new]
+            objectives = objectives[new]
+            if objectives.shape[0] == 0:
+                return 0
+            survivors = ~_dominated(objectives, self.objectives, coordinates[new], archive_coordinates)
+            self.positions = self.positions[survivors]
+            self.objectives = self.objectives[survivors]
+            self.cells = self.cells[survivors]
+        self.positions = np.vstack((self.positions, positions))
+        self.objectives = np.vstack((self.objectives, objectives))
+        self.__update_grid(objectives.shape[0])
+        while self.get_size() > self.capacity:
+            self.__remove_crowded(self.get_size() - self.capacity)
+        return objectives.shape[0]
+
+    def __get_coordinates(self, objectives):
+        """
+        Internal function that returns the grid coordinates of the objectives, clipped to the grid.
+        return: (n, n_objectives) integer array
+        """
+        spans = self.upper - self.lower
+        spans[spans == 0] = 1.0
+        coordinates = np.floor((objectives - self.lower)/spans*self.n_divisions)
+        return np.clip(coordinates, 0, self.n_divisions - 1).astype(int)
+
+    def __update_grid(self, n_new):
+        """
+        Internal function that updates the grid cells after the last n_new points were appended and others removed, the
+        grid spanning the objectives of the archive. The cells of every point are only recomputed if the grid bounds changed.
+        """
+        lower = self.objectives.min(axis=0)
+        upper = self.objectives.max(axis=0)
+        if self.lower is None or not (np.array_equal(lower, self.lower) and np.array_equal(upper, self.upper)):
+            self.lower = lower
+            self.upper = upper
+            n_new = self.get_size()
+            self.cells = np.empty(0, dtype=int)
+        if n_new > 0:
+            coordinates = self.__get_coordinates(self.objectives[-n_new:])
+            cells = np.ravel_multi_index(coordinates.T, (self.n_divisions,)*self.objectives.shape[1])
+            self.cells = np.concatenate((self.cells, cells))
+        return 0
+
+    def __remove_crowded(self, n):
+        """
+        Internal function that removes up to n random points from the most crowded cell of the grid.
+        """
+        cells, counts = np.unique(self.cells, return_counts=True)
+        members = np.flatnonzero(self.cells == cells[np.argmax(counts)])
+        # Keep at least one point per cell
+        n_removed = max(1, min(n, members.shape[0] - 1))
+        removed = self.rng.choice(members, n_removed, replace=False)
+        self.positions = np.delete(self.positions, removed, axis=0)
+        self.objectives = np.delete(self.objectives, removed, axis=0)
+        self.cells = np.delete(self.cells, removed)
+        self.__update_grid(0)
+        return 0
+
+    def select_leaders(self, n):
+        """
+        Function that draws n leaders from the archive, each cell being chosen with a probability inversely proportional to
+        the number of points in it.
+        return: (n, n_vars) array with the positions of the leaders
+        """
+        _, inverse, counts = np.unique(self.cells, return_inverse=True, return_counts=True)
+        # Each point gets 1/count of the weight 1/count of its cell
+        weights = 1.0/counts[inverse]**2
+        return self.positions[self.rng.choice(self.get_size(), n, p=weights/weights.sum())]
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def _dominates(A, B):
+    """
+    Function that compares two sets of objective vectors (minimised).
+    return: (len(A), len(B)) boolean array, True where A[i] dominates B[j]
+    """
+    A = A[:, None, :]
+    B = B[None, :, :]
+    return (A <= B).all(axis=2) & (A < B).any(axis=2)
+
+
+def _dominated(A, B, coordinates_A=None, coordinates_B=None, strict=True):
+    """
+    Function that finds the points of B dominated by at least one point of A (minimised), or also equal to one if strict
+    is False. Points are compared in blocks of at most CHUNK_SIZE pairs and, if the grid coordinates of both sets are given,
+    each cell of B only with the points of A whose coordinates are all lower or equal to its own.
+    return: boolean array of length len(B)
+    """
+    dominated = np.zeros(B.shape[0], dtype=bool)
+    if coordinates_A is None:
+        step = max(1, CHUNK_SIZE//max(1, B.shape[0]))
+        for start in range(0, A.shape[0], step):
+            block = A[start:start + step]
+            if strict:
+                dominated |= _dominates(block, B).any(axis=0)
+            else:
+                dominated |= (block[:, None, :] <= B[None, :, :]).all(axis=2).any(axis=0)
+        return dominated
+    cells, inverse = np.unique(coordinates_B, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    for i in range(cells.shape[0]):
+        rows = np.flatnonzero(inverse == i)
+        candidates = (coordinates_A <= cells[i]).all(axis=1)
+        if candidates.any():
+            dominated[rows] = _dominated(A[candidates], B[rows], strict=strict)
+    return dominated
+
+
+def _unique_rows(positions, objectives):
+    """
+    Function that removes the points with the same objectives, keeping the first one.
+    """
+    _, rows = np.unique(objectives, axis=0, return_index=True)
+    rows = np.sort(rows)
+    return positions[rows], objectives[rows]
+
+
+def get_signs(params):
+    """
+    Function that returns the sign that turns every objective into one to be minimised.
+    """
+    opt_types = params.get('mo_opt_types')
+    n_objectives = len(params['mo_objectives']) if params.get('mo_objectives') else None
+    if opt_types is None:
+        return None if n_objectives is None else np.full(n_objectives, 1.0 if params['opt_type'] == 'min' else -1.0)
+    for opt_type in opt_types:
+        if opt_type not in ('min', 'max'):
+            raise ValueError("Unknown optimisation type <{}>. Possible values: min, max".format(opt_type))
+    return np.array([1.0 if opt_type == 'min' else -1.0 for opt_type in opt_types])
+
+
+def evaluate(swarm, model, signs, pool=None, constraints=None):
+    """
+    Function that evaluates the objectives of the positions of the swarm, infeasible positions getting NaN objectives.
+    return: (swarm_size, n_objectives) array of objectives to be minimised, and the number of evaluations and failed evaluations
+    """
+    rows = np.arange(swarm.size)
+    if constraints is not None:
+        rows = rows[constraints.get_violations(swarm.positions) == 0]
+        swarm.N_infeasible += swarm.size - rows.shape[0]
+    values = pso_models.evaluate(model, swarm.search_space, swarm.positions[rows], pool=pool)
+    if values.ndim == 1:
+        # All the evaluations failed, or the model is single-objective
+        if np.isnan(values).all():
+            if signs is None:
+                raise ValueError("Could not determine the number of objectives: no evaluation of the first iteration succeeded. "
+                                 "Set mo_objectives or mo_opt_types")
+            values = np.full((rows.shape[0], signs.shape[0]), np.nan)
+        else:
+            values = values.reshape(-1, 1)
+    if signs is None:
+        signs = np.ones(values.shape[1])
+    if values.shape[1] != signs.shape[0]:
+        raise ValueError("The model returned {} objectives, {} expected".format(values.shape[1], signs.shape[0]))
+    objectives = np.full((swarm.size, signs.shape[0]), np.nan)
+    objectives[rows] = signs*values
+    N_failed_evals = int(np.isnan(values).any(axis=1).sum())
+    return objectives, rows.shape[0], N_failed_evals
+
+
+def update_personal_bests(swarm, best_objectives, objectives):
+    """
+    Function that replaces the personal bests dominated by the new positions and, where neither dominates the other,
+    replaces them with probability 0.5.
+    """
+    valid = ~np.isnan(objectives).any(axis=1)
+    empty = np.isnan(best_objectives).any(axis=1)
+    new_dominates = (objectives <= best_objectives).all(axis=1) & (objectives < best_objectives).any(axis=1)
+    old_dominates = (best_objectives <= objectives).all(axis=1) & (best_objectives < objectives).any(axis=1)
+    coin = swarm.rng.random(swarm.size) < 0.5
+    replace = valid & (empty | new_dominates | (~old_dominates & coin))
+    swarm.best_positions[replace] = swarm.positions[replace]
+    swarm.N_improved += int(replace.sum())
+    best_objectives[replace] = objectives[replace]
+    return best_objectives
+
+
+def write_front(front_file, search_space, archive, names, signs):
+    """
+    Function that writes the decision variables and objectives of every point of the archive to a csv file.
+    """
+    with open(front_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerows(front_rows(search_space, archive, names, signs))
+    return 0
+
+
+def front_rows(search_space, archive, names, signs):
+    """
+    Function that returns the header and the rows of the Pareto front, with the objectives in their original sign.
+    """
+    rows = [list(search_space.get_variables_names()) + list(names)]
+    inputs = search_space.decode_positions(archive.get_positions())
+    objectives = archive.get_objectives()*signs
+    for i in range(archive.get_size()):
+        rows.append([_to_builtin(inputs[v][i]) for v in search_space.get_variables_names()] + objectives[i].tolist())
+    return rows
+
+
+def _to_builtin(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def run_multiobjective(search_space, params):
+    """
+    Function that executes the multi-objective mode and writes the Pareto front found.
+    :return: Pareto_archive with the front and dictionary with the statistics of the run
+    """
+    sp = pso.Search_space(search_space)
+    sp.compile()
+    model, f_bound = pso_registry.get_functions(params)
+    schedule = pso_schedules.Schedule(params)
+    signs = get_signs(params)
+
+    output_dir, dir_name = lib_directory_ops.create_unique_dir(params['Excel output dir'], datetime.datetime.now().strftime("%d%m%Y_%H%M%S") + '_multiobjective')
+    termination_params = dict(params)
+    termination_params.update({'termination_fitness_target': None, 'termination_stagnation_window': 0})
+    termination = pso_termination.Termination_criteria(termination_params, 'min')
+
+    constraints = pso_constraints.create_constraints(sp, params.get('constraints'), params)
+    swarm = pso.Swarm(sp, params.get('seed'))
+    swarm.initialise(params['swarm_size'], f_bound)
+    statistics = {'N_evals': 0, 'N_failed_evals': 0}
+    iteration_rows = []
+    pool = pso_registry.create_pool(model, params) if params.get('parallel_evaluation', False) else None
+    if params['write_to_console']:
+        print("\nIter.\tArchive size")
+    try:
+        if pool is not None:
+            pool.start()
+        N_iter = 0
+        reason = None
+        while True:
+            objectives, N_evals, N_failed_evals = evaluate(swarm, model, signs, pool, constraints)
+            if N_iter == 0:
+                if signs is None:
+                    # Number of objectives known only now, all of them of the type opt_type
+                    signs = np.full(objectives.shape[1], 1.0 if params['opt_type'] == 'min' else -1.0)
+                    objectives *= signs
+                archive = Pareto_archive(sp.get_number_variables(), signs.shape[0], params.get('mo_archive_size', 100),
+                                         params.get('mo_grid_divisions', 10), swarm.rng)
+                best_objectives = objectives.copy()
+                schedule.start(swarm)
+            else:
+                best_objectives = update_personal_bests(swarm, best_objectives, objectives)
+            archive.insert(swarm.positions, objectives)
+            statistics['N_evals'] += N_evals
+            statistics['N_failed_evals'] += N_failed_evals
+            iteration_rows.append([N_iter, N_evals, N_failed_evals, archive.get_size()] + (archive.get_objectives().min(axis=0)*signs).tolist()
+                                  if archive.get_size() else [N_iter, N_evals, N_failed_evals, 0] + [None]*signs.shape[0])
+            if params['write_to_console']:
+                print("\t{}\t{}".format(N_iter, archive.get_size()))
+            reason = termination.check(N_iter, np.nan, statistics['N_evals'], swarm)
+            if reason:
+                break
+            N_iter += 1
+            if archive.get_size():
+                swarm.set_leaders(archive.select_leaders(swarm.size))
+            else:
+                swarm.set_leaders(swarm.best_positions)
+            swarm.update_velocity(*schedule.get_coefficients(N_iter, swarm))
+            swarm.update_position(f_bound)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    statistics['Termination reason'] = reason
+    statistics['Wall time'] = termination.get_wall_time()
+    statistics['N_iter'] = N_iter
+    statistics['N_infeasible'] = swarm.N_infeasible
+    statistics['Front size'] = archive.get_size()
+
+    # Write the iterations and the front
+    names = params.get('mo_objectives') or ['f{}'.format(k+1) for k in range(signs.shape[0])]
+    iterations_header = ['Iteration', 'N_evals', 'N_failed_evals', 'Archive size'] + ['{} {}'.format('min' if sign > 0 else 'max', name) for sign, name in zip(signs, names)]
+    with open(lib_path_ops.join_paths(output_dir, 'output_' + dir_name + '_iterations.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(iterations_header)
+        writer.writerows(iteration_rows)
+    front_file = lib_path_ops.join_paths(output_dir, 'pareto_front.csv')
+    write_front(front_file, sp, archive, names, signs)
+    if params['write_excel']:
+        import lib_excel_ops_openpyxl as lib_excel
+        wb = lib_excel.create_write_only_workbook()
+        rows = front_rows(sp, archive, names, signs)
+        lib_excel.write_table_streaming(wb, 'Pareto front', rows[1:], header=rows[0])
+        lib_excel.write_table_streaming(wb, 'Iterations', iteration_rows, header=iterations_header)
+        lib_excel.write_table_streaming(wb, 'Statistics', [[key, value] for key, value in statistics.items()])
+        lib_excel.save_workbook(wb, lib_path_ops.join_paths(output_dir, 'output_' + dir_name + '.xlsx'))
+
+    if params['write_to_console']:
+        print("\nStopped after {} iterations: {}".format(N_iter, reason))
+        print("Pareto front of {} points written to {}".format(archive.get_size(), front_file))
+
+    return archive, statistics
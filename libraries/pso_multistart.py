@@ -0,0 +1,155 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Multi-start mode: multistart_runs independent pso runs, with seeds derived from the main seed, written to a common
+# output subdirectory together with a summary of all the runs. The individual runs skip the excel export.
+#   - without parallel_evaluation, the runs are spread over a pool of multistart_workers processes
+#   - with parallel_evaluation, the runs are executed one after the other and share a single evaluation pool, so
+#     that the workers are started only once
+# A run is successful when its best fitness reaches multistart_target (termination_fitness_target if not set).
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import os
+import csv
+import datetime
+import concurrent.futures
+import numpy as np
+import lib_directory_ops
+import lib_path_ops
+import pso_registry
+import pso_random
+import pso_classes as pso
+
+
+#----------------------------------------------------------------------------------------
+# CONSTANTS
+#----------------------------------------------------------------------------------------
+SUMMARY_COLUMNS = ['run', 'seed', 'best_fitness', 'N_evals', 'evals_to_target', 'success', 'termination_reason',
+                   'wall_time_s', 'output_dir']
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def is_success(fitness, target, opt_type):
+    if target is None:
+        return None
+    return fitness <= target if opt_type == 'min' else fitness >= target
+
+
+def run_single(search_space, params, run_i, seed, pool=None):
+    """
+    Function that executes one run of the multi-start and returns its results.
+    :return: best particle of the run and dictionary with its row of the summary
+    """
+    params = dict(params)
+    params.update({'seed': seed, 'write_excel': False, 'write_to_console': False, 'resume_from': None})
+    pso_alg = pso.pso(search_space, params)
+    best_particle = pso_alg.execute(pool=pool)
+    target = params.get('multistart_target')
+    if target is None:
+        target = params.get('termination_fitness_target')
+
+    # Number of evaluations until the target was first reached, read back from the results log
+    evals_to_target = None
+    N_evals = 0
+    for N_iter, fitness, position, N_iter_evals, N_failed_evals in pso_alg.results_log.read_iterations():
+        N_evals += N_iter_evals
+        if evals_to_target is None and is_success(fitness, target, params['opt_type']):
+            evals_to_target = N_evals
+
+    row = {'run': run_i, 'seed': pso_random.get_seed_label(seed), 'best_fitness': best_particle.get_fitness(), 'N_evals': pso_alg.statistics['N_evals'],
+           'evals_to_target': evals_to_target, 'success': is_success(best_particle.get_fitness(), target, params['opt_type']),
+           'termination_reason': pso_alg.statistics['Termination reason'], 'wall_time_s': pso_alg.statistics['Wall time'],
+           'output_dir': pso_alg.write['output dir']}
+    return best_particle, row
+
+
+def get_statistics(rows, opt_type):
+    """
+    Function that aggregates the results of the runs.
+    :return: dictionary with the best run and fitness, the median, mean, standard deviation and worst fitness, the success
+    rate and the mean number of evaluations to reach the target of the successful runs
+    """
+    fitness = np.array([r['best_fitness'] for r in rows], dtype=float)
+    sign = 1.0 if opt_type == 'min' else -1.0
+    best_i = int(np.nanargmin(sign*fitness))
+    success = [r['success'] for r in rows if r['success'] is not None]
+    evals_to_target = [r['evals_to_target'] for r in rows if r['evals_to_target'] is not None]
+    return {'Runs': len(rows),
+            'Best run': best_i,
+            'Best fitness': float(fitness[best_i]),
+            'Median fitness': float(np.nanmedian(fitness)),
+            'Mean fitness': float(np.nanmean(fitness)),
+            'Std fitness': float(np.nanstd(fitness)),
+            'Worst fitness': float(fitness[int(np.nanargmax(sign*fitness))]),
+            'Success rate': float(np.mean(success)) if success else None,
+            'Mean evals to target': float(np.mean(evals_to_target)) if evals_to_target else None}
+
+
+def write_summary(summary_file, rows, statistics):
+    """
+    Function that writes the results of every run, followed by the aggregated statistics, to a csv file
+    """
+    with open(summary_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        f.write('\n')
+        stats_writer = csv.writer(f)
+        for key, value in statistics.items():
+            stats_writer.writerow([key, value])
+    return 0
+
+
+def run_multistart(search_space, params):
+    """
+    Function that executes the multi-start runs, writes their summary and returns the overall best particle.
+    :return: overall best particle and dictionary with the aggregated statistics
+    """
+    n_runs = params['multistart_runs']
+    seeds = pso_random.derive_seeds(params.get('seed'), n_runs)
+
+    # Common output subdirectory
+    output_dir, dir_name = lib_directory_ops.create_unique_dir(params['Excel output dir'], datetime.datetime.now().strftime("%d%m%Y_%H%M%S") + '_multistart')
+    params = dict(params)
+    params['Excel output dir'] = output_dir
+
+    results = []
+    if params.get('parallel_evaluation', False) or params.get('steady_state', False):
+        with pso_registry.create_pool(pso_registry.resolve_model(params['model_function'], params.get('model_metadata')), params) as pool:
+            for run_i, seed in enumerate(seeds):
+                results.append(run_single(search_space, params, run_i, seed, pool=pool))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=params.get('multistart_workers') or os.cpu_count()) as executor:
+            futures = [executor.submit(run_single, search_space, params, run_i, seed) for run_i, seed in enumerate(seeds)]
+            results = [future.result() for future in futures]
+
+    best_particles = [r[0] for r in results]
+    rows = [r[1] for r in results]
+    statistics = get_statistics(rows, params['opt_type'])
+    best_i = statistics['Best run']
+
+    summary_file = lib_path_ops.join_paths(output_dir, 'multistart_summary.csv')
+    write_summary(summary_file, rows, statistics)
+
+    if params['write_to_console']:
+        print("\nRun\tSeed\tFitness\tReason")
+        for r in rows:
+            print("{run}\t{seed}\t{best_fitness}\t{termination_reason}".format(**r))
+        print("")
+        for key, value in statistics.items():
+            print("{}: {}".format(key, value))
+        print("\nOptimal point:")
+        for v, value in best_particles[best_i].get_position().items():
+            print('{}: {}'.format(v, value))
+        print("\nSummary written to {}".format(summary_file))
+
+    return best_particles[best_i], statistics
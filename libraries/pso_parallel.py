@@ -0,0 +1,84 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Model functions sent to the pool must be importable by the workers (e.g. defined at module level in models.py).
+# The thread backend runs the evaluations in threads of the main process instead: there is no process start up nor
+# pickling of the inputs, but only models that are thread safe and release the GIL (e.g. wrappers of external
+# simulators or compiled code) are evaluated in parallel.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import os
+import concurrent.futures
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Evaluation_pool(object):
+    """ Creates a pool of worker processes used to evaluate the model in parallel """
+    def __init__(self, n_workers=None, chunk_size=1, backend='process'):
+        if not n_workers:
+            n_workers = os.cpu_count()
+        self.n_workers = n_workers
+        self.chunk_size = max(1, int(chunk_size))
+        self.backend = backend
+        self.executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def get_n_workers(self):
+        return self.n_workers
+
+    def get_chunk_size(self):
+        return self.chunk_size
+
+    def get_backend(self):
+        return self.backend
+
+    def start(self):
+        """
+        Function that starts the worker processes. Calling it on a running pool has no effect.
+        """
+        if self.executor is None:
+            if self.backend == 'thread':
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.n_workers)
+            else:
+                self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.n_workers)
+        return 0
+
+    def close(self):
+        """
+        Function that shuts down the worker processes.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        return 0
+
+    def map(self, f, inputs_list):
+        """
+        Function that applies f to every element of inputs_list in the workers.
+        return: list of results in the same order as inputs_list
+        """
+        self.start()
+        return list(self.executor.map(f, inputs_list, chunksize=self.chunk_size))
+
+    def submit(self, f, *args):
+        """
+        Function that schedules a single call f(*args) and returns its future.
+        """
+        self.start()
+        return self.executor.submit(f, *args)
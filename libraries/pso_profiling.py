@@ -0,0 +1,130 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Phases timed in every iteration: update_velocity, update_position, enforce_bounds, evaluate and write_results.
+# In steady-state mode the moves happen inside evaluate, so update_position and enforce_bounds are also included in its time.
+# Evaluation wall times are accumulated in a histogram with logarithmic bins (4 per decade, from 1 us to 10000 s).
+# A disabled profiler returns immediately from every call.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import csv
+import time
+import contextlib
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Profiler(object):
+    """ Creates a profiler that times the phases of each iteration and the model evaluations """
+    phases = ('update_velocity', 'update_position', 'enforce_bounds', 'evaluate', 'write_results')
+    histogram_edges = 10.0**np.arange(-6, 4.25, 0.25)
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.totals = dict.fromkeys(self.phases, 0.0)
+        self.iteration = dict.fromkeys(self.phases, 0.0)
+        self.histogram = np.zeros(len(self.histogram_edges) + 1, dtype=np.int64)
+        self.N_evals = 0
+        self.evaluation_time = 0.0
+        self.iteration_evaluation_time = 0.0
+        self.N_iterations = 0
+        self.file = None
+        self.writer = None
+        self.start_time = time.perf_counter()
+
+    def is_enabled(self):
+        return self.enabled
+
+    def open(self, path, mode='w'):
+        """
+        Function that opens the per-iteration metrics file (csv).
+        """
+        if not self.enabled:
+            return 0
+        self.file = open(path, mode, newline='')
+        self.writer = csv.writer(self.file)
+        if mode == 'w':
+            self.writer.writerow(['Iteration'] + ['{} (s)'.format(p) for p in self.phases] + ['N_evals', 'Evaluations per second', 'Mean evaluation time (s)'])
+        return 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        return 0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Function that times the block of code run inside the with statement as part of phase name.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.iteration[name] += time.perf_counter() - start
+
+    def add_evaluation_times(self, times):
+        """
+        Function that adds evaluation wall times (array or list of arrays) to the histogram.
+        """
+        if not self.enabled or times is None or len(times) == 0:
+            return 0
+        times = np.concatenate(times) if isinstance(times, list) else np.asarray(times)
+        self.histogram += np.bincount(np.searchsorted(self.histogram_edges, times), minlength=self.histogram.shape[0])
+        self.N_evals += times.shape[0]
+        self.evaluation_time += float(times.sum())
+        self.iteration_evaluation_time += float(times.sum())
+        return 0
+
+    def end_iteration(self, N_iter, N_evals):
+        """
+        Function that closes the timing of an iteration and writes its metrics to the metrics file.
+        """
+        if not self.enabled:
+            return 0
+        evaluate_time = self.iteration['evaluate']
+        evals_per_second = N_evals/evaluate_time if evaluate_time > 0 else None
+        mean_evaluation_time = self.iteration_evaluation_time/N_evals if N_evals else None
+        if self.writer is not None:
+            self.writer.writerow([N_iter] + [self.iteration[p] for p in self.phases] + [N_evals, evals_per_second, mean_evaluation_time])
+        self.iteration_evaluation_time = 0.0
+        for p in self.phases:
+            self.totals[p] += self.iteration[p]
+            self.iteration[p] = 0.0
+        self.N_iterations += 1
+        return 0
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+        return 0
+
+    def get_summary(self):
+        """
+        Function that returns the statistics of the run as a list of (label, value) rows, followed by the histogram of evaluation times.
+        """
+        rows = []
+        for p in self.phases:
+            rows.append(('Time in {} (s)'.format(p), self.totals[p]))
+        evaluate_time = self.totals['evaluate']
+        rows.append(('Wall time (s)', time.perf_counter() - self.start_time))
+        rows.append(('Evaluations per second', self.N_evals/evaluate_time if evaluate_time > 0 else None))
+        rows.append(('Mean evaluation time (s)', self.evaluation_time/self.N_evals if self.N_evals else None))
+        rows.append(('Evaluation time histogram: upper bound (s)', 'Count'))
+        for edge, count in zip(list(self.histogram_edges) + ['inf'], self.histogram.tolist()):
+            if count:
+                rows.append((edge if edge == 'inf' else float(edge), count))
+        return rows
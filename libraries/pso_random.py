@@ -0,0 +1,45 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Every run draws all its random numbers from a single numpy Generator, seeded once from the seed of the run.
+# Runs that are started together (multi-start runs, islands) get independent streams through SeedSequence, which are
+# reproducible from the main seed: each run is seeded with a child SeedSequence spawned from the main seed, labelled
+# <main seed>/<run index> in the summaries.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def create_generator(seed=None):
+    """
+    Function that creates the random generator of a run (seeded from the OS entropy if seed is None).
+    """
+    return np.random.default_rng(seed)
+
+
+def derive_seeds(seed, n_runs):
+    """
+    Function that derives n_runs independent seeds from the main seed (from the OS entropy if seed is None).
+    return: list of child SeedSequence objects, which are passed as they are to create_generator, so that the streams
+    keep the independence guaranteed by SeedSequence.spawn
+    """
+    return np.random.SeedSequence(seed).spawn(n_runs)
+
+
+def get_seed_label(seed):
+    """
+    Function that returns a short label of a seed for the summaries: the seed itself, or entropy/spawn key of a derived seed.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return '/'.join(str(x) for x in (seed.entropy,) + tuple(seed.spawn_key))
+    return seed
@@ -0,0 +1,149 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Model and bound functions are resolved once, at the start of a run, from the reference set in the inputs file:
+#   - name: a function of model/models.py (models and constraints) or libraries/pso_bound_functions.py (bound
+#     functions), or else an entry point of that name in the group pso.models, pso.constraints or pso.bound_functions,
+#     so that installed packages can register their functions
+#   - module:function: a function of any importable module, e.g. my_package.simulators:run_case (the function can
+#     also be an attribute of an object of the module, e.g. my_package.simulators:Simulator.run)
+# Models are returned as a Registered_model, which calls the function and carries its metadata:
+#   - batch / batch_inputs: the contract the model follows (see pso_models)
+#   - thread_safe: the model can be called from several threads at once (e.g. a wrapper of an external simulator),
+#     so that parallel_backend auto evaluates it in threads instead of processes
+#   - cost: expected wall time of one evaluation (s), used to choose the chunk size when chunk_size is null
+# The metadata is read from the function (set by @batch_model and @model_metadata) and can be overridden with the
+# model_metadata parameter, for functions of external packages that cannot be decorated.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import math
+import importlib
+import importlib.metadata
+import models
+import pso_bound_functions as pso_bound
+import pso_parallel
+
+
+#----------------------------------------------------------------------------------------
+# CONSTANTS
+#----------------------------------------------------------------------------------------
+MODELS_GROUP = 'pso.models'
+BOUND_FUNCTIONS_GROUP = 'pso.bound_functions'
+CONSTRAINTS_GROUP = 'pso.constraints'
+BACKENDS = ('process', 'thread', 'auto')
+TASK_TIME = 0.05 # target wall time of a task sent to a worker when the chunk size is chosen from the cost (s)
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Registered_model(object):
+    """ Creates a model resolved from a reference, which calls the model function and carries its metadata """
+    def __init__(self, f, reference, batch=False, batch_inputs='dict', thread_safe=False, cost=None):
+        self.f = f
+        self.reference = reference
+        self.batch = batch
+        self.batch_inputs = batch_inputs
+        self.thread_safe = thread_safe
+        self.cost = cost
+
+    def __call__(self, inputs):
+        return self.f(inputs)
+
+    def __repr__(self):
+        return "Registered_model({}, batch={}, thread_safe={}, cost={})".format(self.reference, self.batch, self.thread_safe, self.cost)
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def resolve(reference, module, group):
+    """
+    Function that resolves a reference (name or module:function) into a callable.
+    :param module: module searched for plain names
+    :param group: entry point group searched for plain names not found in module
+    """
+    if ':' in reference:
+        module_name, attributes = reference.split(':', 1)
+        try:
+            f = importlib.import_module(module_name)
+            for attribute in attributes.split('.'):
+                f = getattr(f, attribute)
+        except (ImportError, AttributeError) as e:
+            raise ValueError("Could not resolve <{}>: {}".format(reference, e))
+    else:
+        f = getattr(module, reference, None)
+        if f is None:
+            entry_points = [ep for ep in _entry_points(group) if ep.name == reference]
+            if not entry_points:
+                raise ValueError("Unknown function <{}>: it is neither a function of {} nor an entry point of group {}".format(reference, module.__name__, group))
+            f = entry_points[0].load()
+    if not callable(f):
+        raise ValueError("<{}> is not callable".format(reference))
+    return f
+
+
+def resolve_model(reference, metadata=None):
+    """
+    Function that resolves a model reference into a Registered_model, with the metadata of the function overridden by
+    the non-null values of the metadata dictionary.
+    """
+    f = resolve(reference, models, MODELS_GROUP)
+    info = {'batch': getattr(f, 'batch', False), 'batch_inputs': getattr(f, 'batch_inputs', 'dict'),
+            'thread_safe': getattr(f, 'thread_safe', False), 'cost': getattr(f, 'cost', None)}
+    for key, value in (metadata or {}).items():
+        if key not in info:
+            raise ValueError("Unknown model metadata <{}>. Possible values: {}".format(key, ', '.join(info.keys())))
+        if value is not None:
+            info[key] = value
+    # A batch value given as 'dict' or 'array' sets the inputs of the batch contract too
+    if info['batch'] in ('dict', 'array'):
+        info['batch_inputs'] = info['batch']
+        info['batch'] = True
+    return Registered_model(f, reference, **info)
+
+
+def resolve_bound_function(reference):
+    """
+    Function that resolves a bound function reference into a callable.
+    """
+    return resolve(reference, pso_bound, BOUND_FUNCTIONS_GROUP)
+
+
+def get_functions(params):
+    """
+    Function that resolves the model and the bound function (None if bounds are not enforced) set in the parameters.
+    """
+    model = resolve_model(params['model_function'], params.get('model_metadata'))
+    f_bound = resolve_bound_function(params['enforce_bounds_function']) if params['enforce_bounds'] else None
+    return model, f_bound
+
+
+def create_pool(model, params):
+    """
+    Function that creates the evaluation pool set in the parameters for a model: the backend auto uses threads for
+    thread safe models, and a null chunk size is chosen so that each task takes about TASK_TIME given the model cost.
+    """
+    backend = params.get('parallel_backend', 'process')
+    if backend not in BACKENDS:
+        raise ValueError("Unknown parallel backend <{}>. Possible values: {}".format(backend, ', '.join(BACKENDS)))
+    if backend == 'auto':
+        backend = 'thread' if model.thread_safe else 'process'
+    chunk_size = params.get('chunk_size', 1)
+    if not chunk_size:
+        chunk_size = max(1, int(math.ceil(TASK_TIME/model.cost))) if model.cost else 1
+    return pso_parallel.Evaluation_pool(params.get('n_workers'), chunk_size, backend)
+
+
+def _entry_points(group):
+    entry_points = importlib.metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return entry_points.select(group=group)
+    return entry_points.get(group, [])
@@ -0,0 +1,274 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Append-only logs of the per-iteration results, flushed to disk every flush_every iterations.
+# Each iteration record holds: iteration, best fitness, N_evals, N_failed_evals and the best position.
+# Formats:
+#   - csv: <name>.csv (and <name>_swarm.csv) with decoded positions
+#   - jsonl: <name>.jsonl (and <name>_swarm.jsonl), one json object per line, with decoded positions
+#   - binary: <name>.bin (and <name>_swarm.bin), raw float64 rows with encoded positions; the column names are
+#     written to <name>.json and the files can be loaded with load_binary_log
+# The swarm files (optional) hold one row per particle and iteration: iteration, particle, fitness and position.
+# Results_log holds what the formats share; each format class defines write_record, write_swarm_state and the readers
+# read_iterations (iteration, best fitness, best position dictionary, N_evals, N_failed_evals) and read_swarm_states
+# (lists [iteration, particle, fitness, decoded position values...]).
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import csv
+import json
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Results_log(object):
+    """ Creates an append-only log of the per-iteration results, optionally including the full swarm state """
+    extension = ''
+
+    def __init__(self, search_space, path, flush_every=10, write_swarm=False):
+        self.search_space = search_space
+        self.vars_names = search_space.get_variables_names()
+        self.path = path + self.extension
+        self.swarm_path = path + '_swarm' + self.extension
+        self.flush_every = max(1, int(flush_every))
+        self.write_swarm = write_swarm
+        self.N_written = 0
+        self.file = None
+        self.swarm_file = None
+
+    def get_path(self):
+        return self.path
+
+    def get_swarm_path(self):
+        return self.swarm_path if self.write_swarm else None
+
+    def open(self, mode='w'):
+        """
+        Function that opens the log files (mode 'a' appends to existing logs).
+        """
+        newline = None if self.file_mode_suffix() else ''
+        self.file = open(self.path, mode + self.file_mode_suffix(), newline=newline)
+        if self.write_swarm:
+            self.swarm_file = open(self.swarm_path, mode + self.file_mode_suffix(), newline=newline)
+        if mode == 'w':
+            self.write_header()
+        return 0
+
+    def tell(self):
+        """
+        Function that flushes the log files and returns their sizes, so that they can be truncated back to this point on resume.
+        """
+        self.flush()
+        return [f.tell() if f is not None else 0 for f in (self.file, self.swarm_file)]
+
+    def truncate(self, sizes):
+        """
+        Function that truncates closed log files to the sizes returned by tell, dropping what was written afterwards.
+        """
+        paths = (self.path, self.swarm_path if self.write_swarm else None)
+        for path, size in zip(paths, sizes):
+            if path is not None:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+        return 0
+
+    def close(self):
+        """
+        Function that flushes and closes the log files.
+        """
+        for f in (self.file, self.swarm_file):
+            if f is not None:
+                f.close()
+        self.file = None
+        self.swarm_file = None
+        return 0
+
+    def flush(self):
+        for f in (self.file, self.swarm_file):
+            if f is not None:
+                f.flush()
+        return 0
+
+    def write_iteration(self, N_iter, best_particle, N_evals, N_failed_evals, swarm=None):
+        """
+        Function that appends the results of an iteration (and the swarm state, if enabled) to the log.
+        """
+        self.write_record(N_iter, best_particle, N_evals, N_failed_evals)
+        if self.write_swarm and swarm is not None:
+            self.write_swarm_state(N_iter, swarm)
+        self.N_written += 1
+        if self.N_written % self.flush_every == 0:
+            self.flush()
+        return 0
+
+    def file_mode_suffix(self):
+        return ''
+
+    def write_header(self):
+        return 0
+
+
+class Csv_results_log(Results_log):
+    """ Creates a results log in csv format """
+    extension = '.csv'
+
+    def open(self, mode='w'):
+        Results_log.open(self, mode)
+        self.writer = csv.writer(self.file)
+        if self.write_swarm:
+            self.swarm_writer = csv.writer(self.swarm_file)
+        if mode == 'w':
+            self.writer.writerow(['Iteration', 'Best fitness', 'N_evals', 'N_failed_evals'] + list(self.vars_names))
+            if self.write_swarm:
+                self.swarm_writer.writerow(['Iteration', 'Particle', 'Fitness'] + list(self.vars_names))
+        return 0
+
+    def write_record(self, N_iter, best_particle, N_evals, N_failed_evals):
+        position = best_particle.get_position()
+        self.writer.writerow([N_iter, best_particle.get_fitness(), N_evals, N_failed_evals] + [position[v] for v in self.vars_names])
+        return 0
+
+    def write_swarm_state(self, N_iter, swarm):
+        columns = self.search_space.decode_positions(swarm.positions)
+        rows = zip([N_iter]*swarm.size, range(swarm.size), swarm.fitness.tolist(), *[columns[v].tolist() for v in self.vars_names])
+        self.swarm_writer.writerows(rows)
+        return 0
+
+    def read_iterations(self):
+        with open(self.path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            next(reader)
+            for row in reader:
+                position = {v: _parse(x) for v, x in zip(self.vars_names, row[4:])}
+                yield int(row[0]), float(row[1]), position, int(row[2]), int(row[3])
+
+    def read_swarm_states(self):
+        with open(self.swarm_path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            next(reader)
+            for row in reader:
+                yield [int(row[0]), int(row[1]), float(row[2])] + [_parse(x) for x in row[3:]]
+
+
+class Jsonl_results_log(Results_log):
+    """ Creates a results log in json lines format """
+    extension = '.jsonl'
+
+    def write_record(self, N_iter, best_particle, N_evals, N_failed_evals):
+        record = {'iteration': N_iter, 'best_fitness': best_particle.get_fitness(), 'N_evals': N_evals,
+                  'N_failed_evals': N_failed_evals, 'best_position': best_particle.get_position()}
+        self.file.write(json.dumps(record, default=_to_json) + '\n')
+        return 0
+
+    def write_swarm_state(self, N_iter, swarm):
+        columns = self.search_space.decode_positions(swarm.positions)
+        record = {'iteration': N_iter, 'fitness': swarm.fitness.tolist(), 'positions': {v: columns[v].tolist() for v in self.vars_names}}
+        self.swarm_file.write(json.dumps(record, default=_to_json) + '\n')
+        return 0
+
+    def read_iterations(self):
+        with open(self.path, 'r') as f:
+            for line in f:
+                r = json.loads(line)
+                yield r['iteration'], r['best_fitness'], r['best_position'], r['N_evals'], r['N_failed_evals']
+
+    def read_swarm_states(self):
+        with open(self.swarm_path, 'r') as f:
+            for line in f:
+                r = json.loads(line)
+                columns = [r['positions'][v] for v in self.vars_names]
+                for i, fitness in enumerate(r['fitness']):
+                    yield [r['iteration'], i, fitness] + [c[i] for c in columns]
+
+
+class Binary_results_log(Results_log):
+    """ Creates a results log made of raw float64 rows, with encoded positions """
+    extension = '.bin'
+
+    def file_mode_suffix(self):
+        return 'b'
+
+    def write_header(self):
+        header = {'columns': ['Iteration', 'Best fitness', 'N_evals', 'N_failed_evals'] + list(self.vars_names),
+                  'swarm_columns': ['Iteration', 'Particle', 'Fitness'] + list(self.vars_names),
+                  'dtype': 'float64', 'positions': 'encoded'}
+        with open(self.path[:-len(self.extension)] + '.json', 'w') as f:
+            json.dump(header, f)
+        return 0
+
+    def write_record(self, N_iter, best_particle, N_evals, N_failed_evals):
+        record = np.concatenate(([N_iter, best_particle.get_fitness(), N_evals, N_failed_evals], best_particle.get_position_row()))
+        record.astype(np.float64).tofile(self.file)
+        return 0
+
+    def write_swarm_state(self, N_iter, swarm):
+        state = np.empty((swarm.size, 3 + swarm.n_vars))
+        state[:, 0] = N_iter
+        state[:, 1] = np.arange(swarm.size)
+        state[:, 2] = swarm.fitness
+        state[:, 3:] = swarm.positions
+        state.tofile(self.swarm_file)
+        return 0
+
+    def read_iterations(self):
+        records = load_binary_log(self.path, 4 + len(self.vars_names))
+        for r in records:
+            yield int(r[0]), float(r[1]), self.search_space.decode_position(r[4:]), int(r[2]), int(r[3])
+
+    def read_swarm_states(self):
+        states = load_binary_log(self.swarm_path, 3 + len(self.vars_names))
+        for r in states:
+            position = self.search_space.decode_position(r[3:])
+            yield [int(r[0]), int(r[1]), float(r[2])] + [position[v] for v in self.vars_names]
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def create_results_log(search_space, path, results_format='csv', flush_every=10, write_swarm=False):
+    """
+    Function that creates a results log for the given format (csv, jsonl or binary).
+    :param path: path of the log without extension
+    """
+    logs = {'csv': Csv_results_log, 'jsonl': Jsonl_results_log, 'binary': Binary_results_log}
+    try:
+        return logs[results_format](search_space, path, flush_every=flush_every, write_swarm=write_swarm)
+    except KeyError:
+        raise ValueError("Unknown results format <{}>. Possible values: {}".format(results_format, ', '.join(logs.keys())))
+
+
+def load_binary_log(path, n_columns):
+    """
+    Function that maps a binary log into a (n_rows, n_columns) float64 array without loading it into memory.
+    """
+    data = np.memmap(path, dtype=np.float64, mode='r')
+    return data.reshape(-1, n_columns)
+
+
+def _parse(value):
+    """
+    Function that converts a csv field back into a number when possible.
+    """
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _to_json(value):
+    """
+    Function that converts numpy scalars into json serialisable values.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
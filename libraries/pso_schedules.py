@@ -0,0 +1,182 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Schedules of the inertia weight (w) and acceleration constants (c_local, c_global) of the velocity update, computed
+# before every iteration. t goes from 0 at the first velocity update to 1 at iteration max_iterations.
+# inertia_schedule:
+#   - constant: w = inertia_weight
+#   - linear: w decreases linearly from inertia_weight_start to inertia_weight_end
+#   - constriction: Clerc's constriction factor chi = 2/|2 - phi - sqrt(phi^2 - 4*phi)|, phi = c_local + c_global > 4,
+#     multiplies the whole velocity: w = chi and both acceleration constants are multiplied by chi
+#   - adaptive: w moves between inertia_weight_end and inertia_weight_start according to the feedback of the swarm:
+#       - success_rate: w = w_end + (w_start - w_end)*(fraction of particles that improved their personal best in the
+#         last iteration), i.e. the swarm explores while it keeps improving and contracts when it stops
+#       - diversity: w = w_end + (w_start - w_end)*(diversity/initial diversity), i.e. the swarm slows down as it converges
+# acceleration_schedule:
+#   - constant: c_local = acceleration_constant_local, c_global = acceleration_constant_global
+#   - tvac: time-varying acceleration coefficients, c_local decreases linearly from acceleration_local_start to
+#     acceleration_local_end and c_global increases from acceleration_global_start to acceleration_global_end, moving
+#     the swarm from individual exploration to convergence on the best positions
+# The values used in every iteration are written to <output name>_schedule.csv.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import csv
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# CONSTANTS
+#----------------------------------------------------------------------------------------
+INERTIA_SCHEDULES = ('constant', 'linear', 'constriction', 'adaptive')
+ACCELERATION_SCHEDULES = ('constant', 'tvac')
+FEEDBACKS = ('success_rate', 'diversity')
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Schedule(object):
+    """ Creates the schedule of the coefficients of the velocity update of a run """
+    def __init__(self, params):
+        self.inertia_schedule = params.get('inertia_schedule', 'constant')
+        self.acceleration_schedule = params.get('acceleration_schedule', 'constant')
+        self.feedback = params.get('adaptive_feedback', 'success_rate')
+        if self.inertia_schedule not in INERTIA_SCHEDULES:
+            raise ValueError("Unknown inertia schedule <{}>. Possible values: {}".format(self.inertia_schedule, ', '.join(INERTIA_SCHEDULES)))
+        if self.acceleration_schedule not in ACCELERATION_SCHEDULES:
+            raise ValueError("Unknown acceleration schedule <{}>. Possible values: {}".format(self.acceleration_schedule, ', '.join(ACCELERATION_SCHEDULES)))
+        if self.feedback not in FEEDBACKS:
+            raise ValueError("Unknown adaptive feedback <{}>. Possible values: {}".format(self.feedback, ', '.join(FEEDBACKS)))
+        self.max_iter = params['max_iterations']
+        self.inertia = params['inertia_weight']
+        self.c_local = params['acceleration_constant_local']
+        self.c_global = params['acceleration_constant_global']
+        self.inertia_start = params.get('inertia_weight_start', 0.9)
+        self.inertia_end = params.get('inertia_weight_end', 0.4)
+        self.c_local_start = params.get('acceleration_local_start', 2.5)
+        self.c_local_end = params.get('acceleration_local_end', 0.5)
+        self.c_global_start = params.get('acceleration_global_start', 0.5)
+        self.c_global_end = params.get('acceleration_global_end', 2.5)
+        if self.inertia_schedule == 'constriction':
+            if self.acceleration_schedule != 'constant':
+                raise ValueError("The constriction factor requires constant acceleration constants")
+            phi = self.c_local + self.c_global
+            if phi <= 4:
+                raise ValueError("The constriction factor requires acceleration_constant_local + acceleration_constant_global > 4, got {}".format(phi))
+            self.chi = 2.0/abs(2.0 - phi - np.sqrt(phi**2 - 4.0*phi))
+        # Feedback of the adaptive inertia
+        self.initial_diversity = None
+        self.N_improved = 0
+        self.values = (self.inertia, self.c_local, self.c_global, None)
+        self.file = None
+        self.writer = None
+
+    def is_constant(self):
+        return self.inertia_schedule == 'constant' and self.acceleration_schedule == 'constant'
+
+    def get_values(self):
+        return self.values
+
+    def start(self, swarm):
+        """
+        Function that records the initial diversity of the swarm used by the adaptive feedback, after its first evaluation
+        (whose successful evaluations all count as improvements, so that the first iteration explores).
+        """
+        self.initial_diversity = swarm.get_diversity()
+        return 0
+
+    def get_coefficients(self, N_iter, swarm):
+        """
+        Function that returns the coefficients of the velocity update of iteration N_iter (1 for the first update).
+        return: inertia weight, local and global acceleration constants
+        """
+        t = min(1.0, (N_iter - 1)/max(1, self.max_iter - 1))
+        feedback = None
+        c_local, c_global = self.c_local, self.c_global
+        if self.acceleration_schedule == 'tvac':
+            c_local = self.c_local_start + (self.c_local_end - self.c_local_start)*t
+            c_global = self.c_global_start + (self.c_global_end - self.c_global_start)*t
+        if self.inertia_schedule == 'constant':
+            inertia = self.inertia
+        elif self.inertia_schedule == 'linear':
+            inertia = self.inertia_start + (self.inertia_end - self.inertia_start)*t
+        elif self.inertia_schedule == 'constriction':
+            inertia, c_local, c_global = self.chi, self.chi*c_local, self.chi*c_global
+        else:
+            if self.feedback == 'success_rate':
+                feedback = (swarm.N_improved - self.N_improved)/swarm.get_size()
+                self.N_improved = swarm.N_improved
+            else:
+                feedback = swarm.get_diversity()/self.initial_diversity if self.initial_diversity else 0.0
+            inertia = self.inertia_end + (self.inertia_start - self.inertia_end)*min(1.0, feedback)
+        self.values = (inertia, c_local, c_global, feedback)
+        return inertia, c_local, c_global
+
+    def open(self, path, mode='w'):
+        """
+        Function that opens the per-iteration log of the coefficients (csv), unless they are constant.
+        """
+        if self.is_constant():
+            return 0
+        self.file = open(path, mode, newline='')
+        self.writer = csv.writer(self.file)
+        if mode == 'w':
+            self.writer.writerow(['Iteration', 'Inertia weight', 'Acceleration constant local', 'Acceleration constant global',
+                                  'Feedback ({})'.format(self.feedback) if self.inertia_schedule == 'adaptive' else 'Feedback'])
+        return 0
+
+    def write_iteration(self, N_iter):
+        if self.writer is not None:
+            self.writer.writerow([N_iter] + list(self.values))
+        return 0
+
+    def tell(self):
+        """
+        Function that flushes the log and returns its size, so that it can be truncated back to this point on resume.
+        """
+        if self.file is None:
+            return 0
+        self.file.flush()
+        return self.file.tell()
+
+    def truncate(self, path, size):
+        """
+        Function that truncates the closed log to the size returned by tell.
+        """
+        if not self.is_constant():
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+        return 0
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+        return 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
+        return 0
+
+    def get_state(self):
+        """
+        Function that returns the state of the adaptive feedback as metadata, to be saved in a checkpoint.
+        """
+        return {'schedule': {'initial_diversity': self.initial_diversity, 'N_improved': self.N_improved}}
+
+    def set_state(self, metadata):
+        """
+        Function that restores the state saved with get_state.
+        """
+        self.initial_diversity = metadata['schedule']['initial_diversity']
+        self.N_improved = metadata['schedule']['N_improved']
+        return 0
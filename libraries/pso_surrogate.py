@@ -0,0 +1,164 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Surrogate-assisted pre-screening: every real evaluation is archived and a kriging model (gaussian process with a
+# squared exponential kernel and constant mean) is fitted to the archive. Positions are scaled by the variable ranges
+# and the length scale is chosen by maximum likelihood over a small grid. Each iteration, the positions of the swarm
+# are predicted first and only the surrogate_fraction most promising ones, plus the surrogate_exploration ones with the
+# largest uncertainty, are sent to the real model.
+# Fitting is O(n^3) in the size of the archive, so only the surrogate_max_points best points are used.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# CONSTANTS
+#----------------------------------------------------------------------------------------
+LENGTH_SCALES = (0.05, 0.1, 0.2, 0.5, 1.0) # relative to sqrt(n_vars), the diagonal of the scaled search space
+NUGGET = 1.0e-8
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Surrogate(object):
+    """ Creates an archive of real evaluations and the kriging surrogate fitted to it """
+    def __init__(self, search_space, opt_type, fraction=0.3, exploration=0.1, min_points=None, max_points=500):
+        self.sign = 1.0 if opt_type == 'min' else -1.0
+        self.lbounds = search_space.lbounds
+        self.spans = np.where(search_space.spans > 0, search_space.spans, 1.0)
+        n_vars = search_space.get_number_variables()
+        self.fraction = fraction
+        self.exploration = exploration
+        self.min_points = min_points if min_points else 2*n_vars + 1
+        self.max_points = max_points
+        self.X = np.empty((0, n_vars))
+        self.y = np.empty(0)
+        self.model = None
+        self.N_screened = 0
+
+    def get_size(self):
+        return self.y.shape[0]
+
+    def get_N_screened(self):
+        return self.N_screened
+
+    def is_ready(self):
+        return self.get_size() >= self.min_points
+
+    def add(self, positions, fitness):
+        """
+        Function that archives real evaluations (failed evaluations are skipped) and marks the surrogate for refitting.
+        """
+        valid = ~np.isnan(fitness)
+        self.X = np.vstack((self.X, (positions[valid] - self.lbounds)/self.spans))
+        self.y = np.concatenate((self.y, fitness[valid]))
+        self.model = None
+        return 0
+
+    def fit(self):
+        """
+        Function that fits the kriging model to the best max_points points of the archive.
+        """
+        # Repeated positions (common with discrete variables) would make the kernel matrix singular
+        _, unique_rows = np.unique(self.X, axis=0, return_index=True)
+        rows = unique_rows[np.argsort(self.sign*self.y[unique_rows], kind='stable')[:self.max_points]]
+        X = self.X[rows]
+        y = self.y[rows]
+        y_mean = y.mean()
+        y_std = y.std() if y.std() > 0 else 1.0
+        z = (y - y_mean)/y_std
+        sq_distances = _sq_distances(X, X)
+        n_vars = X.shape[1]
+        best = None
+        for scale in LENGTH_SCALES:
+            length = scale*np.sqrt(n_vars)
+            K = np.exp(-0.5*sq_distances/length**2) + NUGGET*np.eye(len(z))
+            try:
+                L = np.linalg.cholesky(K)
+            except np.linalg.LinAlgError:
+                continue
+            alpha = np.linalg.solve(L.T, np.linalg.solve(L, z))
+            # Negative log marginal likelihood, with the process variance profiled out
+            variance = z.dot(alpha)/len(z)
+            nll = 0.5*len(z)*np.log(max(variance, 1.0e-300)) + np.log(np.diag(L)).sum()
+            if best is None or nll < best[0]:
+                best = (nll, length, L, alpha, variance)
+        if best is None:
+            self.model = None
+            return 0
+        _, length, L, alpha, variance = best
+        self.model = {'X': X, 'length': length, 'L': L, 'alpha': alpha, 'variance': variance, 'y_mean': y_mean, 'y_std': y_std}
+        return 0
+
+    def predict(self, positions):
+        """
+        Function that predicts the fitness of encoded positions.
+        return: (n,) arrays with the predicted fitness and its standard deviation
+        """
+        if self.model is None:
+            self.fit()
+        m = self.model
+        k = np.exp(-0.5*_sq_distances((positions - self.lbounds)/self.spans, m['X'])/m['length']**2)
+        mean = m['y_mean'] + m['y_std']*k.dot(m['alpha'])
+        v = np.linalg.solve(m['L'], k.T)
+        std = m['y_std']*np.sqrt(np.maximum(m['variance']*(1.0 - np.sum(v**2, axis=0)), 0.0))
+        return mean, std
+
+    def select(self, positions):
+        """
+        Function that selects the positions to be evaluated by the real model: the most promising fraction according to
+        the predicted fitness and, among the rest, the ones with the largest uncertainty.
+        return: sorted array with the rows to be evaluated
+        """
+        n = positions.shape[0]
+        if not self.is_ready():
+            return np.arange(n)
+        if self.model is None:
+            self.fit()
+        if self.model is None:
+            return np.arange(n)
+        mean, std = self.predict(positions)
+        n_promising = int(np.ceil(self.fraction*n))
+        n_exploration = int(np.ceil(self.exploration*n))
+        order = np.argsort(self.sign*mean, kind='stable')
+        promising = order[:n_promising]
+        rest = order[n_promising:]
+        exploration = rest[np.argsort(-std[rest], kind='stable')[:n_exploration]]
+        rows = np.sort(np.concatenate((promising, exploration)))
+        self.N_screened += n - rows.shape[0]
+        return rows
+
+    def get_state(self):
+        """
+        Function that returns the archive and counters as (arrays, metadata), to be saved in a checkpoint.
+        """
+        return {'surrogate_X': self.X, 'surrogate_y': self.y}, {'surrogate': [self.N_screened]}
+
+    def set_state(self, arrays, metadata):
+        """
+        Function that restores the archive saved with get_state.
+        """
+        self.X = arrays['surrogate_X'].copy()
+        self.y = arrays['surrogate_y'].copy()
+        self.N_screened = metadata['surrogate'][0]
+        self.model = None
+        return 0
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def _sq_distances(A, B):
+    """
+    Function that returns the matrix of squared euclidean distances between the rows of A and B.
+    """
+    return np.maximum(np.sum(A**2, axis=1)[:, None] + np.sum(B**2, axis=1)[None, :] - 2*A.dot(B.T), 0.0)
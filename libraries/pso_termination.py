@@ -0,0 +1,95 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Termination criteria checked after every iteration, in addition to max_iterations. A criterion is disabled when
+# its parameter is 0 (or null for the fitness target):
+#   - stagnation: the best fitness improved by less than termination_stagnation_tolerance over the last
+#     termination_stagnation_window iterations
+#   - fitness target: the best fitness reached termination_fitness_target
+#   - diversity: the swarm diversity (see Swarm.get_diversity) fell below termination_min_diversity
+#   - evaluations: the number of evaluations reached termination_max_evaluations
+#   - wall time: the run took longer than termination_max_wall_time seconds
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import time
+import collections
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Termination_criteria(object):
+    """ Creates the set of termination criteria of a run """
+    def __init__(self, params, opt_type):
+        self.sign = 1.0 if opt_type == 'min' else -1.0
+        self.max_iter = params['max_iterations']
+        self.stagnation_window = params.get('termination_stagnation_window', 0)
+        self.stagnation_tolerance = params.get('termination_stagnation_tolerance', 0.0)
+        self.fitness_target = params.get('termination_fitness_target')
+        self.min_diversity = params.get('termination_min_diversity', 0)
+        self.max_evals = params.get('termination_max_evaluations', 0)
+        self.max_wall_time = params.get('termination_max_wall_time', 0)
+        self.history = collections.deque(maxlen=self.stagnation_window + 1 if self.stagnation_window else 1)
+        self.elapsed_before = 0.0
+        self.start_time = time.perf_counter()
+        self.reason = None
+
+    def get_reason(self):
+        return self.reason
+
+    def get_wall_time(self):
+        return self.elapsed_before + time.perf_counter() - self.start_time
+
+    def check(self, N_iter, best_fitness, N_evals, swarm):
+        """
+        Function that checks all criteria after an iteration.
+        return: the reason for stopping, or None if the run should continue
+        """
+        self.history.append(best_fitness)
+        return self.recheck(N_iter, N_evals, swarm)
+
+    def recheck(self, N_iter, N_evals, swarm):
+        """
+        Function that checks all criteria against the current history, without adding an iteration to it (e.g. after
+        restoring a checkpoint, so that the criteria of the resumed run apply).
+        return: the reason for stopping, or None if the run should continue
+        """
+        best_fitness = self.history[-1] if self.history else None
+        self.reason = None
+        if N_iter >= self.max_iter:
+            self.reason = 'max_iterations'
+        elif self.fitness_target is not None and best_fitness is not None and self.sign*best_fitness <= self.sign*self.fitness_target:
+            self.reason = 'fitness_target'
+        elif self.stagnation_window and len(self.history) == self.history.maxlen and \
+                self.sign*(self.history[0] - self.history[-1]) < self.stagnation_tolerance:
+            self.reason = 'stagnation'
+        elif self.min_diversity and swarm.get_diversity() < self.min_diversity:
+            self.reason = 'diversity'
+        elif self.max_evals and N_evals >= self.max_evals:
+            self.reason = 'max_evaluations'
+        elif self.max_wall_time and self.get_wall_time() >= self.max_wall_time:
+            self.reason = 'max_wall_time'
+        return self.reason
+
+    def get_state(self):
+        """
+        Function that returns the state of the criteria as metadata, to be saved in a checkpoint.
+        """
+        return {'termination': {'history': list(self.history), 'wall_time': self.get_wall_time()}}
+
+    def set_state(self, metadata):
+        """
+        Function that restores the state saved with get_state. The reason for stopping is not restored: the criteria are
+        checked again with recheck, so that a run can be resumed with a larger budget.
+        """
+        self.history.extend(metadata['termination']['history'])
+        self.elapsed_before = metadata['termination']['wall_time']
+        self.start_time = time.perf_counter()
+        return 0
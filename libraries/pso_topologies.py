@@ -0,0 +1,123 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Neighbourhood topologies of the swarm. With a local topology the social term of the velocity update points to the
+# best personal best among the neighbours of each particle (lbest), instead of the swarm best position (gbest).
+# The neighbours are precomputed as a (swarm_size, n_neighbours) array of row indexes, each particle included, so
+# that the local bests of all particles are found with a single gather and argmin.
+#   - global: every particle is informed by the whole swarm (gbest, the default; called star in the PSO literature)
+#   - ring: particle i is informed by the topology_neighbours particles on each side of it
+#   - von_neumann: particle i is informed by its 4 neighbours (left, right, up, down) on a grid of about sqrt(swarm_size)
+#     columns, filled row by row, whose rows and columns wrap around (a torus)
+#   - wheel: particle 0 (the hub) is informed by the whole swarm and every other particle only by particle 0
+#   - random: particle i is informed by topology_neighbours random particles, drawn again every
+#     topology_rebuild_every iterations
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import numpy as np
+
+
+#----------------------------------------------------------------------------------------
+# CLASSES
+#----------------------------------------------------------------------------------------
+class Topology(object):
+    """ Creates a neighbourhood topology for a swarm of a given size """
+    def __init__(self, name, size, opt_type, n_neighbours=1, rebuild_every=0, rng=None):
+        self.name = name
+        self.size = size
+        self.sign = 1.0 if opt_type == 'min' else -1.0
+        self.n_neighbours = n_neighbours
+        self.rebuild_every = rebuild_every
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.neighbours = None
+        self.build()
+
+    def get_name(self):
+        return self.name
+
+    def get_neighbours(self):
+        return self.neighbours
+
+    def build(self):
+        """
+        Function that builds the array of neighbours of every particle.
+        """
+        i = np.arange(self.size)
+        if self.name == 'ring':
+            offsets = np.arange(-self.n_neighbours, self.n_neighbours + 1)
+            self.neighbours = (i[:, None] + offsets) % self.size
+        elif self.name == 'von_neumann':
+            # Particle i sits at (r, c) of a grid filled row by row; rows and columns wrap around on their own length,
+            # which is shorter for the last row and for the columns it does not reach when the grid is incomplete
+            cols = int(np.ceil(np.sqrt(self.size)))
+            n_rows = -(-self.size//cols)
+            last_row_length = self.size - (n_rows - 1)*cols
+            r, c = np.divmod(i, cols)
+            row_length = np.where(r == n_rows - 1, last_row_length, cols)
+            col_length = np.where(c < last_row_length, n_rows, n_rows - 1)
+            self.neighbours = np.column_stack((i, r*cols + (c - 1) % row_length, r*cols + (c + 1) % row_length,
+                                               ((r - 1) % col_length)*cols + c, ((r + 1) % col_length)*cols + c))
+        elif self.name == 'random':
+            self.neighbours = np.hstack((i[:, None], self.rng.integers(0, self.size, (self.size, self.n_neighbours))))
+        elif self.name == 'wheel':
+            # The neighbours of particle 0 (the whole swarm) are handled in get_local_bests
+            self.neighbours = np.column_stack((i, np.zeros(self.size, dtype=int)))
+        return 0
+
+    def next_iteration(self, N_iter):
+        """
+        Function that rebuilds the random topology when due, before the velocity update of iteration N_iter.
+        """
+        if self.name == 'random' and self.rebuild_every and N_iter % self.rebuild_every == 0:
+            self.build()
+        return 0
+
+    def get_local_bests(self, best_fitness, rows=slice(None)):
+        """
+        Function that returns, for the given rows, the row of the neighbour with the best personal best fitness.
+        """
+        score = np.where(np.isnan(best_fitness), np.inf, self.sign*best_fitness)
+        neighbours = self.neighbours[rows]
+        local_bests = neighbours[np.arange(neighbours.shape[0]), np.argmin(score[neighbours], axis=1)]
+        if self.name == 'wheel':
+            local_bests[np.arange(self.size)[rows] == 0] = np.argmin(score)
+        return local_bests
+
+    def get_state(self):
+        """
+        Function that returns the state of the topology as (arrays, metadata), to be saved in a checkpoint.
+        """
+        return {'topology_neighbours': self.neighbours}, {'topology': self.name}
+
+    def set_state(self, arrays, metadata):
+        """
+        Function that restores the state saved with get_state.
+        """
+        self.neighbours = arrays['topology_neighbours'].copy()
+        return 0
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def create_topology(params, size, rng=None):
+    """
+    Function that creates the topology set in the parameters for a swarm of a given size (random neighbours are drawn from rng).
+    return: a Topology, or None for the global topology
+    """
+    names = ('global', 'ring', 'von_neumann', 'wheel', 'random')
+    name = params.get('topology', 'global')
+    if name not in names:
+        raise ValueError("Unknown topology <{}>. Possible values: {}".format(name, ', '.join(names)))
+    if name == 'global':
+        return None
+    default_neighbours = 3 if name == 'random' else 1
+    return Topology(name, size, params['opt_type'], params.get('topology_neighbours') or default_neighbours,
+                    params.get('topology_rebuild_every', 1), rng)
@@ -0,0 +1,95 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Standard benchmark functions, written as batch models on a (n, n_vars) array, so that they work for any dimension.
+# BENCHMARKS holds, for each benchmark, the model function, the bounds of every variable, the known optimum and
+# whether every other variable is an int (mixed-integer variants). All optima are minima.
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import math
+import numpy as np
+from pso_models import batch_model
+
+
+#----------------------------------------------------------------------------------------
+# BENCHMARK FUNCTIONS
+#----------------------------------------------------------------------------------------
+@batch_model(inputs='array')
+def sphere(x):
+    return np.sum(x**2, axis=1)
+
+
+@batch_model(inputs='array')
+def rosenbrock(x):
+    return np.sum(100*(x[:, 1:] - x[:, :-1]**2)**2 + (1 - x[:, :-1])**2, axis=1)
+
+
+@batch_model(inputs='array')
+def rastrigin(x):
+    return 10*x.shape[1] + np.sum(x**2 - 10*np.cos(2*math.pi*x), axis=1)
+
+
+@batch_model(inputs='array')
+def ackley(x):
+    return -20*np.exp(-0.2*np.sqrt(np.mean(x**2, axis=1))) - np.exp(np.mean(np.cos(2*math.pi*x), axis=1)) + 20 + math.e
+
+
+@batch_model(inputs='array')
+def griewank(x):
+    i = np.arange(1, x.shape[1]+1)
+    return 1 + np.sum(x**2, axis=1)/4000 - np.prod(np.cos(x/np.sqrt(i)), axis=1)
+
+
+@batch_model(inputs='array')
+def schwefel(x):
+    return 418.9828872724339*x.shape[1] - np.sum(x*np.sin(np.sqrt(np.abs(x))), axis=1)
+
+
+BENCHMARKS = {
+    'sphere': {'model_function': 'sphere', 'bounds': (-5.12, 5.12), 'optimum': 0.0, 'mixed_integer': False},
+    'rosenbrock': {'model_function': 'rosenbrock', 'bounds': (-5.0, 10.0), 'optimum': 0.0, 'mixed_integer': False},
+    'rastrigin': {'model_function': 'rastrigin', 'bounds': (-5.12, 5.12), 'optimum': 0.0, 'mixed_integer': False},
+    'ackley': {'model_function': 'ackley', 'bounds': (-32.768, 32.768), 'optimum': 0.0, 'mixed_integer': False},
+    'griewank': {'model_function': 'griewank', 'bounds': (-600.0, 600.0), 'optimum': 0.0, 'mixed_integer': False},
+    'schwefel': {'model_function': 'schwefel', 'bounds': (-500.0, 500.0), 'optimum': 0.0, 'mixed_integer': False},
+    'sphere_mixed_integer': {'model_function': 'sphere', 'bounds': (-5.12, 5.12), 'optimum': 0.0, 'mixed_integer': True},
+    'rastrigin_mixed_integer': {'model_function': 'rastrigin', 'bounds': (-5.12, 5.12), 'optimum': 0.0, 'mixed_integer': True},
+    'ackley_mixed_integer': {'model_function': 'ackley', 'bounds': (-32.768, 32.768), 'optimum': 0.0, 'mixed_integer': True},
+}
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def get_benchmark_search_space(name, dimension):
+    """
+    Function that returns the search space of a benchmark for a given dimension, in the format of inputs.yaml.
+    In mixed-integer variants every other variable (x2, x4, ...) is an int with integer bounds.
+    """
+    benchmark = BENCHMARKS[name]
+    lb, ub = benchmark['bounds']
+    search_space = {}
+    for i in range(1, dimension+1):
+        if benchmark['mixed_integer'] and i % 2 == 0:
+            search_space['x{}'.format(i)] = {'LBound': math.ceil(lb), 'UBound': math.floor(ub), 'Type': 'int'}
+        else:
+            search_space['x{}'.format(i)] = {'LBound': lb, 'UBound': ub, 'Type': 'float'}
+    return search_space
+
+
+#----------------------------------------------------------------------------------------
+# TESTING
+#----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    x = np.zeros((1, 4))
+    for name in ('sphere', 'rastrigin', 'ackley', 'griewank'):
+        print(name, BENCHMARKS[name]['optimum'], eval(name)(x))
+    print('rosenbrock', rosenbrock(np.ones((1, 4))))
+    print('schwefel', schwefel(np.full((1, 4), 420.9687462275036)))
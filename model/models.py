@@ -11,6 +11,9 @@ __email__ = "luis.hmd@gmail.com"
 # IMPORTS
 #----------------------------------------------------------------------------------------
 import math
+import numpy as np
+from pso_models import batch_model
+from benchmark_models import sphere, rosenbrock, rastrigin, ackley, griewank, schwefel
 
 #----------------------------------------------------------------------------------------
 # FUNCTIONS
@@ -26,10 +29,38 @@ def model_polynomial(inputs):
     return output
 
 
+@batch_model(inputs='dict')
+def model_polynomial_batch(inputs):
+    # extract inputs values (one array per variable)
+    x1 = inputs['x1']
+    x2 = inputs['x2']
+
+    # evaluate model for all points at once
+    output = np.sqrt(x1) + 3*x2**2
+
+    return output
+
+
+@batch_model(inputs='dict')
+def model_polynomial_two_objectives(inputs):
+    # extract inputs values (one array per variable)
+    x1 = inputs['x1']
+    x2 = inputs['x2']
+
+    # evaluate both objectives for all points at once, one column per objective
+    cost = np.sqrt(x1) + 3*x2**2
+    yield_ = (x1 - 50)**2 + (x2 - 20)**2
+
+    return np.column_stack((cost, yield_))
+
+
 #----------------------------------------------------------------------------------------
 # TESTING
 #----------------------------------------------------------------------------------------
 if __name__ == "__main__":
     inputs = {'x1': 2, 'x2': 10}
     out = model_polynomial(inputs)
+    print(out)
+    inputs = {'x1': np.array([2, 4]), 'x2': np.array([10, 0])}
+    out = model_polynomial_batch(inputs)
     print(out)
\ No newline at end of file
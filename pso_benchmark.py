@@ -0,0 +1,179 @@
+__author__ = "Luis Domingues"
+__maintainer__ = "Luis Domingues"
+__email__ = "luis.hmd@gmail.com"
+
+#----------------------------------------------------------------------------------------
+# Notes
+#----------------------------------------------------------------------------------------
+# Runs the benchmark functions of model/benchmark_models.py over a sweep of dimensions, swarm sizes and numbers of
+# iterations (see inputs/benchmark.yaml) and writes a csv report to outputs/benchmarks/. Each case runs in a fresh
+# process, so that its peak memory (resident set size) is not affected by the previous cases.
+# Two reports, e.g. from different versions of the library, can be compared with:
+#   python pso_benchmark.py --compare old_report.csv new_report.csv
+
+
+#----------------------------------------------------------------------------------------
+# IMPORTS
+#----------------------------------------------------------------------------------------
+import sys
+import os
+import csv
+import time
+import argparse
+import datetime
+import itertools
+import subprocess
+import multiprocessing
+import concurrent.futures
+import yaml
+import lib_path_ops
+import lib_directory_ops
+import benchmark_models
+import pso_classes as pso
+try:
+    import resource
+except ImportError: # not available on Windows
+    resource = None
+
+
+#----------------------------------------------------------------------------------------
+    # PRE-CALCULATIONS
+#----------------------------------------------------------------------------------------
+# Get inputs
+root_dir = os.getcwd()
+root_dir = root_dir+'/'
+
+REPORT_COLUMNS = ['label', 'commit', 'benchmark', 'dimension', 'swarm_size', 'max_iterations', 'seed', 'wall_time_s',
+                  'N_evals', 'evals_per_s', 'peak_rss_mb', 'best_fitness', 'optimum', 'gap', 'success']
+CASE_COLUMNS = ['benchmark', 'dimension', 'swarm_size', 'max_iterations', 'seed']
+
+
+#----------------------------------------------------------------------------------------
+# FUNCTIONS
+#----------------------------------------------------------------------------------------
+def get_parameters(root_dir):
+    """
+    Function that reads the benchmark settings and the main parameters from the yaml config files
+    :param root_dir: directory of execution
+    :return: dictionary with the benchmark settings and dictionary with the parameters shared by all the runs
+    """
+    try:
+        with open(lib_path_ops.join_paths(root_dir, 'inputs/inputs.yaml'), 'r') as ymlfile:
+            cfg = yaml.load(ymlfile, Loader=yaml.FullLoader)
+        with open(lib_path_ops.join_paths(root_dir, 'inputs/benchmark.yaml'), 'r') as ymlfile:
+            cfg_benchmark = yaml.load(ymlfile, Loader=yaml.FullLoader)
+        params_dic = cfg['Main parameters']
+        params_dic.update(cfg_benchmark['Main parameters'])
+        params_dic["Excel template file"] = lib_path_ops.join_paths(root_dir, lib_path_ops.join_paths('outputs/', params_dic['output_template']))
+        print("Loaded inputs successfully.")
+        return cfg_benchmark['Benchmark'], params_dic
+    except:
+        print("Failed to load inputs. Exiting...")
+        sys.exit(1)
+
+
+def get_commit(root_dir):
+    """
+    Function that returns the current git commit of the library, or None if it cannot be determined
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=root_dir, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def run_case(name, dimension, swarm_size, max_iterations, seed, params, runs_dir):
+    """
+    Function that runs a single benchmark case (in its own process) and returns its measurements
+    """
+    benchmark = benchmark_models.BENCHMARKS[name]
+    search_space = benchmark_models.get_benchmark_search_space(name, dimension)
+    params = dict(params)
+    params.update({'model_function': benchmark['model_function'], 'swarm_size': swarm_size, 'max_iterations': max_iterations,
+                   'seed': seed, 'Excel output dir': runs_dir})
+    pso_alg = pso.pso(search_space, params)
+    start = time.perf_counter()
+    best_particle = pso_alg.execute()
+    wall_time = time.perf_counter() - start
+    peak_rss = None
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024.0 # kB on Linux
+    N_evals = pso_alg.statistics['N_evals']
+    return {'wall_time_s': wall_time, 'N_evals': N_evals, 'evals_per_s': N_evals/wall_time, 'peak_rss_mb': peak_rss,
+            'best_fitness': best_particle.get_fitness(), 'optimum': benchmark['optimum'],
+            'gap': abs(best_particle.get_fitness() - benchmark['optimum'])}
+
+
+def run_benchmarks(settings, params, root_dir):
+    """
+    Function that runs every combination of the benchmark settings and writes the report
+    :return: path of the report
+    """
+    date_time = datetime.datetime.now().strftime("%d%m%Y_%H%M%S")
+    benchmarks_dir = lib_path_ops.join_paths(root_dir, 'outputs/benchmarks/')
+    if not lib_path_ops.path_exists(benchmarks_dir):
+        lib_directory_ops.create_dir(lib_path_ops.join_paths(root_dir, 'outputs/'), 'benchmarks')
+    runs_dir = lib_directory_ops.create_dir(benchmarks_dir, 'runs_' + date_time)
+    report_file = lib_path_ops.join_paths(benchmarks_dir, 'benchmark_' + date_time + '.csv')
+    commit = get_commit(root_dir)
+    cases = itertools.product(settings['benchmarks'], settings['dimensions'], settings['swarm_sizes'],
+                              settings['max_iterations'], settings['seeds'])
+    with open(report_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        for case in cases:
+            # A fresh process per case, so that peak memory is measured for this case only
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                result = executor.submit(run_case, *case, params, runs_dir).result()
+            row = dict(zip(CASE_COLUMNS, case))
+            row.update(result)
+            row.update({'label': settings.get('label'), 'commit': commit,
+                        'success': result['gap'] <= settings.get('success_tolerance', 1.0e-4)})
+            writer.writerow(row)
+            f.flush()
+            print("{benchmark}\td={dimension}\tn={swarm_size}\titer={max_iterations}\tseed={seed}\t"
+                  "{wall_time_s:.3f} s\t{evals_per_s:.0f} evals/s\tgap={gap:.3e}".format(**row))
+    print("\nReport written to {}".format(report_file))
+    return report_file
+
+
+def read_report(report_file):
+    """
+    Function that reads a benchmark report and returns a dictionary of rows keyed by case
+    """
+    rows = {}
+    with open(report_file, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            rows[tuple(row[c] for c in CASE_COLUMNS)] = row
+    return rows
+
+
+def compare_reports(old_report_file, new_report_file):
+    """
+    Function that prints, for every case present in both reports, the speed-up in wall time and evaluations per second
+    and the change in the gap to the optimum
+    """
+    old = read_report(old_report_file)
+    new = read_report(new_report_file)
+    print("benchmark\tdimension\tswarm_size\tmax_iterations\tseed\twall time speed-up\tevals/s ratio\tgap old\tgap new")
+    for case in sorted(set(old.keys()) & set(new.keys())):
+        o = old[case]
+        n = new[case]
+        speed_up = float(o['wall_time_s'])/float(n['wall_time_s'])
+        evals_ratio = float(n['evals_per_s'])/float(o['evals_per_s'])
+        print("\t".join(case) + "\t{:.2f}\t{:.2f}\t{:.3e}\t{:.3e}".format(speed_up, evals_ratio, float(o['gap']), float(n['gap'])))
+    return 0
+
+
+#----------------------------------------------------------------------------------------
+# EXECUTION
+#----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pso benchmark suite or compare two benchmark reports.")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD_REPORT', 'NEW_REPORT'), help="compare two benchmark reports")
+    args = parser.parse_args()
+    if args.compare:
+        compare_reports(*args.compare)
+    else:
+        settings, params_dic = get_parameters(root_dir)
+        run_benchmarks(settings, params_dic, root_dir)
@@ -5,6 +5,15 @@ __email__ = "luis.hmd@gmail.com"
 #----------------------------------------------------------------------------------------
 # Notes
 #----------------------------------------------------------------------------------------
+# Command line interface:
+#   python pso_main.py [config] [--set name=value ...] [--format csv|jsonl|binary] [--output-dir dir] [--headless]
+#                      [--resume checkpoint]
+# config is inputs/inputs.yaml by default; configs ending in .json are read with the json module, without importing yaml.
+# The values of --set are parsed as json (numbers, true/false/null, lists, objects), True/False/None/null as in the
+# yaml file, or else kept as strings.
+# --headless does not write to the console nor the excel file (so the template is neither copied nor loaded), for
+# batch jobs launched by a scheduler; the results are written to the results log only.
+# Only the modules of the selected mode are imported (e.g. openpyxl only when the excel file is written).
 
 
 #----------------------------------------------------------------------------------------
@@ -12,9 +21,9 @@ __email__ = "luis.hmd@gmail.com"
 #----------------------------------------------------------------------------------------
 import sys
 import os
+import json
+import argparse
 import lib_path_ops
-import yaml
-import pso_classes as pso
 
 
 #----------------------------------------------------------------------------------------
@@ -28,40 +37,116 @@ root_dir = root_dir+'/'
 #----------------------------------------------------------------------------------------
 # FUNCTIONS
 #----------------------------------------------------------------------------------------
-def get_parameters(root_dir):
+def parse_value(value):
+    """
+    Function that converts the value of a --set argument into a number, boolean, None, list or dictionary when possible.
+    """
+    try:
+        return json.loads(value)
+    except ValueError:
+        return {'True': True, 'False': False, 'None': None, 'null': None}.get(value, value)
+
+
+def load_config(config_file):
+    """
+    Function that reads a yaml (or json) config file and returns its contents as a dictionary
+    """
+    with open(config_file, 'r') as f:
+        if config_file.endswith('.json'):
+            return json.load(f)
+        import yaml
+        return yaml.load(f, Loader=yaml.FullLoader)
+
+
+def get_parameters(root_dir, config_file='inputs/inputs.yaml', overrides=None, headless=False):
     """
     Function that reads the yaml inputs config file and returns a dictionary with all the parameters
     :param root_dir: directory of execution
+    :param config_file: config file, relative to root_dir or absolute
+    :param overrides: dictionary of main parameters replacing the ones of the config file
+    :param headless: if True then nothing is written to the console nor to the excel file
     :return: dictionary containing all the parameters needed to run the script
     """
     # Get inputs from inputs.yaml
     try:
-        input_file = lib_path_ops.join_paths(root_dir, 'inputs/inputs.yaml')
-        with open(input_file, 'r') as ymlfile:
-            cfg = yaml.load(ymlfile, Loader=yaml.FullLoader)
+        cfg = load_config(lib_path_ops.join_paths(root_dir, config_file))
         search_space_dic = cfg['Decision variables']
         main_params_dic = cfg['Main parameters']
+        main_params_dic.update(overrides or {})
+        if headless:
+            main_params_dic.update({'headless': True, 'write_to_console': False, 'write_excel': False})
 
         additional_params_dic = {
-            "Excel output dir": lib_path_ops.join_paths(root_dir, 'outputs/'),
-            "Excel template file": lib_path_ops.join_paths(root_dir, lib_path_ops.join_paths('outputs/', main_params_dic['output_template'])),
+            "Excel output dir": main_params_dic.get('output_dir') or lib_path_ops.join_paths(root_dir, 'outputs/'),
         }
+        if main_params_dic.get('write_excel', True):
+            additional_params_dic["Excel template file"] = lib_path_ops.join_paths(root_dir, lib_path_ops.join_paths('outputs/', main_params_dic['output_template']))
 
         params_dic = main_params_dic
         params_dic.update(additional_params_dic)
+        params_dic['constraints'] = cfg.get('Constraints') or {}
 
-        print("Loaded inputs successfully.")
+        if params_dic['write_to_console']:
+            print("Loaded inputs successfully.")
         return search_space_dic, params_dic
     except:
         print("Failed to load inputs. Exiting...")
         sys.exit(1)
 
 
+def run(search_space, params_dic):
+    """
+    Function that runs the mode selected in the parameters, importing only the modules it needs
+    :return: results of the mode (best particle, or Pareto archive in multi-objective mode)
+    """
+    if params_dic.get('multiobjective', False):
+        import pso_multiobjective
+        return pso_multiobjective.run_multiobjective(search_space, params_dic)[0]
+    elif params_dic.get('multistart_runs', 0) > 1:
+        import pso_multistart
+        return pso_multistart.run_multistart(search_space, params_dic)[0]
+    elif params_dic.get('islands', 0) > 1:
+        import pso_islands
+        return pso_islands.run_islands(search_space, params_dic)[0]
+    import pso_classes as pso
+    pso_alg = pso.pso(search_space, params_dic)
+    if params_dic.get('resume_from'):
+        return pso_alg.resume(params_dic['resume_from'])
+    return pso_alg.execute()
+
+
+def parse_arguments(argv=None):
+    """
+    Function that parses the command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Run a particle swarm optimisation.")
+    parser.add_argument('config', nargs='?', default='inputs/inputs.yaml', help="yaml or json config file (default: inputs/inputs.yaml)")
+    parser.add_argument('--set', dest='overrides', action='append', default=[], metavar='NAME=VALUE',
+                        help="replace a main parameter of the config file (can be repeated)")
+    parser.add_argument('--format', dest='results_format', choices=('csv', 'jsonl', 'binary'), help="format of the results log")
+    parser.add_argument('--output-dir', help="directory where the output subdirectory of the run is created (default: outputs/)")
+    parser.add_argument('--headless', action='store_true', help="write neither to the console nor to the excel file")
+    parser.add_argument('--resume', dest='resume_from', metavar='CHECKPOINT', help="resume a run from a checkpoint file")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for override in args.overrides:
+        name, sep, value = override.partition('=')
+        if not sep:
+            parser.error("--set expects NAME=VALUE, got <{}>".format(override))
+        overrides[name.strip()] = parse_value(value.strip())
+    for name in ('results_format', 'resume_from'):
+        if getattr(args, name) is not None:
+            overrides[name] = getattr(args, name)
+    if args.output_dir is not None:
+        overrides['output_dir'] = lib_path_ops.join_paths(os.path.abspath(args.output_dir), '')
+    return args.config, overrides, args.headless
+
 
 #----------------------------------------------------------------------------------------
 # EXECUTION
 #----------------------------------------------------------------------------------------
 if __name__ == "__main__":
-    search_space, params_dic = get_parameters(root_dir)
-    pso_alg = pso.pso(search_space, params_dic)
-    pso_alg.execute()
\ No newline at end of file
+    config_file, overrides, headless = parse_arguments()
+    search_space, params_dic = get_parameters(root_dir, config_file, overrides, headless)
+    run(search_space, params_dic)
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ('libraries', 'model'):
+    sys.path.insert(0, os.path.join(ROOT_DIR, path))
+
+import models
+
+
+def model_mixed(inputs):
+    return (inputs['x1'] - 3)**2 + inputs['n']**2 + (0 if inputs['c'] == 'b' else 5) + inputs['b']
+
+
+@pytest.fixture
+def mixed_space():
+    return {'x1': {'LBound': 0, 'UBound': 10, 'Type': 'float'},
+            'n': {'LBound': -5, 'UBound': 5, 'Type': 'int'},
+            'c': {'Type': 'enumerate', 'Values': ['a', 'b', 'c']},
+            'b': {'Type': 'binary'}}
+
+
+@pytest.fixture
+def float_space():
+    return {'x{}'.format(i): {'LBound': -5, 'UBound': 5, 'Type': 'float'} for i in range(4)}
+
+
+@pytest.fixture
+def make_params(tmp_path, monkeypatch):
+    """
+    Fixture that returns a function building the main parameters of a small headless run writing to tmp_path.
+    """
+    monkeypatch.setattr(models, 'model_mixed', model_mixed, raising=False)
+
+    def _make_params(**overrides):
+        params = {'opt_type': 'min', 'seed': 1, 'model_function': 'model_mixed', 'synchronous': True,
+                  'swarm_size': 20, 'max_iterations': 10, 'enforce_bounds': True,
+                  'enforce_bounds_function': 'reset_to_bounds', 'inertia_weight': 0.6,
+                  'acceleration_constant_local': 1.7, 'acceleration_constant_global': 1.7,
+                  'write_to_console': False, 'write_excel': False, 'Excel output dir': str(tmp_path) + '/',
+                  'Excel template file': os.path.join(ROOT_DIR, 'outputs', 'output_template.xlsx')}
+        params.update(overrides)
+        return params
+    return _make_params
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
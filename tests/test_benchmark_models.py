@@ -0,0 +1,31 @@
+import math
+
+import numpy as np
+import pytest
+
+import benchmark_models
+import pso_classes as pso
+
+OPTIMAL_POINTS = {'sphere': 0.0, 'rosenbrock': 1.0, 'rastrigin': 0.0, 'ackley': 0.0, 'griewank': 0.0, 'schwefel': 420.9687462275036}
+
+
+@pytest.mark.parametrize('name', sorted(OPTIMAL_POINTS))
+def test_benchmarks_reach_their_known_optimum(name, rng):
+    f = getattr(benchmark_models, name)
+    optimum = benchmark_models.BENCHMARKS[name]['optimum']
+    assert f(np.full((1, 5), OPTIMAL_POINTS[name]))[0] == pytest.approx(optimum, abs=1e-6)
+    lb, ub = benchmark_models.BENCHMARKS[name]['bounds']
+    assert np.all(f(rng.uniform(lb, ub, (50, 5))) >= optimum - 1e-9)
+
+
+def test_mixed_integer_search_space_alternates_float_and_int_variables():
+    space = benchmark_models.get_benchmark_search_space('rastrigin_mixed_integer', 4)
+    assert list(space) == ['x1', 'x2', 'x3', 'x4']
+    assert [space[v]['Type'] for v in space] == ['float', 'int', 'float', 'int']
+    assert (space['x2']['LBound'], space['x2']['UBound']) == (math.ceil(-5.12), math.floor(5.12))
+
+
+def test_run_on_sphere_gets_close_to_the_optimum(make_params):
+    space = benchmark_models.get_benchmark_search_space('sphere', 3)
+    best = pso.pso(space, make_params(model_function='sphere', swarm_size=30, max_iterations=60)).execute()
+    assert best.get_fitness() < 1e-3
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import pso_classes as pso
+
+
+def test_record_is_a_read_only_snapshot_of_the_row(mixed_space):
+    sp = pso.Search_space(mixed_space)
+    sp.compile()
+    row = np.array([2.5, -1, 2, 1])
+    record = pso.Best_record.from_row(3, 0.5, row, sp)
+    row[0] = 9.0
+    assert record.get_position_row()[0] == 2.5
+    assert record.get_position() == {'x1': 2.5, 'n': -1, 'c': 'c', 'b': 1}
+    assert (record.p_id, record.get_fitness()) == (3, 0.5)
+    with pytest.raises(ValueError):
+        record.get_position_row()[0] = 1.0
+    with pytest.raises(AttributeError):
+        record.fitness = 0.0
+
+
+def test_best_so_far_is_not_changed_by_later_moves(mixed_space):
+    import conftest
+    swarm = pso.Swarm(pso.Search_space(mixed_space), seed=1)
+    swarm.initialise(10, None)
+    swarm.evaluate(conftest.model_mixed, 'min')
+    best = swarm.get_best_particle_so_far()
+    position, fitness = best.get_position(), best.get_fitness()
+    swarm.update_velocity(0.6, 1.7, 1.7)
+    swarm.update_position(None)
+    assert best.get_position() == position and best.get_fitness() == fitness
+    assert fitness == np.nanmin(swarm.best_fitness)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import pso_bound_functions as pso_bound
+import pso_classes as pso
+
+BOUND_FUNCTIONS = (pso_bound.reset_to_bounds, pso_bound.absorb, pso_bound.reflect, pso_bound.periodic, pso_bound.random_reinit)
+
+
+@pytest.fixture
+def sp(mixed_space):
+    search_space = pso.Search_space(mixed_space)
+    search_space.compile()
+    return search_space
+
+
+@pytest.fixture
+def out_of_bounds(rng):
+    positions = rng.uniform(-30, 30, (200, 4))
+    positions[:, 1:] = np.rint(positions[:, 1:])
+    return positions, rng.uniform(-1, 1, (200, 4))
+
+
+@pytest.mark.parametrize('f_bound', BOUND_FUNCTIONS, ids=lambda f: f.__name__)
+def test_bound_functions_keep_positions_within_bounds(sp, out_of_bounds, rng, f_bound):
+    positions, velocities = out_of_bounds
+    bounded, _ = f_bound(sp, positions.copy(), velocities.copy(), rng=rng)
+    assert bounded.shape == positions.shape
+    assert np.all(bounded >= sp.lbounds) and np.all(bounded <= sp.ubounds)
+    integral = sp.int_mask | sp.discrete_mask
+    assert np.all(bounded[:, integral] == np.rint(bounded[:, integral]))
+
+
+@pytest.mark.parametrize('f_bound', BOUND_FUNCTIONS, ids=lambda f: f.__name__)
+def test_bound_functions_leave_feasible_positions_unchanged(sp, rng, f_bound):
+    positions = np.array([[3.5, -2, 1, 0], [0.0, 5, 2, 1]])
+    velocities = np.ones_like(positions)
+    bounded, bounded_velocities = f_bound(sp, positions.copy(), velocities.copy(), rng=rng)
+    np.testing.assert_array_equal(bounded, positions)
+    np.testing.assert_array_equal(bounded_velocities, velocities)
+
+
+def test_reset_to_bounds_clips_to_the_closest_bound(sp):
+    bounded, _ = pso_bound.reset_to_bounds(sp, np.array([[12.0, -7, 1, 0]]), np.zeros((1, 4)))
+    np.testing.assert_array_equal(bounded, [[10.0, -5, 1, 0]])
+
+
+def test_absorb_zeroes_the_violated_velocities(sp):
+    _, velocities = pso_bound.absorb(sp, np.array([[12.0, 0, 1, 0]]), np.ones((1, 4)))
+    np.testing.assert_array_equal(velocities, [[0, 1, 1, 1]])
+
+
+def test_reflect_mirrors_the_position_and_reverses_the_velocity(sp):
+    bounded, velocities = pso_bound.reflect(sp, np.array([[12.0, 0, 1, 0], [-3.0, 0, 1, 0]]), np.ones((2, 4)))
+    np.testing.assert_allclose(bounded[:, 0], [8.0, 3.0])
+    np.testing.assert_array_equal(velocities[:, 0], [-1, -1])
+
+
+def test_periodic_wraps_around_to_the_opposite_bound(sp):
+    bounded, _ = pso_bound.periodic(sp, np.array([[12.0, 0, 1, 0], [-3.0, 0, 1, 0]]), np.ones((2, 4)))
+    np.testing.assert_allclose(bounded[:, 0], [2.0, 7.0])
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import pso_cache
+import pso_classes as pso
+
+
+@pytest.fixture
+def sp(mixed_space):
+    search_space = pso.Search_space(mixed_space)
+    search_space.compile()
+    return search_space
+
+
+def counting_model(calls):
+    def f_evaluate(positions):
+        calls.append(positions.shape[0])
+        return positions[:, 0]*2
+    return f_evaluate
+
+
+def test_hits_and_misses(sp):
+    cache = pso_cache.Evaluation_cache(sp)
+    calls = []
+    positions = np.array([[1.0, 0, 0, 0], [2.0, 1, 1, 1]])
+    fitness, new_fitness = cache.evaluate(positions, counting_model(calls))
+    np.testing.assert_array_equal(fitness, [2.0, 4.0])
+    assert (cache.get_hits(), cache.get_misses(), new_fitness.shape[0]) == (0, 2, 2)
+    fitness, new_fitness = cache.evaluate(positions[::-1], counting_model(calls))
+    np.testing.assert_array_equal(fitness, [4.0, 2.0])
+    assert (cache.get_hits(), cache.get_misses(), new_fitness.shape[0]) == (2, 2, 0)
+    assert calls == [2]
+
+
+def test_repeated_positions_in_a_batch_are_evaluated_once(sp):
+    cache = pso_cache.Evaluation_cache(sp)
+    calls = []
+    fitness, _ = cache.evaluate(np.array([[1.0, 0, 0, 0]]*3), counting_model(calls))
+    np.testing.assert_array_equal(fitness, [2.0]*3)
+    assert calls == [1] and cache.get_size() == 1
+
+
+def test_least_recently_used_entry_is_evicted(sp):
+    cache = pso_cache.Evaluation_cache(sp, max_size=2)
+    a, b, c = cache.get_keys(np.array([[1.0, 0, 0, 0], [2.0, 0, 0, 0], [3.0, 0, 0, 0]]))
+    cache.store(a, 1.0)
+    cache.store(b, 2.0)
+    assert cache.lookup(a) == 1.0 # a becomes the most recently used
+    cache.store(c, 3.0)
+    assert cache.get_size() == 2
+    assert cache.lookup(b) is None
+    assert (cache.lookup(a), cache.lookup(c)) == (1.0, 3.0)
+
+
+def test_float_variables_are_quantized_by_the_tolerance(sp):
+    cache = pso_cache.Evaluation_cache(sp, tolerance=0.01)
+    keys = cache.get_keys(np.array([[1.001, 0, 0, 0], [0.999, 0, 0, 0], [1.02, 0, 0, 0], [1.0, 1, 0, 0]]))
+    assert keys[0] == keys[1]
+    assert keys[0] != keys[2] and keys[0] != keys[3]
+
+
+def test_state_round_trip(sp):
+    cache = pso_cache.Evaluation_cache(sp)
+    cache.evaluate(np.array([[1.0, 0, 0, 0], [2.0, 1, 1, 1]]), counting_model([]))
+    restored = pso_cache.Evaluation_cache(sp)
+    restored.set_state(*cache.get_state())
+    assert list(restored.table.items()) == list(cache.table.items())
+    assert (restored.get_hits(), restored.get_misses()) == (cache.get_hits(), cache.get_misses())
+
+
+def test_cached_run_reproduces_the_uncached_run(mixed_space, make_params):
+    cached = pso.pso(mixed_space, make_params(cache_evaluations=True))
+    best = cached.execute()
+    assert cached.cache.get_hits() > 0
+    assert best.get_fitness() == pso.pso(mixed_space, make_params()).execute().get_fitness()
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+import pso_checkpoint
+import pso_classes as pso
+
+
+def read_log(pso_alg):
+    with open(pso_alg.params['Results log file']) as f:
+        return f.read().splitlines()
+
+
+def test_save_and_load_round_trip(tmp_path, rng):
+    path = str(tmp_path / 'checkpoint.npz')
+    rng.random(3)
+    arrays, metadata = pso_checkpoint.get_rng_state(rng)
+    arrays['positions'] = np.arange(6.0).reshape(2, 3)
+    metadata['N_iter'] = 4
+    pso_checkpoint.save_checkpoint(path, arrays, metadata)
+    assert not os.path.exists(path + '.tmp')
+    loaded_arrays, loaded_metadata = pso_checkpoint.load_checkpoint(path)
+    np.testing.assert_array_equal(loaded_arrays['positions'], arrays['positions'])
+    assert loaded_metadata['N_iter'] == 4
+    restored = np.random.default_rng()
+    pso_checkpoint.set_rng_state(restored, loaded_metadata)
+    assert restored.random() == rng.random()
+
+
+@pytest.mark.parametrize('options', ({}, {'cache_evaluations': True}, {'topology': 'ring'}, {'synchronous': False}),
+                         ids=('default', 'cache', 'ring', 'asynchronous'))
+def test_resumed_run_writes_the_same_log_as_the_full_run(mixed_space, make_params, options):
+    params = make_params(seed=5, checkpoint_every=7, max_iterations=30, **options)
+    full = pso.pso(mixed_space, dict(params))
+    full.execute()
+
+    interrupted = pso.pso(mixed_space, dict(params, max_iterations=20))
+    interrupted.execute()
+    checkpoint_file = interrupted.params['Checkpoint file']
+    resumed = pso.pso(mixed_space, dict(params))
+    best = resumed.resume(checkpoint_file)
+
+    assert resumed.N_iter == 30
+    assert read_log(resumed) == read_log(full)
+    assert best.get_fitness() == full.best_particle.get_fitness()
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+import conftest
+import pso_classes as pso
+import pso_constraints
+
+sys.path.insert(0, conftest.ROOT_DIR)
+import pso_main
+
+
+@pytest.fixture
+def sp():
+    search_space = pso.Search_space({'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'},
+                                     'x2': {'LBound': -10, 'UBound': 50, 'Type': 'float'}})
+    search_space.compile()
+    return search_space
+
+
+def is_feasible_quadrant(inputs):
+    return (inputs['x1'] > 10) & (inputs['x2'] > 0)
+
+
+@pytest.mark.parametrize('definition, expected', (
+        ('x1 + x2 <= 100', [0.0, 0.0, 20.0]),
+        ('x1 + x2 < 100', [0.0, 0.0, 20.0]),
+        ('x2 >= x1', [0.0, 40.0, 60.0]),
+        ('np.sqrt(x1) > x2 - 10', [0.0, 0.0, 20.0 - np.sqrt(90.0)]),
+))
+def test_inequalities_are_parsed_into_violations(sp, definition, expected):
+    constraints = pso_constraints.Constraints(sp, {'c1': definition})
+    np.testing.assert_allclose(constraints.get_violations(np.array([[0.0, 5.0], [50.0, 10.0], [90.0, 30.0]])), expected)
+
+
+def test_function_constraints_and_total_violation(sp, monkeypatch):
+    monkeypatch.setattr(pso_constraints.models, 'is_feasible_quadrant', is_feasible_quadrant, raising=False)
+    constraints = pso_constraints.Constraints(sp, {'c1': 'x1 <= 50', 'c2': 'is_feasible_quadrant'})
+    assert constraints.get_names() == ['c1', 'c2']
+    np.testing.assert_allclose(constraints.get_violations(np.array([[20.0, 5.0], [60.0, 5.0], [5.0, -5.0]])), [0.0, 10.0, 1.0])
+
+
+@pytest.mark.parametrize('definition', ('x1 <= x2 <= 3', 'not_a_function', 'x1 ='))
+def test_malformed_constraints_are_rejected(sp, definition):
+    with pytest.raises(ValueError):
+        pso_constraints.Constraints(sp, {'c1': definition})
+
+
+def test_infeasible_fitness_by_handling(sp):
+    violations = np.array([0.5, 2.0])
+    np.testing.assert_allclose(pso_constraints.Constraints(sp, {}, 'penalty', 10).get_infeasible_fitness(violations, 'max'), [-15.0, -30.0])
+    assert np.all(np.isnan(pso_constraints.Constraints(sp, {}, 'feasibility').get_infeasible_fitness(violations, 'min')))
+
+
+def test_shipped_config_runs_with_a_constraint_enabled(tmp_path):
+    search_space, params = pso_main.get_parameters(conftest.ROOT_DIR + '/', 'inputs/inputs.yaml', headless=True,
+                                                   overrides={'output_dir': str(tmp_path) + '/', 'max_iterations': 3})
+    params['constraints'] = {'c1': 'x1 + x2 <= 100'}
+    constraints = pso_constraints.create_constraints(pso.Search_space(search_space), params['constraints'], params)
+    assert isinstance(constraints.penalty, float)
+    best = pso_main.run(search_space, params)
+    assert best.get_position()['x1'] + best.get_position()['x2'] <= 100
+    assert os.listdir(str(tmp_path))
+
+
+@pytest.mark.parametrize('handling', ('penalty', 'feasibility'))
+def test_constrained_run_ends_feasible(make_params, monkeypatch, handling):
+    monkeypatch.setattr(pso_constraints.models, 'model_x1', lambda inputs: inputs['x1'], raising=False)
+    space = {'x1': {'LBound': 0, 'UBound': 10, 'Type': 'float'}}
+    params = make_params(model_function='model_x1', constraint_handling=handling, constraints={'c1': 'x1 >= 3.5'}, swarm_size=20, max_iterations=20)
+    best = pso.pso(space, params).execute()
+    assert best.get_position()['x1'] >= 3.5
+    assert best.get_fitness() == pytest.approx(3.5, abs=1e-2)
@@ -0,0 +1,52 @@
+import os
+import zipfile
+
+import openpyxl
+import pytest
+
+import conftest
+import pso_classes as pso
+
+TEMPLATE_FILE = os.path.join(conftest.ROOT_DIR, 'outputs', 'output_template.xlsx')
+
+
+@pytest.fixture
+def excel_params(make_params):
+    def _excel_params(**overrides):
+        return make_params(**dict({'write_excel': True, 'Excel template file': TEMPLATE_FILE}, **overrides))
+    return _excel_params
+
+
+def test_default_export_keeps_the_template_chart(mixed_space, excel_params):
+    pso_alg = pso.pso(mixed_space, excel_params())
+    pso_alg.execute()
+    names = zipfile.ZipFile(pso_alg.params['Excel output file']).namelist()
+    assert 'xl/charts/chart1.xml' in names
+
+
+def test_streaming_export_writes_every_iteration_and_the_trajectories(mixed_space, excel_params):
+    pso_alg = pso.pso(mixed_space, excel_params(excel_streaming=True, results_write_swarm=True))
+    best = pso_alg.execute()
+    wb = openpyxl.load_workbook(pso_alg.params['Excel output file'], read_only=True)
+    assert {'Optimisation', 'Trajectories'} <= set(wb.sheetnames)
+    rows = list(wb['Optimisation'].iter_rows(min_row=pso_alg.write['generation row index'], values_only=True))
+    assert len(rows) == pso_alg.N_iter + 1
+    assert rows[-1][1] == best.get_fitness()
+    assert len(list(wb['Trajectories'].iter_rows(values_only=True))) == 1 + 20*(pso_alg.N_iter + 1)
+    wb.close()
+
+
+@pytest.mark.parametrize('excel_streaming', (False, True))
+def test_generation_rows_start_below_a_longer_template(mixed_space, excel_params, tmp_path, excel_streaming):
+    template_file = str(tmp_path / 'template.xlsx')
+    wb = openpyxl.load_workbook(TEMPLATE_FILE)
+    wb['Optimisation'].cell(row=13, column=1, value='Note')
+    wb['Optimisation'].cell(row=14, column=1, value='Iteration')
+    wb.save(template_file)
+    pso_alg = pso.pso(mixed_space, excel_params(excel_streaming=excel_streaming, **{'Excel template file': template_file}))
+    best = pso_alg.execute()
+    ws = openpyxl.load_workbook(pso_alg.params['Excel output file'])['Optimisation']
+    assert [ws.cell(row=r, column=1).value for r in (13, 14, 15)] == ['Note', 'Iteration', 0]
+    assert ws.cell(row=14, column=3).value == 'x1'
+    assert ws.max_row == 15 + pso_alg.N_iter
+    assert ws.cell(row=ws.max_row, column=2).value == best.get_fitness()
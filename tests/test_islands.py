@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import pso_classes as pso
+import pso_islands
+
+SPACE = {'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'}, 'x2': {'LBound': -10, 'UBound': 10, 'Type': 'float'}}
+
+
+def test_island_sizes_add_up_to_the_swarm_size():
+    assert pso_islands.get_island_sizes(10, 3) == [4, 3, 3]
+    assert sum(pso_islands.get_island_sizes(101, 4)) == 101
+
+
+def test_ring_migration_sends_to_the_next_island():
+    emigrants = [(np.full((1, 2), i), np.array([float(i)])) for i in range(3)]
+    immigrants = pso_islands.route_migrants(emigrants, 'ring', 1, 'min')
+    assert [float(fitness[0]) for _, fitness in immigrants] == [2.0, 0.0, 1.0]
+
+
+def test_fully_connected_migration_sends_the_best_of_the_other_islands():
+    emigrants = [(np.arange(4.0).reshape(2, 2) + 10*i, np.array([3.0 - i, 5.0 + i])) for i in range(3)]
+    immigrants = pso_islands.route_migrants(emigrants, 'fully_connected', 2, 'min')
+    np.testing.assert_array_equal(immigrants[0][1], [1.0, 2.0])
+    np.testing.assert_array_equal(immigrants[2][1], [2.0, 3.0])
+
+
+@pytest.mark.parametrize('policy', ('worst', 'worst_if_better', 'random'))
+def test_replacement_never_removes_the_best_particle(policy):
+    swarm = pso.Swarm(pso.Search_space(SPACE), seed=1)
+    swarm.initialise(6, None)
+    swarm.fitness = np.array([5.0, 1.0, 4.0, 3.0, 6.0, 2.0])
+    rows, accepted = pso_islands.select_replaced(swarm, np.array([0.5, 5.5]), policy, 'min')
+    assert 1 not in rows
+    if policy == 'worst':
+        assert list(rows) == [4, 0] and accepted.all()
+    elif policy == 'worst_if_better':
+        assert list(rows) == [4] and list(accepted) == [True, False]
+
+
+def test_islands_run_and_share_their_best_particle(make_params):
+    params = make_params(model_function='model_polynomial', islands=3, swarm_size=30, max_iterations=12,
+                         island_migration_every=4, island_migrants=2)
+    best, statistics = pso_islands.run_islands(SPACE, params)
+    assert statistics['N_iter'] == 12 and statistics['Termination reason'] == 'max_iterations'
+    assert statistics['N_evals'] == 30*13
+    assert best.get_fitness() < 0.5
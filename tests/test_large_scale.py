@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import pso_bound_functions as pso_bound
+import pso_checkpoint
+import pso_classes as pso
+import pso_large_scale
+
+SPACE = {'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'}, 'x2': {'LBound': -10, 'UBound': 50, 'Type': 'float'}}
+
+
+def test_settings():
+    assert pso_large_scale.get_settings({}) == (np.float64, None)
+    assert pso_large_scale.get_settings({'large_scale': True}) == (np.float32, 65536)
+    assert pso_large_scale.get_settings({'large_scale': True, 'large_scale_dtype': 'float64', 'large_scale_chunk_size': 0}) == (np.float64, 1)
+    with pytest.raises(ValueError, match="Unknown large-scale dtype"):
+        pso_large_scale.get_settings({'large_scale': True, 'large_scale_dtype': 'float16'})
+
+
+def test_memory_estimate():
+    full = pso_large_scale.estimate_memory(10**6, 10)
+    chunked = pso_large_scale.estimate_memory(10**6, 10, np.float32, 65536)
+    assert full['state'] == 3*10**7*8 + 4*10**6*8
+    assert chunked['state'] < full['state'] and chunked['working'] < full['working']/10
+    assert chunked['total'] == chunked['state'] + chunked['working']
+    assert pso_large_scale.format_memory(full).startswith("Estimated memory: ")
+
+
+def test_float32_positions_stay_within_bounds_not_representable_in_float32():
+    # float32(0.3) > 0.3 and float32(0.7) < 0.7
+    space = {'x1': {'LBound': 0.1, 'UBound': 0.3, 'Type': 'float'}, 'x2': {'LBound': 0.7, 'UBound': 0.9, 'Type': 'float'}}
+    search_space = pso.Search_space(space)
+    search_space.compile()
+    lbounds, ubounds = pso_large_scale.get_storage_bounds(search_space, np.float32)
+    assert lbounds.dtype == np.float32 and (lbounds >= [0.1, 0.7]).all() and (ubounds <= [0.3, 0.9]).all()
+
+    swarm = pso.Swarm(search_space, seed=1, dtype=np.float32, chunk_size=7)
+    swarm.initialise(50, pso_bound.reset_to_bounds)
+    for _ in range(5):
+        swarm.velocities[:] = np.where(np.arange(50)[:, None] % 2, 1.0, -1.0)
+        swarm.update_position(pso_bound.reset_to_bounds)
+        assert (swarm.positions >= [0.1, 0.7]).all() and (swarm.positions <= [0.3, 0.9]).all()
+    swarm.insert_particle(pso_bound.reset_to_bounds, {'x1': 1.0, 'x2': 0.0}, {'x1': 0.0, 'x2': 0.0})
+    assert (swarm.positions[-1] >= [0.1, 0.7]).all() and (swarm.positions[-1] <= [0.3, 0.9]).all()
+
+
+def large_scale_params(make_params, **overrides):
+    return make_params(**dict({'model_function': 'model_polynomial_batch', 'large_scale': True, 'large_scale_chunk_size': 37,
+                               'swarm_size': 200, 'max_iterations': 30, 'checkpoint_every': 10,
+                               'cache_evaluations': True, 'surrogate': True, 'steady_state': True}, **overrides))
+
+
+def test_chunked_float32_run_stays_in_bounds_and_matches_the_float64_run(make_params):
+    large_scale = pso.pso(SPACE, large_scale_params(make_params))
+    best = large_scale.execute()
+    assert large_scale.cache is None and large_scale.surrogate is None and not large_scale.steady_state
+    assert large_scale.params['Memory estimate (MB)'] >= 0
+
+    arrays, _ = pso_checkpoint.load_checkpoint(large_scale.params['Checkpoint file'])
+    for name in ('positions', 'velocities', 'best_positions'):
+        assert arrays[name].dtype == np.float32
+    assert (arrays['positions'] >= [0, -10]).all() and (arrays['positions'] <= [100, 50]).all()
+
+    reference = pso.pso(SPACE, make_params(model_function='model_polynomial_batch', swarm_size=200, max_iterations=30)).execute()
+    assert best.get_fitness() == pytest.approx(reference.get_fitness(), abs=1e-2)
+
+
+def test_resume_in_large_scale_mode(make_params):
+    params = large_scale_params(make_params)
+    full = pso.pso(SPACE, dict(params))
+    full.execute()
+    interrupted = pso.pso(SPACE, dict(params, max_iterations=20))
+    interrupted.execute()
+    resumed = pso.pso(SPACE, dict(params))
+    best = resumed.resume(interrupted.params['Checkpoint file'])
+    assert resumed.N_iter == 30
+    assert best.get_fitness() == full.best_particle.get_fitness()
+    with open(resumed.params['Results log file']) as f, open(full.params['Results log file']) as g:
+        assert f.read() == g.read()
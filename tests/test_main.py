@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import conftest
+
+sys.path.insert(0, conftest.ROOT_DIR)
+import pso_main
+
+
+@pytest.mark.parametrize('value, expected', [('3', 3), ('1.5e-3', 1.5e-3), ('true', True), ('False', False), ('null', None),
+                                             ('None', None), ('[1, 2]', [1, 2]), ('{"a": 1}', {'a': 1}), ('tvac', 'tvac')])
+def test_parse_value(value, expected):
+    assert pso_main.parse_value(value) == expected
+
+
+def test_parse_arguments(tmp_path):
+    config_file, overrides, headless = pso_main.parse_arguments(['inputs/other.json', '--set', 'swarm_size=50', '--set',
+                                                                 'inertia_schedule = linear', '--format', 'jsonl',
+                                                                 '--output-dir', str(tmp_path), '--headless'])
+    assert config_file == 'inputs/other.json'
+    assert overrides == {'swarm_size': 50, 'inertia_schedule': 'linear', 'results_format': 'jsonl',
+                         'output_dir': os.path.join(str(tmp_path), '')}
+    assert headless
+    assert pso_main.parse_arguments([]) == ('inputs/inputs.yaml', {}, False)
+
+
+@pytest.mark.parametrize('argv', [['--set', 'swarm_size'], ['--format', 'xml']])
+def test_invalid_arguments(argv):
+    with pytest.raises(SystemExit):
+        pso_main.parse_arguments(argv)
+
+
+def test_headless_run_of_a_json_config(tmp_path, capsys):
+    config = pso_main.load_config(os.path.join(conftest.ROOT_DIR, 'inputs', 'inputs.yaml'))
+    config_file = str(tmp_path / 'inputs.json')
+    with open(config_file, 'w') as f:
+        json.dump(config, f)
+    (tmp_path / 'outputs').mkdir()
+    assert pso_main.load_config(config_file) == config
+
+    config_file, overrides, headless = pso_main.parse_arguments([config_file, '--set', 'max_iterations=3', '--format', 'jsonl',
+                                                                 '--output-dir', str(tmp_path / 'outputs'), '--headless'])
+    search_space, params = pso_main.get_parameters(conftest.ROOT_DIR, config_file, overrides, headless)
+    assert (params['write_to_console'], params['write_excel'], params['max_iterations']) == (False, False, 3)
+    assert params['Excel output dir'].startswith(str(tmp_path / 'outputs'))
+    assert 'Excel template file' not in params
+    pso_main.run(search_space, params)
+    assert capsys.readouterr().out == ''
+    assert params['Results log file'].endswith('.jsonl') and os.path.exists(params['Results log file'])
+    assert params['Results log file'].startswith(str(tmp_path / 'outputs'))
+
+
+def test_missing_config_exits(tmp_path):
+    with pytest.raises(SystemExit):
+        pso_main.get_parameters(str(tmp_path), 'missing.yaml')
+
+
+def test_only_the_core_is_imported_with_pso_classes():
+    code = ("import sys; sys.path[:0] = [{!r}, {!r}]; import pso_classes; "
+            "print(' '.join(sorted(sys.modules)))").format(os.path.join(conftest.ROOT_DIR, 'libraries'), os.path.join(conftest.ROOT_DIR, 'model'))
+    modules = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+    assert 'pso_classes' in modules
+    for module in ('pso_cache', 'pso_surrogate', 'pso_constraints', 'pso_checkpoint', 'pso_results', 'lib_directory_ops',
+                   'lib_path_ops', 'lib_excel_ops_openpyxl', 'openpyxl', 'yaml'):
+        assert module not in modules
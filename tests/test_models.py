@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import models
+import pso_classes as pso
+import pso_models
+
+
+@pytest.fixture
+def sp():
+    search_space = pso.Search_space({'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'},
+                                     'x2': {'LBound': -10, 'UBound': 10, 'Type': 'float'}})
+    search_space.compile()
+    return search_space
+
+
+@pytest.fixture
+def positions(rng):
+    return np.column_stack((rng.uniform(0, 100, 25), rng.uniform(-10, 10, 25)))
+
+
+def test_batch_and_per_point_models_agree(sp, positions):
+    assert pso_models.is_batch_model(models.model_polynomial_batch)
+    assert not pso_models.is_batch_model(models.model_polynomial)
+    np.testing.assert_allclose(pso_models.evaluate(models.model_polynomial_batch, sp, positions),
+                               pso_models.evaluate(models.model_polynomial, sp, positions))
+
+
+def test_array_batch_models_receive_the_columns_in_search_space_order(sp, positions):
+    @pso_models.batch_model(inputs='array')
+    def f(x):
+        assert x.shape == (25, 2)
+        return x[:, 0] - x[:, 1]
+    np.testing.assert_allclose(pso_models.evaluate(f, sp, positions), positions[:, 0] - positions[:, 1])
+
+
+def test_failed_evaluations_become_nan(sp, positions):
+    def f(inputs):
+        return None if inputs['x2'] < 0 else inputs['x1']
+    fitness = pso_models.evaluate(f, sp, positions)
+    np.testing.assert_array_equal(np.isnan(fitness), positions[:, 1] < 0)
+
+
+def test_evaluation_times_are_recorded_per_point(sp, positions):
+    times = []
+    pso_models.evaluate(models.model_polynomial_batch, sp, positions, times=times)
+    assert times[0].shape == (25,)
+    assert np.all(times[0] >= 0)
+
+
+def test_batch_model_returning_the_wrong_number_of_values_is_rejected(sp, positions):
+    @pso_models.batch_model(inputs='array')
+    def f(x):
+        return x[:-1, 0]
+    with pytest.raises(AssertionError):
+        pso_models.evaluate(f, sp, positions)
@@ -0,0 +1,118 @@
+import csv
+import glob
+import os
+
+import numpy as np
+import pytest
+
+import pso_multiobjective
+
+SPACE = {'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'}, 'x2': {'LBound': -10, 'UBound': 50, 'Type': 'float'}}
+
+
+def assert_non_dominated(objectives):
+    for i in range(objectives.shape[0]):
+        others = np.delete(objectives, i, axis=0)
+        assert not ((others <= objectives[i]).all(axis=1) & (others < objectives[i]).any(axis=1)).any()
+
+
+def test_archive_keeps_only_non_dominated_points(rng):
+    archive = pso_multiobjective.Pareto_archive(2, 2, capacity=1000, rng=rng)
+    for _ in range(5):
+        objectives = rng.random((50, 2))
+        archive.insert(rng.random((50, 2)), objectives)
+        assert_non_dominated(archive.get_objectives())
+    assert archive.insert(np.zeros((1, 2)), np.full((1, 2), 2.0)) == 0
+    assert archive.insert(np.zeros((1, 2)), np.full((1, 2), -1.0)) == 1
+    np.testing.assert_array_equal(archive.get_objectives(), [[-1.0, -1.0]])
+
+
+def test_archive_is_trimmed_to_its_capacity_from_the_crowded_cells(rng):
+    archive = pso_multiobjective.Pareto_archive(1, 2, capacity=20, n_divisions=5, rng=rng)
+    t = np.concatenate((np.linspace(0, 0.1, 60), np.linspace(0.2, 1, 10)))
+    archive.insert(t[:, None], np.column_stack((t, 1 - t)))
+    assert archive.get_size() == 20
+    assert_non_dominated(archive.get_objectives())
+    # The sparse part of the front is kept
+    assert (archive.get_objectives()[:, 0] >= 0.2).sum() == 10
+
+
+def test_failed_evaluations_never_enter_the_archive(rng):
+    archive = pso_multiobjective.Pareto_archive(2, 2, rng=rng)
+    assert archive.insert(np.zeros((2, 2)), np.array([[np.nan, 1.0], [np.nan, np.nan]])) == 0
+    assert archive.get_size() == 0
+
+
+def test_leaders_are_archive_points(rng):
+    archive = pso_multiobjective.Pareto_archive(2, 2, rng=rng)
+    t = np.linspace(0, 1, 10)
+    archive.insert(np.column_stack((t, t)), np.column_stack((t, 1 - t)))
+    leaders = archive.select_leaders(30)
+    assert leaders.shape == (30, 2)
+    assert set(leaders[:, 0]) <= set(archive.get_positions()[:, 0])
+
+
+def test_large_insert_is_compared_in_bounded_blocks_and_matches_brute_force(rng, monkeypatch):
+    monkeypatch.setattr(pso_multiobjective, 'CHUNK_SIZE', 64)
+    calls = []
+    dominates = pso_multiobjective._dominates
+    monkeypatch.setattr(pso_multiobjective, '_dominates', lambda A, B: calls.append(A.shape[0]*B.shape[0]) or dominates(A, B))
+    archive = pso_multiobjective.Pareto_archive(2, 3, capacity=10**6, rng=rng)
+    inserted = []
+    for _ in range(4):
+        objectives = rng.random((400, 3))
+        archive.insert(rng.random((400, 2)), objectives)
+        inserted.append(objectives)
+    inserted = np.vstack(inserted)
+    expected = ~dominates(inserted, inserted).any(axis=0)
+    assert max(calls) <= 400
+    assert set(map(tuple, archive.get_objectives())) == set(map(tuple, inserted[expected]))
+
+
+def test_grid_cells_are_updated_incrementally_unless_the_bounds_change(rng):
+    archive = pso_multiobjective.Pareto_archive(1, 2, capacity=50, n_divisions=4, rng=rng)
+    archive.insert(np.zeros((2, 1)), np.array([[0.0, 1.0], [1.0, 0.0]]))
+    for _ in range(20):
+        t = rng.random((10, 1))
+        # Within the bounds of the grid: only the new points get a cell
+        archive.insert(t, np.column_stack((t, 1 - t)))
+        cells = archive.cells.copy()
+        other = pso_multiobjective.Pareto_archive(1, 2, n_divisions=4)
+        other.insert(archive.get_positions(), archive.get_objectives())
+        np.testing.assert_array_equal(cells, other.cells)
+    archive.insert(np.zeros((1, 1)), np.array([[-1.0, 2.0]]))
+    np.testing.assert_array_equal(archive.cells, pso_multiobjective.np.ravel_multi_index(
+        (np.minimum((archive.get_objectives() - [-1.0, 0.0])/[2.0, 2.0]*4, 3).astype(int)).T, (4, 4)))
+
+
+def test_signs():
+    assert pso_multiobjective.get_signs({'opt_type': 'min'}) is None
+    np.testing.assert_array_equal(pso_multiobjective.get_signs({'opt_type': 'max', 'mo_objectives': ['a', 'b']}), [-1, -1])
+    np.testing.assert_array_equal(pso_multiobjective.get_signs({'opt_type': 'min', 'mo_opt_types': ['min', 'max']}), [1, -1])
+    with pytest.raises(ValueError):
+        pso_multiobjective.get_signs({'opt_type': 'min', 'mo_opt_types': ['min', 'best']})
+
+
+def test_run_writes_the_front_and_labels_each_objective_by_its_type(make_params):
+    params = make_params(model_function='model_polynomial_two_objectives', multiobjective=True, mo_objectives=['cost', 'yield'],
+                         mo_opt_types=['min', 'max'], mo_archive_size=30, swarm_size=30, max_iterations=10)
+    archive, statistics = pso_multiobjective.run_multiobjective(SPACE, params)
+    assert 0 < archive.get_size() <= 30 and statistics['Front size'] == archive.get_size()
+    output_dir = glob.glob(os.path.join(params['Excel output dir'], '*_multiobjective'))[0]
+    with open(glob.glob(os.path.join(output_dir, '*_iterations.csv'))[0], newline='') as f:
+        assert next(csv.reader(f))[-2:] == ['min cost', 'max yield']
+    with open(os.path.join(output_dir, 'pareto_front.csv'), newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['x1', 'x2', 'cost', 'yield']
+    assert len(rows) == archive.get_size() + 1
+    # The front is written with the objectives in their original sign (yield is maximised)
+    assert_non_dominated(np.array([[float(r[2]), -float(r[3])] for r in rows[1:]]))
+
+
+def test_run_without_a_successful_first_evaluation_needs_the_number_of_objectives(make_params, monkeypatch):
+    monkeypatch.setattr(pso_multiobjective.pso_registry.models, 'model_failing', lambda inputs: None, raising=False)
+    params = make_params(model_function='model_failing', multiobjective=True, swarm_size=5, max_iterations=2)
+    with pytest.raises(ValueError, match="number of objectives"):
+        pso_multiobjective.run_multiobjective(SPACE, params)
+    archive, _ = pso_multiobjective.run_multiobjective(SPACE, dict(params, mo_opt_types=['min', 'min']))
+    assert archive.get_size() == 0
@@ -0,0 +1,37 @@
+import csv
+import os
+
+import pytest
+
+import pso_multistart
+
+SPACE = {'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'}, 'x2': {'LBound': -10, 'UBound': 10, 'Type': 'float'}}
+
+
+@pytest.fixture
+def multistart_params(make_params):
+    return make_params(model_function='model_polynomial', multistart_runs=3, multistart_workers=2, multistart_target=1e-2)
+
+
+def test_statistics_aggregate_the_runs():
+    rows = [{'best_fitness': f, 'success': f <= 1.0, 'evals_to_target': e} for f, e in ((3.0, None), (0.5, 40), (1.0, 60))]
+    statistics = pso_multistart.get_statistics(rows, 'min')
+    assert (statistics['Runs'], statistics['Best run'], statistics['Best fitness'], statistics['Worst fitness']) == (3, 1, 0.5, 3.0)
+    assert statistics['Median fitness'] == 1.0
+    assert statistics['Success rate'] == pytest.approx(2/3)
+    assert statistics['Mean evals to target'] == 50.0
+    assert pso_multistart.get_statistics(rows, 'max')['Best run'] == 0
+
+
+def test_multistart_writes_a_summary_and_is_reproducible(multistart_params):
+    best, statistics = pso_multistart.run_multistart(SPACE, multistart_params)
+    assert statistics['Runs'] == 3
+    assert best.get_fitness() == statistics['Best fitness']
+    output_dir = os.path.join(multistart_params['Excel output dir'], os.listdir(multistart_params['Excel output dir'])[0])
+    with open(os.path.join(output_dir, 'multistart_summary.csv'), newline='') as f:
+        rows = list(csv.DictReader(f))[:3]
+    assert [r['run'] for r in rows] == ['0', '1', '2']
+    assert len(set(r['best_fitness'] for r in rows)) == 3
+
+    _, repeated = pso_multistart.run_multistart(SPACE, multistart_params)
+    assert repeated == statistics
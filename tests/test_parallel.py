@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import models
+import pso_classes as pso
+import pso_models
+import pso_parallel
+
+
+@pytest.fixture
+def sp():
+    search_space = pso.Search_space({'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'},
+                                     'x2': {'LBound': -10, 'UBound': 10, 'Type': 'float'}})
+    search_space.compile()
+    return search_space
+
+
+@pytest.mark.parametrize('backend', ('process', 'thread'))
+@pytest.mark.parametrize('f', (models.model_polynomial, models.model_polynomial_batch), ids=('points', 'batch'))
+def test_pool_evaluation_matches_serial_evaluation_in_order(sp, rng, backend, f):
+    positions = np.column_stack((rng.uniform(0, 100, 23), rng.uniform(-10, 10, 23)))
+    with pso_parallel.Evaluation_pool(2, chunk_size=4, backend=backend) as pool:
+        fitness = pso_models.evaluate(f, sp, positions, pool=pool)
+    np.testing.assert_array_equal(fitness, pso_models.evaluate(f, sp, positions))
+
+
+def test_pool_map_keeps_the_order_of_the_inputs():
+    with pso_parallel.Evaluation_pool(2, chunk_size=3) as pool:
+        assert pool.map(abs, list(range(-10, 0))) == list(range(10, 0, -1))
+    assert pool.executor is None
+
+
+def test_parallel_run_reproduces_the_serial_run(make_params):
+    space = {'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'}, 'x2': {'LBound': -10, 'UBound': 10, 'Type': 'float'}}
+    params = make_params(model_function='model_polynomial')
+    serial = pso.pso(space, dict(params)).execute()
+    parallel = pso.pso(space, dict(params, parallel_evaluation=True, n_workers=2, chunk_size=3)).execute()
+    assert parallel.get_fitness() == serial.get_fitness()
+    assert parallel.get_position() == serial.get_position()
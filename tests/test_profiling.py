@@ -0,0 +1,34 @@
+import csv
+
+import numpy as np
+
+import pso_classes as pso
+import pso_profiling
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = pso_profiling.Profiler(enabled=False)
+    with profiler.phase('evaluate'):
+        pass
+    profiler.add_evaluation_times(np.ones(3))
+    profiler.end_iteration(0, 3)
+    assert profiler.N_evals == 0 and profiler.N_iterations == 0
+
+
+def test_evaluation_times_fill_the_histogram():
+    profiler = pso_profiling.Profiler()
+    profiler.add_evaluation_times([np.array([1e-5, 2e-3]), np.array([0.5])])
+    assert profiler.N_evals == 3 and profiler.histogram.sum() == 3
+    summary = dict(profiler.get_summary())
+    assert summary['Mean evaluation time (s)'] == (1e-5 + 2e-3 + 0.5)/3
+
+
+def test_profiled_run_writes_one_metrics_row_per_iteration(mixed_space, make_params):
+    pso_alg = pso.pso(mixed_space, make_params(profiling=True))
+    pso_alg.execute()
+    with open(pso_alg.params['Metrics file'], newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:6] == ['Iteration'] + ['{} (s)'.format(p) for p in pso_profiling.Profiler.phases]
+    assert [int(r[0]) for r in rows[1:]] == list(range(pso_alg.N_iter + 1))
+    assert all(int(r[6]) == 20 for r in rows[1:])
+    assert pso_alg.profiler.totals['evaluate'] > 0
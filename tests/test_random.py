@@ -0,0 +1,33 @@
+import numpy as np
+
+import pso_classes as pso
+import pso_random
+
+
+def test_derived_seeds_are_the_spawned_seed_sequences():
+    seeds = pso_random.derive_seeds(7, 3)
+    children = np.random.SeedSequence(7).spawn(3)
+    for seed, child in zip(seeds, children):
+        assert isinstance(seed, np.random.SeedSequence)
+        np.testing.assert_array_equal(pso_random.create_generator(seed).random(5), np.random.default_rng(child).random(5))
+
+
+def test_derived_streams_are_reproducible_and_distinct():
+    first = [pso_random.create_generator(s).random(4) for s in pso_random.derive_seeds(7, 3)]
+    second = [pso_random.create_generator(s).random(4) for s in pso_random.derive_seeds(7, 3)]
+    np.testing.assert_array_equal(first, second)
+    assert len({tuple(x) for x in first}) == 3
+
+
+def test_seed_labels():
+    assert pso_random.get_seed_label(3) == 3
+    assert [pso_random.get_seed_label(s) for s in pso_random.derive_seeds(7, 2)] == ['7/0', '7/1']
+
+
+def test_swarms_with_the_same_seed_are_identical(mixed_space):
+    swarms = [pso.Swarm(pso.Search_space(mixed_space), seed=seed) for seed in (4, 4, pso_random.derive_seeds(4, 1)[0])]
+    for swarm in swarms:
+        swarm.initialise(10, None)
+    np.testing.assert_array_equal(swarms[0].positions, swarms[1].positions)
+    np.testing.assert_array_equal(swarms[0].velocities, swarms[1].velocities)
+    assert not np.array_equal(swarms[0].positions, swarms[2].positions)
@@ -0,0 +1,55 @@
+import pytest
+
+import models
+import pso_bound_functions
+import pso_registry
+
+
+class Entry_point(object):
+    def __init__(self, name, f):
+        self.name = name
+        self.f = f
+
+    def load(self):
+        return self.f
+
+
+def test_resolve_by_name_and_by_module_function():
+    assert pso_registry.resolve('model_polynomial', models, pso_registry.MODELS_GROUP) is models.model_polynomial
+    assert pso_registry.resolve_bound_function('reset_to_bounds') is pso_bound_functions.reset_to_bounds
+    assert pso_registry.resolve('math:sqrt', models, pso_registry.MODELS_GROUP)(4.0) == 2.0
+
+
+def test_resolve_from_entry_points(monkeypatch):
+    def model_plugin(inputs):
+        return 1.0
+    monkeypatch.setattr(pso_registry, '_entry_points', lambda group: [Entry_point('model_plugin', model_plugin)])
+    assert pso_registry.resolve_model('model_plugin').f is model_plugin
+
+
+@pytest.mark.parametrize('reference', ['model_unknown', 'math:unknown', 'unknown_module:f', 'math:pi'])
+def test_unknown_references(monkeypatch, reference):
+    monkeypatch.setattr(pso_registry, '_entry_points', lambda group: [])
+    with pytest.raises(ValueError):
+        pso_registry.resolve_model(reference)
+
+
+def test_model_metadata():
+    model = pso_registry.resolve_model('model_polynomial_batch')
+    assert (model.batch, model.batch_inputs, model.thread_safe, model.cost) == (True, 'dict', False, None)
+    model = pso_registry.resolve_model('model_polynomial', {'batch': 'array', 'thread_safe': True, 'cost': None})
+    assert (model.batch, model.batch_inputs, model.thread_safe) == (True, 'array', True)
+    assert model({'x1': 4, 'x2': 1}) == 5.0
+    with pytest.raises(ValueError, match="Unknown model metadata"):
+        pso_registry.resolve_model('model_polynomial', {'vectorised': True})
+
+
+def test_create_pool():
+    thread_safe = pso_registry.resolve_model('model_polynomial', {'thread_safe': True, 'cost': 0.001})
+    pool = pso_registry.create_pool(thread_safe, {'parallel_backend': 'auto', 'chunk_size': None, 'n_workers': 2})
+    assert (pool.get_backend(), pool.get_chunk_size(), pool.get_n_workers()) == ('thread', 50, 2)
+    pool = pso_registry.create_pool(pso_registry.resolve_model('model_polynomial'), {'parallel_backend': 'auto', 'chunk_size': None})
+    assert (pool.get_backend(), pool.get_chunk_size()) == ('process', 1)
+    assert pso_registry.create_pool(thread_safe, {'parallel_backend': 'process', 'chunk_size': 8}).get_chunk_size() == 8
+    with pytest.raises(ValueError, match="Unknown parallel backend"):
+        pso_registry.create_pool(thread_safe, {'parallel_backend': 'mpi'})
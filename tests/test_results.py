@@ -0,0 +1,21 @@
+import pytest
+
+import pso_classes as pso
+
+
+@pytest.mark.parametrize('results_format', ('csv', 'jsonl', 'binary'))
+def test_results_log_reads_back_every_iteration(mixed_space, make_params, results_format):
+    pso_alg = pso.pso(mixed_space, make_params(results_format=results_format, results_write_swarm=True, results_flush_every=3))
+    best = pso_alg.execute()
+    iterations = list(pso_alg.results_log.read_iterations())
+    assert [r[0] for r in iterations] == list(range(pso_alg.N_iter + 1))
+    N_iter, fitness, position, N_evals, N_failed_evals = iterations[-1]
+    assert (fitness, position) == (best.get_fitness(), best.get_position())
+    assert (N_evals, N_failed_evals) == (20, 0)
+    fitness_so_far = [r[1] for r in iterations]
+    assert fitness_so_far == sorted(fitness_so_far, reverse=True)
+
+    states = list(pso_alg.results_log.read_swarm_states())
+    assert len(states) == 20*(pso_alg.N_iter + 1)
+    assert [s[1] for s in states[:20]] == list(range(20))
+    assert all(0 <= s[3] <= 10 and s[5] in ('a', 'b', 'c') for s in states)
@@ -0,0 +1,99 @@
+import csv
+
+import pytest
+
+import pso_classes as pso
+import pso_schedules
+
+
+class Feedback_swarm(object):
+    def __init__(self, N_improved=0, diversity=1.0, size=10):
+        self.N_improved = N_improved
+        self.diversity = diversity
+        self.size = size
+
+    def get_diversity(self):
+        return self.diversity
+
+    def get_size(self):
+        return self.size
+
+
+def schedule(**params):
+    return pso_schedules.Schedule(dict({'max_iterations': 11, 'inertia_weight': 0.6, 'acceleration_constant_local': 1.7,
+                                        'acceleration_constant_global': 1.7}, **params))
+
+
+def test_constant():
+    assert schedule().is_constant()
+    assert schedule().get_coefficients(5, None) == (0.6, 1.7, 1.7)
+
+
+def test_linear_goes_from_start_to_end():
+    s = schedule(inertia_schedule='linear', inertia_weight_start=0.9, inertia_weight_end=0.4)
+    assert s.get_coefficients(1, None)[0] == pytest.approx(0.9)
+    assert s.get_coefficients(6, None)[0] == pytest.approx(0.65)
+    assert s.get_coefficients(11, None)[0] == pytest.approx(0.4)
+    assert s.get_coefficients(20, None)[0] == pytest.approx(0.4)
+
+
+def test_constriction_factor():
+    inertia, c_local, c_global = schedule(inertia_schedule='constriction', acceleration_constant_local=2.05,
+                                          acceleration_constant_global=2.05).get_coefficients(1, None)
+    assert inertia == pytest.approx(0.7298, abs=1e-4)
+    assert c_local == c_global == pytest.approx(0.7298*2.05, abs=1e-3)
+    with pytest.raises(ValueError):
+        schedule(inertia_schedule='constriction')
+    with pytest.raises(ValueError):
+        schedule(inertia_schedule='constriction', acceleration_constant_local=2.05, acceleration_constant_global=2.05,
+                 acceleration_schedule='tvac')
+
+
+def test_tvac():
+    s = schedule(acceleration_schedule='tvac')
+    assert s.get_coefficients(1, None)[1:] == pytest.approx((2.5, 0.5))
+    assert s.get_coefficients(11, None)[1:] == pytest.approx((0.5, 2.5))
+
+
+def test_adaptive_success_rate_and_diversity():
+    s = schedule(inertia_schedule='adaptive', inertia_weight_start=0.9, inertia_weight_end=0.4)
+    swarm = Feedback_swarm(N_improved=10)
+    assert s.get_coefficients(1, swarm)[0] == pytest.approx(0.9)
+    swarm.N_improved = 15
+    assert s.get_coefficients(2, swarm)[0] == pytest.approx(0.65)
+    assert s.get_coefficients(3, swarm)[0] == pytest.approx(0.4)
+    assert s.get_values()[3] == 0.0
+
+    s = schedule(inertia_schedule='adaptive', adaptive_feedback='diversity', inertia_weight_start=0.9, inertia_weight_end=0.4)
+    swarm = Feedback_swarm(diversity=2.0)
+    s.start(swarm)
+    swarm.diversity = 0.5
+    assert s.get_coefficients(1, swarm)[0] == pytest.approx(0.525)
+
+
+@pytest.mark.parametrize('name, value', [('inertia_schedule', 'exponential'), ('acceleration_schedule', 'linear'),
+                                         ('adaptive_feedback', 'velocity')])
+def test_unknown_names(name, value):
+    with pytest.raises(ValueError, match="Unknown"):
+        schedule(**{name: value})
+
+
+def test_state_round_trip():
+    s = schedule(inertia_schedule='adaptive', adaptive_feedback='diversity')
+    s.start(Feedback_swarm(N_improved=4, diversity=3.0))
+    s.get_coefficients(1, Feedback_swarm(diversity=1.5))
+    restored = schedule(inertia_schedule='adaptive', adaptive_feedback='diversity')
+    restored.set_state(s.get_state())
+    assert restored.get_state() == s.get_state()
+    assert restored.get_coefficients(2, Feedback_swarm(diversity=1.5)) == s.get_coefficients(2, Feedback_swarm(diversity=1.5))
+
+
+def test_run_logs_the_coefficients_of_every_iteration(mixed_space, make_params):
+    optimizer = pso.pso(mixed_space, make_params(inertia_schedule='linear', acceleration_schedule='tvac'))
+    optimizer.execute()
+    with open(optimizer.params['Schedule file'], newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == 'Iteration'
+    assert [int(row[0]) for row in rows[1:]] == list(range(1, optimizer.N_iter + 1))
+    assert float(rows[1][1]) == pytest.approx(0.9)
+    assert float(rows[-1][1]) == pytest.approx(0.4)
@@ -0,0 +1,54 @@
+import numpy as np
+
+import pso_classes as pso
+
+
+def test_compile_builds_bound_vectors_and_type_masks(mixed_space):
+    sp = pso.Search_space(mixed_space)
+    assert not sp.is_compiled()
+    sp.compile()
+    assert sp.is_compiled()
+    np.testing.assert_array_equal(sp.float_mask, [True, False, False, False])
+    np.testing.assert_array_equal(sp.int_mask, [False, True, False, False])
+    np.testing.assert_array_equal(sp.enumerate_mask, [False, False, True, False])
+    np.testing.assert_array_equal(sp.binary_mask, [False, False, False, True])
+    np.testing.assert_array_equal(sp.lbounds, [0, -5, 0, 0])
+    np.testing.assert_array_equal(sp.ubounds, [10, 5, 2, 1])
+    np.testing.assert_array_equal(sp.spans, [10, 10, 2, 1])
+
+
+def test_encode_and_decode_position_round_trip(mixed_space):
+    sp = pso.Search_space(mixed_space)
+    sp.compile()
+    position = {'x1': 2.5, 'n': -3, 'c': 'c', 'b': 1}
+    row = sp.encode_position(position)
+    np.testing.assert_array_equal(row, [2.5, -3, 2, 1])
+    decoded = sp.decode_position(row)
+    assert decoded == position
+    assert isinstance(decoded['n'], int)
+
+
+def test_decode_positions_returns_one_column_per_variable(mixed_space):
+    sp = pso.Search_space(mixed_space)
+    sp.compile()
+    columns = sp.decode_positions(np.array([[1.5, 2, 0, 1], [7.0, -1, 1, 0]]))
+    np.testing.assert_array_equal(columns['x1'], [1.5, 7.0])
+    np.testing.assert_array_equal(columns['n'], [2, -1])
+    np.testing.assert_array_equal(columns['c'], ['a', 'b'])
+    np.testing.assert_array_equal(columns['b'], [1, 0])
+
+
+def test_discrete_variables_stay_decodable_without_enforcing_bounds(mixed_space, make_params):
+    import pso_bound_functions as pso_bound
+    sp = pso.Search_space(mixed_space)
+    sp.compile()
+    positions = pso_bound.reset_discrete(sp, np.array([[12.0, 7, 3, -2], [1.0, -9, -1, 1]]), np.random.default_rng(0))
+    np.testing.assert_array_equal(positions[:, :2], [[12.0, 7], [1.0, -9]])
+    assert set(positions[:, 2]) <= {0, 1, 2} and set(positions[:, 3]) <= {0, 1}
+
+    pso_alg = pso.pso(mixed_space, make_params(enforce_bounds=False, inertia_weight=1.2, swarm_size=30, max_iterations=30,
+                                               results_write_swarm=True))
+    pso_alg.execute()
+    states = list(pso_alg.results_log.read_swarm_states())
+    assert all(s[5] in ('a', 'b', 'c') and s[6] in (0, 1) for s in states)
+    assert any(not 0 <= s[3] <= 10 for s in states)
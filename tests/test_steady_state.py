@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+import pytest
+
+import models
+import pso_classes as pso
+import pso_parallel
+
+SPACE = {'x1': {'LBound': 0, 'UBound': 100, 'Type': 'float'}, 'x2': {'LBound': -10, 'UBound': 10, 'Type': 'float'}}
+
+
+def model_quick(inputs):
+    # Short and uneven evaluation times, so that several evaluations complete at once
+    time.sleep(0.001*(int(inputs['x1']) % 3))
+    return inputs['x1'] + inputs['x2']**2
+
+
+def test_each_call_completes_exactly_n_evals_evaluations():
+    swarm = pso.Swarm(pso.Search_space(SPACE), seed=1)
+    swarm.initialise(16, None)
+    swarm.evaluate(model_quick, 'min', synchronous=False)
+    with pso_parallel.Evaluation_pool(4, backend='thread') as pool:
+        for _ in range(5):
+            N_evals, N_failed = swarm.evaluate_steady_state(model_quick, None, 'min', 0.6, 1.7, 1.7, pool, 16)
+            assert (N_evals, N_failed) == (16, 0)
+        swarm.stop_steady_state()
+    assert swarm.N_evals == 16*6
+
+
+def test_evaluations_in_flight_are_resubmitted_without_moving_after_a_checkpoint():
+    swarm = pso.Swarm(pso.Search_space(SPACE), seed=1)
+    swarm.initialise(16, None)
+    swarm.evaluate(model_quick, 'min', synchronous=False)
+    with pso_parallel.Evaluation_pool(4, backend='thread') as pool:
+        swarm.evaluate_steady_state(model_quick, None, 'min', 0.6, 1.7, 1.7, pool, 16)
+        arrays, metadata = swarm.get_state()
+        in_flight = arrays['positions'][arrays['pending_rows']].copy()
+        swarm.stop_steady_state()
+    assert len(arrays['pending_rows']) == 16
+
+    evaluated = []
+    def model_recorded(inputs):
+        evaluated.append((inputs['x1'], inputs['x2']))
+        return model_quick(inputs)
+    resumed = pso.Swarm(pso.Search_space(SPACE), seed=1)
+    resumed.set_state(arrays, metadata)
+    with pso_parallel.Evaluation_pool(1, backend='thread') as pool:
+        resumed.evaluate_steady_state(model_recorded, None, 'min', 0.6, 1.7, 1.7, pool, 16)
+        resumed.stop_steady_state()
+    assert evaluated[:16] == [tuple(row) for row in in_flight.tolist()]
+
+
+def test_steady_state_run_evaluates_swarm_size_points_per_iteration(make_params, monkeypatch):
+    monkeypatch.setattr(models, 'model_quick', model_quick, raising=False)
+    params = make_params(model_function='model_quick', steady_state=True, parallel_backend='thread', n_workers=4,
+                         swarm_size=12, max_iterations=8)
+    pso_alg = pso.pso(SPACE, params)
+    pso_alg.execute()
+    assert pso_alg.statistics['N_evals'] == 12*(8 + 1)
+
+
+def test_asynchronous_update_warns_when_every_evaluation_fails():
+    swarm = pso.Swarm(pso.Search_space(SPACE), seed=1)
+    swarm.initialise(5, None)
+    with pytest.warns(UserWarning, match="asynchronous"):
+        swarm.evaluate(lambda inputs: None, 'min', synchronous=False)
+    assert np.all(np.isnan(swarm.fitness))
+
+
+def test_steady_state_run_keeps_the_swarm_within_bounds_and_improves(make_params):
+    params = make_params(model_function='model_polynomial', steady_state=True, n_workers=2, swarm_size=12, max_iterations=8)
+    pso_alg = pso.pso(SPACE, dict(params, max_iterations=0))
+    initial = pso_alg.execute()
+    pso_alg = pso.pso(SPACE, params)
+    best = pso_alg.execute()
+    assert pso_alg.statistics['N_evals'] >= 12*(8 + 1)
+    assert best.get_fitness() <= initial.get_fitness()
+    assert 0 <= best.get_position()['x1'] <= 100 and -10 <= best.get_position()['x2'] <= 10
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import pso_classes as pso
+import pso_surrogate
+
+
+@pytest.fixture
+def sp(float_space):
+    search_space = pso.Search_space(float_space)
+    search_space.compile()
+    return search_space
+
+
+def sphere(positions):
+    return np.sum(positions**2, axis=1)
+
+
+def test_prediction_interpolates_the_archive(sp, rng):
+    surrogate = pso_surrogate.Surrogate(sp, 'min')
+    X = rng.uniform(-5, 5, (60, 4))
+    surrogate.add(X, sphere(X))
+    mean, std = surrogate.predict(X[:5])
+    np.testing.assert_allclose(mean, sphere(X[:5]), rtol=1e-3, atol=1e-3)
+    _, std_far = surrogate.predict(np.full((1, 4), 5.0))
+    assert std_far[0] > std.max()
+
+
+def test_failed_evaluations_are_not_archived(sp):
+    surrogate = pso_surrogate.Surrogate(sp, 'min')
+    surrogate.add(np.zeros((3, 4)), np.array([1.0, np.nan, 2.0]))
+    assert surrogate.get_size() == 2
+
+
+def test_selection_keeps_the_promising_and_uncertain_fraction(sp, rng):
+    surrogate = pso_surrogate.Surrogate(sp, 'min', fraction=0.2, exploration=0.1)
+    candidates = rng.uniform(-5, 5, (20, 4))
+    np.testing.assert_array_equal(surrogate.select(candidates), np.arange(20))
+    X = rng.uniform(-5, 5, (60, 4))
+    surrogate.add(X, sphere(X))
+    rows = surrogate.select(candidates)
+    assert rows.shape[0] == 6 and surrogate.get_N_screened() == 14
+    assert set(np.argsort(sphere(candidates))[:2]) <= set(rows)
+
+
+def test_surrogate_run_screens_out_evaluations(float_space, make_params):
+    params = make_params(model_function='sphere', swarm_size=20, max_iterations=15)
+    screened = pso.pso(float_space, dict(params, surrogate=True))
+    best = screened.execute()
+    assert screened.surrogate.get_N_screened() > 0
+    assert screened.statistics['N_evals'] < 20*16
+    assert best.get_fitness() < 5.0
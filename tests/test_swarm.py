@@ -0,0 +1,49 @@
+import numpy as np
+
+import pso_classes as pso
+
+
+def test_initialise_stores_the_swarm_as_arrays_within_bounds(mixed_space):
+    swarm = pso.Swarm(pso.Search_space(mixed_space), seed=1)
+    swarm.initialise(30, None)
+    sp = swarm.get_search_space()
+    assert swarm.get_size() == 30
+    for array in (swarm.positions, swarm.velocities, swarm.best_positions):
+        assert array.shape == (30, 4)
+    assert np.all(swarm.positions >= sp.lbounds) and np.all(swarm.positions <= sp.ubounds)
+    assert np.all(swarm.positions[:, sp.int_mask | sp.discrete_mask] == np.rint(swarm.positions[:, sp.int_mask | sp.discrete_mask]))
+    assert np.all(np.isnan(swarm.fitness))
+
+
+def test_get_particle_decodes_its_row(mixed_space):
+    swarm = pso.Swarm(pso.Search_space(mixed_space), seed=1)
+    swarm.initialise(5, None)
+    particle = swarm.get_particle(2)
+    assert set(particle.get_position()) == set(mixed_space)
+    assert particle.get_position()['c'] in ('a', 'b', 'c')
+    assert particle.get_position()['x1'] == swarm.positions[2, 0]
+
+
+def test_update_position_adds_the_velocity():
+    space = {'x': {'LBound': -10, 'UBound': 10, 'Type': 'float'}, 'y': {'LBound': -10, 'UBound': 10, 'Type': 'float'}}
+    swarm = pso.Swarm(pso.Search_space(space), seed=1)
+    swarm.initialise(10, None)
+    expected = swarm.positions + swarm.velocities
+    swarm.update_position(None)
+    np.testing.assert_allclose(swarm.positions, expected)
+
+
+def test_evaluate_updates_the_personal_and_swarm_bests(mixed_space):
+    import conftest
+    swarm = pso.Swarm(pso.Search_space(mixed_space), seed=1)
+    swarm.initialise(20, None)
+    N_evals, N_failed = swarm.evaluate(conftest.model_mixed, 'min', synchronous=False)
+    assert (N_evals, N_failed) == (20, 0)
+    np.testing.assert_array_equal(swarm.best_fitness, swarm.fitness)
+    assert swarm.get_best_particle_current().get_fitness() == swarm.fitness.min()
+
+
+def test_run_reaches_the_optimum_of_a_mixed_space(mixed_space, make_params):
+    best = pso.pso(mixed_space, make_params(swarm_size=50, max_iterations=30)).execute()
+    assert best.get_fitness() < 1e-3
+    assert {k: best.get_position()[k] for k in ('n', 'c', 'b')} == {'n': 0, 'c': 'b', 'b': 0}
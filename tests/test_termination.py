@@ -0,0 +1,68 @@
+import pytest
+
+import pso_classes as pso
+import pso_termination
+
+
+class Converged_swarm(object):
+    def get_diversity(self):
+        return 0.0
+
+
+def criteria(**params):
+    return pso_termination.Termination_criteria(dict({'max_iterations': 100}, **params), 'min')
+
+
+def test_max_iterations():
+    termination = criteria(max_iterations=3)
+    assert [termination.check(i, 1.0, 0, None) for i in range(1, 4)] == [None, None, 'max_iterations']
+
+
+def test_fitness_target_and_evaluations():
+    assert criteria(termination_fitness_target=0.5).check(1, 0.4, 0, None) == 'fitness_target'
+    assert criteria(termination_max_evaluations=50).check(1, 1.0, 50, None) == 'max_evaluations'
+
+
+def test_stagnation_over_the_window():
+    termination = criteria(termination_stagnation_window=3, termination_stagnation_tolerance=0.1)
+    reasons = [termination.check(i, f, 0, None) for i, f in enumerate([1.0, 0.5, 0.48, 0.47, 0.46])]
+    assert reasons == [None, None, None, None, 'stagnation']
+
+
+def test_diversity():
+    assert criteria(termination_min_diversity=0.01).check(1, 1.0, 0, Converged_swarm()) == 'diversity'
+
+
+def test_restored_criteria_apply_the_parameters_of_the_resumed_run():
+    termination = criteria(max_iterations=10)
+    assert termination.check(10, 1.0, 0, None) == 'max_iterations'
+    resumed = criteria(max_iterations=20)
+    state = termination.get_state()
+    resumed.set_state(state)
+    assert resumed.recheck(10, 0, None) is None
+    assert resumed.get_wall_time() >= state['termination']['wall_time']
+
+
+def test_resume_from_the_final_checkpoint_with_a_larger_budget(mixed_space, make_params):
+    params = make_params(checkpoint_every=5, max_iterations=20)
+    full = pso.pso(mixed_space, dict(params))
+    full.execute()
+
+    finished = pso.pso(mixed_space, dict(params, max_iterations=10))
+    finished.execute()
+    resumed = pso.pso(mixed_space, dict(params))
+    resumed.resume(finished.params['Checkpoint file'])
+
+    assert resumed.N_iter == 20
+    assert resumed.statistics['Termination reason'] == 'max_iterations'
+    with open(resumed.params['Results log file']) as f, open(full.params['Results log file']) as g:
+        assert f.read() == g.read()
+
+
+def test_resume_with_the_same_budget_stops_immediately(mixed_space, make_params):
+    finished = pso.pso(mixed_space, make_params(checkpoint_every=5, max_iterations=10))
+    finished.execute()
+    resumed = pso.pso(mixed_space, make_params(max_iterations=10))
+    resumed.resume(finished.params['Checkpoint file'])
+    assert resumed.N_iter == 10
+    assert resumed.statistics['Termination reason'] == 'max_iterations'
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import pso_classes as pso
+import pso_topologies
+
+
+def topology(name, size, n_neighbours=1, rebuild_every=0):
+    return pso_topologies.Topology(name, size, 'min', n_neighbours, rebuild_every, np.random.default_rng(0))
+
+
+def test_ring_neighbours_are_on_each_side():
+    neighbours = topology('ring', 10, 2).get_neighbours()
+    assert neighbours.shape == (10, 5)
+    assert sorted(neighbours[0]) == [0, 1, 2, 8, 9]
+
+
+def test_von_neumann_wraps_rows_and_columns_separately():
+    neighbours = topology('von_neumann', 16).get_neighbours()
+    assert neighbours.shape == (16, 5)
+    # Particle 3 is at the end of the first row of the 4x4 grid: its right neighbour is the start of the same row
+    assert list(neighbours[3]) == [3, 2, 0, 15, 7]
+    assert list(neighbours[12]) == [12, 15, 13, 8, 0]
+
+
+@pytest.mark.parametrize('size', (5, 10, 16, 17, 30))
+def test_von_neumann_neighbourhoods_are_symmetric(size):
+    neighbours = topology('von_neumann', size).get_neighbours()
+    assert neighbours.min() >= 0 and neighbours.max() < size
+    pairs = {(i, j) for i in range(size) for j in neighbours[i] if j != i}
+    assert pairs == {(j, i) for i, j in pairs}
+
+
+def test_wheel_and_random_neighbourhood_shapes():
+    wheel = topology('wheel', 6).get_neighbours()
+    np.testing.assert_array_equal(wheel, np.column_stack((np.arange(6), np.zeros(6, dtype=int))))
+    random = topology('random', 8, 3, rebuild_every=2)
+    neighbours = random.get_neighbours().copy()
+    assert neighbours.shape == (8, 4)
+    np.testing.assert_array_equal(neighbours[:, 0], np.arange(8))
+    random.next_iteration(1)
+    np.testing.assert_array_equal(random.get_neighbours(), neighbours)
+    random.next_iteration(2)
+    assert not np.array_equal(random.get_neighbours(), neighbours)
+
+
+def test_local_bests_are_the_best_neighbours():
+    best_fitness = np.array([5.0, 1.0, 4.0, np.nan, 6.0, 2.0])
+    np.testing.assert_array_equal(topology('ring', 6).get_local_bests(best_fitness), [1, 1, 1, 2, 5, 5])
+    np.testing.assert_array_equal(topology('wheel', 6).get_local_bests(best_fitness), [1, 1, 2, 0, 0, 5])
+
+
+def test_global_topology_is_the_default():
+    assert pso_topologies.create_topology({'opt_type': 'min'}, 10) is None
+    with pytest.raises(ValueError):
+        pso_topologies.create_topology({'opt_type': 'min', 'topology': 'hexagonal'}, 10)
+    with pytest.raises(ValueError):
+        pso_topologies.create_topology({'opt_type': 'min', 'topology': 'star'}, 10)
+
+
+@pytest.mark.parametrize('name', ('ring', 'von_neumann', 'wheel', 'random'))
+def test_runs_with_local_topologies(mixed_space, make_params, name):
+    best = pso.pso(mixed_space, make_params(topology=name, swarm_size=30, max_iterations=30)).execute()
+    assert best.get_fitness() < 1.0